@@ -1,11 +1,13 @@
 -- Insurance Analytics Dataset Setup
 -- Creates synthetic automotive insurance data for price prediction modeling
 -- Coverage: All 50 US states, with WY and VT limited to 17 policies each
+-- Steps ("-- @step") are run in dependency order by streamlit/pipeline.py --setup
 
 -- Configuration Variables
 SET start_date = '2020-01-01';  -- Starting date for data generation
 SET months_of_data = 72;        -- Number of months to generate (72 = 6 years)
 
+-- @step setup
 -- Create database and schema
 CREATE OR REPLACE DATABASE insurance_analytics;
 CREATE OR REPLACE SCHEMA insurance_analytics.policy_data;
@@ -72,6 +74,7 @@ WHERE CASE
     ELSE TRUE
 END;
 
+-- @step view after setup
 -- Create aggregated view for price prediction
 CREATE OR REPLACE VIEW insurance_analytics.policy_data.premium_view_normalized AS 
 SELECT 
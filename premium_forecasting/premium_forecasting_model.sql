@@ -3,13 +3,44 @@
 -- 
 -- Usage: This script creates a forecasting model for all 50 states
 --        and provides sample queries to predict premiums for any state/year
+--        Run it top to bottom in a worksheet, or with streamlit/pipeline.py, which runs the
+--        "-- @step" sections as a dependency graph (see the directives below)
 
 -- Configuration Variables
 SET source_table = 'insurance_analytics.policy_data.premium_view_normalized';
+-- Longest horizon the dashboard offers (months); forecast once and stored in premium_predictions
+SET forecast_periods = 36;
+-- Horizon (months) of the stored summary, YoY and national tables; the dashboard
+-- recomputes other horizons from premium_predictions without a new FORECAST call
+SET summary_periods = 12;
+-- Policy-level table and months covered by the carrier/term/business line cube
+SET policy_table = 'insurance_analytics.policy_data.carrier_product_performance_dim';
+SET cube_months = 24;
+-- Stored feature months recomputed each run (the latest may have been partial; cancellations
+-- keep arriving for recent months, so raise this to restate more of them)
+SET feature_restate_months = 1;
+
+-- Versioned outputs: every run trains its own model and writes its own output tables under the
+-- run version (e.g. premium_predictions_v20261018120000), then publishes them with one INSERT into
+-- forecast_releases (Step 7). The dashboard only reads the latest published version, so it never
+-- sees a rebuild in progress, and the version is its cache key.
+SET run_version = TO_VARCHAR(CURRENT_TIMESTAMP(), 'YYYYMMDDHH24MISS');
+-- Published versions whose model and tables are kept (older ones are dropped after publishing)
+SET keep_versions = 3;
+SET model_name = 'INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_model_v' || $run_version;
+SET predictions_table = 'INSURANCE_ANALYTICS.POLICY_DATA.premium_predictions_v' || $run_version;
+SET summary_table = 'INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary_v' || $run_version;
+SET yoy_table = 'INSURANCE_ANALYTICS.POLICY_DATA.yoy_growth_all_states_v' || $run_version;
+SET national_table = 'INSURANCE_ANALYTICS.POLICY_DATA.national_summary_v' || $run_version;
+SET history_table = 'INSURANCE_ANALYTICS.POLICY_DATA.premium_history_monthly_v' || $run_version;
+SET cube_table = 'INSURANCE_ANALYTICS.POLICY_DATA.premium_cube_monthly_v' || $run_version;
+SET covariates_table = 'INSURANCE_ANALYTICS.POLICY_DATA.state_covariates_v' || $run_version;
 
 USE DATABASE insurance_analytics;
 USE SCHEMA policy_data;
 
+-- @step features after view
+-- @reads $policy_table
 -- Step 1: Verify training data from source table
 SELECT 
     state,
@@ -20,44 +51,243 @@ FROM IDENTIFIER($source_table)
 GROUP BY state
 ORDER BY state;
 
+-- Step 1b: Exogenous features per state-month over the policies premium_view_normalized averages:
+-- the same date window (2012-01-01 to before 2025-12-01), terms, states, business line, applicant and
+-- carrier filters, and no same-day cancellations. policy_volume counts those policies and
+-- cancellation_rate is the share of them cancelled later.
+-- Maintained incrementally: stored months from $feature_start onward are deleted and recomputed in
+-- one transaction, so a run scans the policy table for recent months only, and a state-month that no
+-- longer has qualifying policies is removed rather than left stale.
+CREATE TABLE IF NOT EXISTS INSURANCE_ANALYTICS.POLICY_DATA.premium_features_monthly (
+    series VARCHAR,
+    ts TIMESTAMP_NTZ,
+    policy_volume NUMBER,
+    cancellation_rate FLOAT,
+    six_month_term_pct FLOAT,
+    carrier_count NUMBER,
+    computed_at TIMESTAMP_NTZ
+);
+
+SET feature_start = (
+    SELECT COALESCE(DATEADD(month, -($feature_restate_months - 1), MAX(ts)), '1900-01-01'::TIMESTAMP_NTZ)
+    FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_features_monthly
+);
+
+BEGIN TRANSACTION;
+
+DELETE FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_features_monthly
+WHERE ts >= $feature_start;
+
+INSERT INTO INSURANCE_ANALYTICS.POLICY_DATA.premium_features_monthly
+    (series, ts, policy_volume, cancellation_rate, six_month_term_pct, carrier_count, computed_at)
+SELECT 
+    state as series,
+    DATE_TRUNC(month, policy_effective_date)::TIMESTAMP_NTZ as ts,
+    COUNT(*) as policy_volume,
+    COUNT_IF(cancellation_date IS NOT NULL) / COUNT(*) * 100 as cancellation_rate,
+    COUNT_IF(policy_term = 6) / COUNT(*) * 100 as six_month_term_pct,
+    COUNT(DISTINCT unique_carrier_name) as carrier_count,
+    CURRENT_TIMESTAMP() as computed_at
+FROM IDENTIFIER($policy_table)
+WHERE policy_effective_date >= GREATEST($feature_start, '2012-01-01'::TIMESTAMP_NTZ)
+  AND policy_effective_date < '2025-12-01'
+  AND policy_term IN (6, 12)
+  AND state IS NOT NULL
+  AND state NOT IN ('D', 'M', 'NA', 'S')
+  AND business_line = 'Personal Auto'
+  AND ((DATE(cancellation_date) > DATE(policy_effective_date)) OR cancellation_date IS NULL)
+  AND is_applicant = TRUE
+  AND unique_carrier_name NOT IN ('Root Insurance')
+GROUP BY 1, 2;
+
+COMMIT;
+
+-- @step train after features
+-- @versioned
 -- Step 2: Create forecasting model for all states
--- This trains one model per state (50 models total)
--- Note: Using direct table reference since SYSTEM$QUERY_REFERENCE requires string literal
+-- This trains one multi-series model (one series per state) on the monthly average premium, with
+-- the state-month features as exogenous regressors (so EXPLAIN_FEATURE_IMPORTANCE reports them)
 -- See https://docs.snowflake.com/en/user-guide/ml-functions/preprocessing#overriding-by-kind-of-value
-SET model_query = 'SELECT state as series_id, policy_effective_date as timestamp_col, premium_12mo as target_value FROM ' || $source_table || ' WHERE policy_effective_date IS NOT NULL AND premium_12mo IS NOT NULL';
-
-CREATE OR REPLACE SNOWFLAKE.ML.FORECAST premium_forecast_model(
-    INPUT_DATA => SYSTEM$QUERY_REFERENCE($model_query),
-    SERIES_COLNAME => 'SERIES_ID',
-    TIMESTAMP_COLNAME => 'TIMESTAMP_COL',
-    TARGET_COLNAME => 'TARGET_VALUE',
-    CONFIG_OBJECT => {
-        'method': 'best',
-        'on_error': 'SKIP',
-        'evaluate': TRUE
-    }
-)
-COMMENT = 'Multi-state premium forecasting model for predicting insurance prices by state and year';
+-- The model name carries the run version, so statements that name it are built as strings and
+-- run with EXECUTE IMMEDIATE. Session variables hold at most 256 bytes, so the training query and
+-- the CREATE statement are built in a scripting block; only the model name and $source_table come
+-- from session variables. SYSTEM$QUERY_REFERENCE only accepts a string literal, so the training
+-- query (which has no quotes of its own) is inlined as one.
+EXECUTE IMMEDIATE $$
+DECLARE
+    model_name VARCHAR;
+    source_table VARCHAR;
+    model_query VARCHAR;
+    statement VARCHAR;
+BEGIN
+    SELECT $model_name, $source_table INTO :model_name, :source_table;
+    model_query := 'SELECT v.state as series_id, v.policy_effective_date::TIMESTAMP_NTZ as timestamp_col, '
+        || 'v.premium_12mo as target_value, '
+        || 'f.policy_volume, f.cancellation_rate, f.six_month_term_pct, f.carrier_count '
+        || 'FROM ' || source_table || ' v '
+        || 'JOIN INSURANCE_ANALYTICS.POLICY_DATA.premium_features_monthly f '
+        || 'ON f.series = v.state AND f.ts = DATE_TRUNC(month, v.policy_effective_date)::TIMESTAMP_NTZ '
+        || 'WHERE v.policy_effective_date IS NOT NULL AND v.premium_12mo IS NOT NULL';
+    statement := 'CREATE SNOWFLAKE.ML.FORECAST ' || model_name || '(
+        INPUT_DATA => SYSTEM$QUERY_REFERENCE(''' || model_query || '''),
+        SERIES_COLNAME => ''SERIES_ID'',
+        TIMESTAMP_COLNAME => ''TIMESTAMP_COL'',
+        TARGET_COLNAME => ''TARGET_VALUE'',
+        CONFIG_OBJECT => {
+            ''method'': ''best'',
+            ''on_error'': ''SKIP'',
+            ''evaluate'': TRUE
+        }
+    )
+    COMMENT = ''Multi-state premium forecasting model for predicting insurance prices by state and year''';
+    EXECUTE IMMEDIATE :statement;
+END;
+$$;
+
+-- Steps 3-5 persist the model's evaluation metrics, feature importance and training logs per
+-- model version (the run version, which backtest.py also reads from forecast_releases), so the
+-- dashboard's Model Health tab can show quality trends and skipped series ('on_error': 'SKIP')
+-- without rerunning these calls
+SET model_version = $run_version;
+
+CREATE TABLE IF NOT EXISTS INSURANCE_ANALYTICS.POLICY_DATA.model_evaluation_metrics (
+    model_version VARCHAR,
+    series VARCHAR,
+    error_metric VARCHAR,
+    metric_value FLOAT,
+    standard_deviation FLOAT,
+    computed_at TIMESTAMP_NTZ
+);
 
--- Step 3: Check model evaluation metrics
-CALL premium_forecast_model!SHOW_EVALUATION_METRICS();
+CREATE TABLE IF NOT EXISTS INSURANCE_ANALYTICS.POLICY_DATA.model_feature_importance (
+    model_version VARCHAR,
+    series VARCHAR,
+    rank INTEGER,
+    feature_name VARCHAR,
+    score FLOAT,
+    computed_at TIMESTAMP_NTZ
+);
 
--- Step 4: Check feature importance
-CALL premium_forecast_model!EXPLAIN_FEATURE_IMPORTANCE();
+CREATE TABLE IF NOT EXISTS INSURANCE_ANALYTICS.POLICY_DATA.model_training_logs (
+    model_version VARCHAR,
+    series VARCHAR,
+    has_error BOOLEAN,
+    logs VARIANT,
+    computed_at TIMESTAMP_NTZ
+);
 
--- Step 5: Check for any training errors
-CALL premium_forecast_model!SHOW_TRAINING_LOGS();
+-- Re-running the script for the same model replaces its rows
+DELETE FROM INSURANCE_ANALYTICS.POLICY_DATA.model_evaluation_metrics WHERE model_version = $model_version;
+DELETE FROM INSURANCE_ANALYTICS.POLICY_DATA.model_feature_importance WHERE model_version = $model_version;
+DELETE FROM INSURANCE_ANALYTICS.POLICY_DATA.model_training_logs WHERE model_version = $model_version;
+
+-- Step 3: Model evaluation metrics (cross-validated MAE, MAPE, SMAPE, ... per series)
+SET model_statement = 'CALL ' || $model_name || '!SHOW_EVALUATION_METRICS()';
+EXECUTE IMMEDIATE $model_statement;
+INSERT INTO INSURANCE_ANALYTICS.POLICY_DATA.model_evaluation_metrics
+SELECT $model_version, "SERIES"::VARCHAR, "ERROR_METRIC", "METRIC_VALUE", "STANDARD_DEVIATION", CURRENT_TIMESTAMP()
+FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+
+-- Step 4: Feature importance (trend, seasonality and lags plus the exogenous features)
+SET model_statement = 'CALL ' || $model_name || '!EXPLAIN_FEATURE_IMPORTANCE()';
+EXECUTE IMMEDIATE $model_statement;
+INSERT INTO INSURANCE_ANALYTICS.POLICY_DATA.model_feature_importance
+SELECT $model_version, "SERIES"::VARCHAR, "RANK", "FEATURE_NAME", "SCORE", CURRENT_TIMESTAMP()
+FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+
+-- Step 5: Training logs; series skipped by 'on_error': 'SKIP' carry errors here
+SET model_statement = 'CALL ' || $model_name || '!SHOW_TRAINING_LOGS()';
+EXECUTE IMMEDIATE $model_statement;
+INSERT INTO INSURANCE_ANALYTICS.POLICY_DATA.model_training_logs
+SELECT 
+    $model_version,
+    "SERIES"::VARCHAR,
+    COALESCE(ARRAY_SIZE("LOGS":Errors), 0) > 0,
+    "LOGS",
+    CURRENT_TIMESTAMP()
+FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+
+-- Step 6: Backtest table (filled by streamlit/backtest.py, one row per model version and series)
+-- backtest.py retrains a scratch model at rolling origins over $source_table and scores
+-- MAPE / sMAPE / MASE / interval coverage; the dashboard's Forecast Accuracy tab reads it
+CREATE TABLE IF NOT EXISTS INSURANCE_ANALYTICS.POLICY_DATA.forecast_backtest_metrics (
+    model_version VARCHAR,
+    series VARCHAR,
+    origins INTEGER,
+    horizon INTEGER,
+    points INTEGER,
+    mape FLOAT,
+    smape FLOAT,
+    mase FLOAT,
+    coverage_pct FLOAT,
+    computed_at TIMESTAMP_NTZ
+);
 
 -- ================================================================================
--- SAMPLE USAGE: Predict premiums for all states for next 12 months
+-- SAMPLE USAGE: Predict premiums for all states over the longest horizon
 -- ================================================================================
 
--- Generate 12-month forecasts for all states and save to table
-CREATE OR REPLACE TABLE INSURANCE_ANALYTICS.POLICY_DATA.premium_predictions_12months AS
-SELECT * FROM TABLE(premium_forecast_model!FORECAST(FORECASTING_PERIODS => 12));
+-- @step future_features after features
+-- Future feature values for the $forecast_periods months after the history: each state's
+-- trailing 12-month average, held flat
+CREATE OR REPLACE TABLE INSURANCE_ANALYTICS.POLICY_DATA.premium_features_future AS
+WITH last_month AS (
+    SELECT DATE_TRUNC(month, MAX(policy_effective_date))::TIMESTAMP_NTZ as ts FROM IDENTIFIER($source_table)
+),
+trailing AS (
+    SELECT 
+        f.series,
+        AVG(f.policy_volume) as policy_volume,
+        AVG(f.cancellation_rate) as cancellation_rate,
+        AVG(f.six_month_term_pct) as six_month_term_pct,
+        AVG(f.carrier_count) as carrier_count
+    FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_features_monthly f
+    CROSS JOIN last_month l
+    WHERE f.ts > DATEADD(month, -12, l.ts)
+      AND f.ts <= l.ts
+    GROUP BY f.series
+),
+steps AS (
+    SELECT ROW_NUMBER() OVER (ORDER BY SEQ4()) as step
+    FROM TABLE(GENERATOR(ROWCOUNT => $forecast_periods))
+)
+SELECT 
+    t.series as series_id,
+    DATEADD(month, s.step, l.ts) as timestamp_col,
+    t.policy_volume,
+    t.cancellation_rate,
+    t.six_month_term_pct,
+    t.carrier_count
+FROM trailing t
+CROSS JOIN steps s
+CROSS JOIN last_month l;
+
+-- @step forecast after train, future_features
+-- @versioned
+-- Generate $forecast_periods-month forecasts for all states and save to this run's table
+-- (built in a scripting block, like the CREATE in the train step: the statement is longer than a
+-- session variable can hold)
+EXECUTE IMMEDIATE $$
+DECLARE
+    model_name VARCHAR;
+    predictions_table VARCHAR;
+    statement VARCHAR;
+BEGIN
+    SELECT $model_name, $predictions_table INTO :model_name, :predictions_table;
+    statement := 'CREATE OR REPLACE TABLE ' || predictions_table || ' AS '
+        || 'SELECT * FROM TABLE(' || model_name || '!FORECAST(
+        INPUT_DATA => SYSTEM$REFERENCE(''TABLE'', ''INSURANCE_ANALYTICS.POLICY_DATA.premium_features_future''),
+        SERIES_COLNAME => ''SERIES_ID'',
+        TIMESTAMP_COLNAME => ''TIMESTAMP_COL''
+    ))';
+    EXECUTE IMMEDIATE :statement;
+END;
+$$;
 
--- Aggregate statistics by state for the 12-month forecast period
-CREATE OR REPLACE TABLE INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary AS
+-- @step summary after forecast
+-- @versioned
+-- Aggregate statistics by state over the first $summary_periods forecast months
+CREATE OR REPLACE TABLE IDENTIFIER($summary_table) AS
 SELECT 
     SERIES as state,
     MIN(TS) as forecast_start_date,
@@ -68,11 +298,13 @@ SELECT
     STDDEV(FORECAST) as premium_stddev,
     AVG(LOWER_BOUND) as avg_lower_bound,
     AVG(UPPER_BOUND) as avg_upper_bound
-FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_predictions_12months
+FROM IDENTIFIER($predictions_table)
+WHERE TS < DATEADD(month, $summary_periods,
+                   (SELECT DATE_TRUNC(month, MIN(TS)) FROM IDENTIFIER($predictions_table)))
 GROUP BY SERIES
 ORDER BY state;
 
-SELECT * FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary;
+SELECT * FROM IDENTIFIER($summary_table);
 
 -- ================================================================================
 -- ADDITIONAL EXAMPLES: Individual state predictions
@@ -80,13 +312,13 @@ SELECT * FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary;
 
 -- Example 1: View detailed predictions for South Dakota (SD)
 SELECT * 
-FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_predictions_12months
+FROM IDENTIFIER($predictions_table)
 WHERE SERIES = 'SD'
 ORDER BY TS;
 
 -- Example 2: View detailed predictions for Florida (FL)
 SELECT * 
-FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_predictions_12months
+FROM IDENTIFIER($predictions_table)
 WHERE SERIES = 'FL'
 ORDER BY TS;
 
@@ -97,12 +329,15 @@ SELECT
     min_premium,
     max_premium,
     (max_premium - min_premium) as price_range
-FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary
+FROM IDENTIFIER($summary_table)
 ORDER BY mean_premium DESC
 LIMIT 10;
 
+-- @step yoy after summary, view
+-- @reads $policy_table
+-- @versioned
 -- Example 4: Calculate year-over-year growth for all states
-CREATE OR REPLACE TABLE INSURANCE_ANALYTICS.POLICY_DATA.yoy_growth_all_states AS
+CREATE OR REPLACE TABLE IDENTIFIER($yoy_table) AS
 WITH historical_avg AS (
     SELECT 
         state,
@@ -118,19 +353,134 @@ SELECT
     ((f.mean_premium - h.avg_premium_historical) / h.avg_premium_historical * 100) as yoy_growth_pct,
     f.min_premium,
     f.max_premium
-FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary f
+FROM IDENTIFIER($summary_table) f
 LEFT JOIN historical_avg h ON f.state = h.state
 ORDER BY yoy_growth_pct DESC;
 
-SELECT * FROM INSURANCE_ANALYTICS.POLICY_DATA.yoy_growth_all_states;
+SELECT * FROM IDENTIFIER($yoy_table);
+
+-- @step national after yoy
+-- @versioned
+-- National statistics for the dashboard header and tabs, computed once per forecast run
+-- (single row, so the app never re-aggregates the state tables)
+CREATE OR REPLACE TABLE IDENTIFIER($national_table) AS
+WITH growth AS (
+    SELECT 
+        AVG(yoy_growth_pct) as avg_yoy_growth_pct,
+        MEDIAN(yoy_growth_pct) as median_yoy_growth_pct,
+        STDDEV(yoy_growth_pct) as stddev_yoy_growth_pct,
+        COUNT_IF(yoy_growth_pct > 0) as positive_growth_states,
+        COUNT(*) as growth_states
+    FROM IDENTIFIER($yoy_table)
+)
+SELECT 
+    COUNT(*) as states_analyzed,
+    AVG(f.mean_premium) as national_avg_premium,
+    AVG(f.premium_stddev / NULLIF(f.mean_premium, 0) * 100) as avg_volatility_pct,
+    g.avg_yoy_growth_pct,
+    g.median_yoy_growth_pct,
+    g.stddev_yoy_growth_pct,
+    g.positive_growth_states,
+    g.growth_states,
+    CURRENT_TIMESTAMP() as computed_at
+FROM IDENTIFIER($summary_table) f
+CROSS JOIN growth g
+GROUP BY ALL;
+
+SELECT * FROM IDENTIFIER($national_table);
+
+-- @step history after view
+-- @reads $policy_table
+-- @versioned
+-- Monthly history per state for the dashboard's actuals overlay, aggregated once per run
+-- (the app loads it in one query and never scans $source_table)
+CREATE OR REPLACE TABLE IDENTIFIER($history_table) AS
+SELECT 
+    state as series,
+    DATE_TRUNC(month, policy_effective_date) as ts,
+    AVG(premium_12mo) as actual,
+    COUNT(*) as policies
+FROM IDENTIFIER($source_table)
+WHERE policy_effective_date IS NOT NULL
+  AND premium_12mo IS NOT NULL
+GROUP BY 1, 2
+ORDER BY 1, 2;
+
+-- @step cube after setup
+-- @reads $policy_table
+-- @versioned
+-- State x carrier x term x business line x month cube for the dashboard's segment filters.
+-- GROUP BY CUBE materializes every rollup (a rolled-up dimension reads 'ALL'), and premiums are
+-- stored as sums with policy counts so any slice averages correctly without touching raw policies.
+-- Same policy filters as premium_view_normalized, except that business line is a dimension.
+CREATE OR REPLACE TABLE IDENTIFIER($cube_table) AS
+WITH last_month AS (
+    SELECT DATE_TRUNC(month, MAX(policy_effective_date)) as ts FROM IDENTIFIER($policy_table)
+),
+policies AS (
+    SELECT 
+        p.state,
+        p.unique_carrier_name as carrier,
+        p.policy_term::VARCHAR as policy_term,
+        p.business_line,
+        DATE_TRUNC(month, p.policy_effective_date) as ts,
+        CASE WHEN p.policy_term = 6 THEN p.premium * 2 ELSE p.premium END as premium_12mo
+    FROM IDENTIFIER($policy_table) p
+    CROSS JOIN last_month l
+    WHERE p.policy_effective_date >= DATEADD(month, -($cube_months - 1), l.ts)
+      AND p.policy_effective_date < DATEADD(month, 1, l.ts)
+      AND p.policy_term IN (6, 12)
+      AND p.state IS NOT NULL
+      AND p.state NOT IN ('D', 'M', 'NA', 'S')
+      AND ((DATE(p.cancellation_date) > DATE(p.policy_effective_date)) OR p.cancellation_date IS NULL)
+      AND p.is_applicant = TRUE
+      AND p.unique_carrier_name NOT IN ('Root Insurance')
+)
+SELECT 
+    state,
+    IFF(GROUPING(carrier) = 1, 'ALL', carrier) as carrier,
+    IFF(GROUPING(policy_term) = 1, 'ALL', policy_term) as policy_term,
+    IFF(GROUPING(business_line) = 1, 'ALL', business_line) as business_line,
+    ts,
+    COUNT(*) as policies,
+    SUM(premium_12mo) as premium_sum
+FROM policies
+GROUP BY state, ts, CUBE(carrier, policy_term, business_line);
+
+-- @step covariates after cube
+-- @versioned
+-- Per-state covariates for the dashboard's correlation analysis, one row per state and covariate.
+-- The long layout lets external covariates (e.g. loss ratio from claims) be appended as rows
+-- without changing the dashboard; these two are derived from the cube's trailing 12 months.
+CREATE OR REPLACE TABLE IDENTIFIER($covariates_table) AS
+WITH trailing AS (
+    SELECT *
+    FROM IDENTIFIER($cube_table)
+    WHERE carrier = 'ALL'
+      AND business_line = 'ALL'
+      AND ts > DATEADD(month, -12, (SELECT MAX(ts) FROM IDENTIFIER($cube_table)))
+)
+SELECT state, 'POLICIES_12MO' as covariate, SUM(policies)::FLOAT as value
+FROM trailing
+WHERE policy_term = 'ALL'
+GROUP BY state
+UNION ALL
+SELECT 
+    state,
+    'SIX_MONTH_TERM_PCT' as covariate,
+    SUM(IFF(policy_term = '6', policies, 0)) / NULLIF(SUM(IFF(policy_term = 'ALL', policies, 0)), 0) * 100 as value
+FROM trailing
+GROUP BY state;
 
+-- @step examples after summary
+-- @versioned
 -- Example 5: Identify states with highest volatility (price fluctuation)
 SELECT 
     state,
     mean_premium,
     premium_stddev,
     (premium_stddev / mean_premium * 100) as coefficient_of_variation_pct
-FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary
+FROM IDENTIFIER($summary_table)
 ORDER BY premium_stddev DESC
 LIMIT 10;
 
@@ -142,19 +492,74 @@ SELECT
     LOWER_BOUND,
     UPPER_BOUND,
     (UPPER_BOUND - LOWER_BOUND) as prediction_interval_width
-FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_predictions_12months
+FROM IDENTIFIER($predictions_table)
 WHERE SERIES IN ('CA', 'TX', 'FL', 'NY', 'SD')
 ORDER BY state, forecast_date;
 
+-- @step publish after train, forecast, summary, yoy, national, history, cube, covariates, examples
+-- @versioned
+-- ================================================================================
+-- PUBLISH: Point the dashboard at this run
+-- ================================================================================
+
+-- Step 7: Every output table of the run exists now; one INSERT switches the dashboard from the
+-- previous version to this one (it reads the latest published_at). A failed run never gets here,
+-- so the dashboard keeps serving the last good version.
+CREATE TABLE IF NOT EXISTS INSURANCE_ANALYTICS.POLICY_DATA.forecast_releases (
+    version VARCHAR,
+    model_name VARCHAR,
+    source VARCHAR,
+    published_at TIMESTAMP_NTZ
+);
+
+INSERT INTO INSURANCE_ANALYTICS.POLICY_DATA.forecast_releases (version, model_name, source, published_at)
+SELECT $run_version, $model_name, 'SNOWFLAKE.ML.FORECAST', CURRENT_TIMESTAMP();
+
+-- Step 8: Drop the models and tables of all but the $keep_versions most recently published versions
+-- (dashboard sessions still on the previous version keep working until their next data version check)
+EXECUTE IMMEDIATE $$
+DECLARE
+    stale CURSOR FOR
+        SELECT version, ANY_VALUE(model_name) AS model_name
+        FROM INSURANCE_ANALYTICS.POLICY_DATA.forecast_releases
+        GROUP BY version
+        QUALIFY ROW_NUMBER() OVER (ORDER BY MAX(published_at) DESC) > $keep_versions;
+    outputs ARRAY DEFAULT ARRAY_CONSTRUCT('premium_predictions', 'premium_forecast_summary',
+                                         'yoy_growth_all_states', 'national_summary',
+                                         'premium_history_monthly', 'premium_cube_monthly',
+                                         'state_covariates');
+    statement VARCHAR;
+    dropped INTEGER DEFAULT 0;
+BEGIN
+    FOR r IN stale DO
+        LET stale_version VARCHAR := r.version;
+        FOR i IN 0 TO ARRAY_SIZE(outputs) - 1 DO
+            statement := 'DROP TABLE IF EXISTS INSURANCE_ANALYTICS.POLICY_DATA.'
+                || outputs[i]::VARCHAR || '_v' || stale_version;
+            EXECUTE IMMEDIATE :statement;
+        END FOR;
+        IF (r.model_name IS NOT NULL) THEN
+            statement := 'DROP SNOWFLAKE.ML.FORECAST IF EXISTS ' || r.model_name;
+            EXECUTE IMMEDIATE :statement;
+        END IF;
+        DELETE FROM INSURANCE_ANALYTICS.POLICY_DATA.forecast_releases WHERE version = :stale_version;
+        dropped := dropped + 1;
+    END FOR;
+    RETURN dropped || ' old version(s) dropped';
+END;
+$$;
+
 -- ================================================================================
 -- UTILITY QUERIES
 -- ================================================================================
 
--- View model details
-SHOW SNOWFLAKE.ML.FORECAST LIKE 'premium_forecast_model';
+-- Published versions, latest first (the first row is what the dashboard serves)
+SELECT * FROM INSURANCE_ANALYTICS.POLICY_DATA.forecast_releases ORDER BY published_at DESC;
 
--- Drop model if needed
--- DROP SNOWFLAKE.ML.FORECAST premium_forecast_model;
+-- Roll back: publish a kept version again
+-- INSERT INTO INSURANCE_ANALYTICS.POLICY_DATA.forecast_releases (version, model_name, source, published_at)
+-- SELECT version, model_name, 'rollback', CURRENT_TIMESTAMP()
+-- FROM INSURANCE_ANALYTICS.POLICY_DATA.forecast_releases WHERE version = '<version>' LIMIT 1;
 
--- Refresh model with new data (requires recreating)
--- CREATE OR REPLACE SNOWFLAKE.ML.FORECAST premium_forecast_model(...);
+-- View model details (one model per kept version)
+SHOW SNOWFLAKE.ML.FORECAST LIKE 'premium_forecast_model_v%';
@@ -0,0 +1,521 @@
+"""
+Forecast Backtesting for Insurance Premium Dashboard
+Rolling-origin forecasts over premium_view_normalized history, scored per
+series with vectorized MAPE, sMAPE, MASE and interval coverage, and stored
+in forecast_backtest_metrics once per model version.
+
+For each origin the forecaster sees only the months up to the origin and
+forecasts BACKTEST_HORIZON months ahead; forecasts, bounds and actuals are
+laid out as (series x origin x horizon) arrays so scoring thousands of
+series is a handful of NumPy reductions.
+
+Usage:
+    python backtest.py                         # default connection, current model version
+    python backtest.py --origins 12 --horizon 6 --connection prod
+    python backtest.py --force                 # recompute a model version already stored
+    python backtest.py --forecaster holt_winters
+"""
+import argparse
+import datetime
+import sys
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    BACKTEST_TABLE,
+    HISTORY_SOURCE_VIEW,
+    FEATURES_TABLE,
+    FORECAST_MODEL,
+    BACKTEST_ORIGINS,
+    BACKTEST_ORIGIN_STEP,
+    BACKTEST_HORIZON,
+    BACKTEST_SEASON,
+    BACKTEST_MIN_TRAIN
+)
+from releases import latest_release
+
+# Monthly average premium per state, the grain the forecast model is trained on
+HISTORY_QUERY = """
+SELECT
+    state AS series,
+    DATE_TRUNC('month', policy_effective_date) AS ts,
+    AVG(premium_12mo) AS actual
+FROM {source}
+WHERE policy_effective_date IS NOT NULL
+  AND premium_12mo IS NOT NULL
+GROUP BY 1, 2
+"""
+
+# Session-scoped copy of the monthly history that per-origin models train on
+HISTORY_TEMP_TABLE = "premium_backtest_history"
+
+# Scratch model retrained at every origin (the production model is untouched)
+BACKTEST_MODEL = "premium_backtest_model"
+
+# Session-scoped future feature rows the scratch model forecasts from, rebuilt at every origin
+FUTURE_TEMP_TABLE = "premium_backtest_future"
+
+# Exogenous regressors of the production model, from FEATURES_TABLE
+MODEL_FEATURES = ('policy_volume', 'cancellation_rate', 'six_month_term_pct', 'carrier_count')
+
+# Future features are each series' trailing average over this many months, held flat
+# (as the future_features step of premium_forecasting_model.sql does)
+FEATURE_TRAILING_MONTHS = 12
+
+BACKTEST_DDL = f"""
+CREATE TABLE IF NOT EXISTS {BACKTEST_TABLE} (
+    model_version VARCHAR,
+    series VARCHAR,
+    origins INTEGER,
+    horizon INTEGER,
+    points INTEGER,
+    mape FLOAT,
+    smape FLOAT,
+    mase FLOAT,
+    coverage_pct FLOAT,
+    computed_at TIMESTAMP_NTZ
+)
+"""
+
+
+def history_matrix(history):
+    """
+    Pivot long monthly history into a dense (series x month) matrix
+
+    Args:
+        history (pd.DataFrame): SERIES, TS and ACTUAL columns
+
+    Returns:
+        tuple: (series array, monthly DatetimeIndex, float64 array of shape
+        (n_series, n_months) with NaN for missing months)
+    """
+    month = pd.to_datetime(history['TS']).to_numpy().astype('datetime64[M]')
+    first = month.min()
+    month_pos = (month - first).astype(np.int64)
+    months = pd.date_range(pd.Timestamp(first), periods=month_pos.max() + 1, freq='MS')
+    series_pos, series = pd.factorize(history['SERIES'].astype(str), sort=True)
+
+    values = np.full((len(series), len(months)), np.nan)
+    values[series_pos, month_pos] = history['ACTUAL'].to_numpy(dtype=float)
+    return np.asarray(series), months, values
+
+
+def rolling_origins(n_months, n_origins=BACKTEST_ORIGINS, horizon=BACKTEST_HORIZON,
+                    step=BACKTEST_ORIGIN_STEP, min_train=BACKTEST_MIN_TRAIN):
+    """
+    Choose forecast origins so every horizon month has an actual
+
+    Args:
+        n_months (int): Length of the monthly history
+        n_origins (int): Number of origins wanted
+        horizon (int): Months forecast from each origin
+        step (int): Months between consecutive origins
+        min_train (int): Months of history required up to the first origin
+
+    Returns:
+        np.ndarray: Origin month positions (last training month), ascending
+    """
+    last = n_months - 1 - horizon
+    origins = last - step * np.arange(n_origins)[::-1]
+    return origins[origins >= min_train - 1]
+
+
+def mase_scale(values, origins, season=BACKTEST_SEASON):
+    """
+    In-sample MAE of the seasonal naive forecast up to each origin
+
+    Computed for all series and origins at once from cumulative sums of
+    seasonal differences. Falls back to a one-month naive when a series
+    has too little history for the seasonal one.
+
+    Args:
+        values (np.ndarray): (n_series, n_months) history matrix
+        origins (np.ndarray): Origin month positions
+        season (int): Seasonal period in months
+
+    Returns:
+        np.ndarray: (n_series, n_origins) MASE denominators (NaN if undefined)
+    """
+    def scale_for(lag):
+        diffs = np.abs(values[:, lag:] - values[:, :-lag])
+        valid = ~np.isnan(diffs)
+        sums = np.cumsum(np.where(valid, diffs, 0.0), axis=1)
+        counts = np.cumsum(valid, axis=1)
+        # Differences ending at or before the origin month
+        last = origins - lag
+        usable = last >= 0
+        idx = np.clip(last, 0, None)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = sums[:, idx] / counts[:, idx]
+        scale[:, ~usable] = np.nan
+        return scale
+
+    seasonal = scale_for(season) if values.shape[1] > season else np.full((len(values), len(origins)), np.nan)
+    return np.where(np.isnan(seasonal), scale_for(1), seasonal)
+
+
+def run_backtest(values, months, series, forecaster, origins, horizon=BACKTEST_HORIZON):
+    """
+    Run a forecaster from every origin and align it with the actuals
+
+    Args:
+        values (np.ndarray): (n_series, n_months) history matrix
+        months (pd.DatetimeIndex): Month of each history column
+        series (np.ndarray): Series identifier of each history row
+        forecaster (callable): forecaster(values, months, series, origin, horizon)
+            returning (forecast, lower, upper) arrays of shape (n_series, horizon);
+            it must only use history up to column ``origin``
+        origins (np.ndarray): Origin month positions from rolling_origins()
+        horizon (int): Months forecast from each origin
+
+    Returns:
+        dict: actual, forecast, lower, upper arrays of shape (n_series, n_origins, horizon)
+    """
+    forecasts, lowers, uppers = [], [], []
+    for origin in origins:
+        forecast, lower, upper = forecaster(values, months, series, int(origin), horizon)
+        forecasts.append(forecast)
+        lowers.append(lower)
+        uppers.append(upper)
+
+    target = origins[:, None] + np.arange(1, horizon + 1)[None, :]
+    return {
+        'actual': values[:, target],
+        'forecast': np.stack(forecasts, axis=1),
+        'lower': np.stack(lowers, axis=1),
+        'upper': np.stack(uppers, axis=1)
+    }
+
+
+def _masked_mean(values, mask, axis=(1, 2)):
+    """Mean of values where mask is True (NaN where nothing is masked in)"""
+    counts = mask.sum(axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(mask, values, 0.0).sum(axis=axis) / counts
+
+
+def score_backtest(result, scale):
+    """
+    Score aligned backtest arrays per series
+
+    Args:
+        result (dict): Output of run_backtest()
+        scale (np.ndarray): (n_series, n_origins) output of mase_scale()
+
+    Returns:
+        dict: Per-series arrays POINTS, MAPE, SMAPE, MASE (mean absolute error over
+        the seasonal naive in-sample error) and COVERAGE_PCT (actuals inside the
+        prediction interval); percentages are 0-100
+    """
+    actual, forecast = result['actual'], result['forecast']
+    lower, upper = result['lower'], result['upper']
+
+    valid = ~np.isnan(actual) & ~np.isnan(forecast)
+    abs_err = np.abs(forecast - actual)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ape = abs_err / np.abs(actual)
+        denom = np.abs(actual) + np.abs(forecast)
+        sape = 2 * abs_err / denom
+        scaled = abs_err / scale[:, :, None]
+        covered = (actual >= lower) & (actual <= upper)
+
+    mape_mask = valid & (actual != 0)
+    smape_mask = valid & (denom > 0)
+    mase_mask = valid & np.isfinite(scaled) & (scale[:, :, None] > 0)
+    interval_mask = valid & ~np.isnan(lower) & ~np.isnan(upper)
+
+    return {
+        'POINTS': valid.sum(axis=(1, 2)),
+        'MAPE': _masked_mean(ape, mape_mask) * 100,
+        'SMAPE': _masked_mean(sape, smape_mask) * 100,
+        'MASE': _masked_mean(scaled, mase_mask),
+        'COVERAGE_PCT': _masked_mean(covered.astype(float), interval_mask) * 100
+    }
+
+
+def backtest_metrics(history, forecaster, n_origins=BACKTEST_ORIGINS, horizon=BACKTEST_HORIZON,
+                     step=BACKTEST_ORIGIN_STEP, season=BACKTEST_SEASON, min_train=BACKTEST_MIN_TRAIN):
+    """
+    Backtest a forecaster over monthly history and score every series
+
+    Args:
+        history (pd.DataFrame): SERIES, TS and ACTUAL columns
+        forecaster (callable): See run_backtest()
+        n_origins (int): Number of rolling origins
+        horizon (int): Months forecast from each origin
+        step (int): Months between origins
+        season (int): Seasonal period of the MASE benchmark
+        min_train (int): Months of history required before the first origin
+
+    Returns:
+        pd.DataFrame: One row per series with ORIGINS, HORIZON, POINTS, MAPE,
+        SMAPE, MASE and COVERAGE_PCT
+    """
+    series, months, values = history_matrix(history)
+    origins = rolling_origins(len(months), n_origins, horizon, step, min_train)
+    if len(origins) == 0:
+        raise ValueError(f"{len(months)} months of history is too short for a {horizon}-month backtest "
+                         f"with {min_train} training months")
+
+    result = run_backtest(values, months, series, forecaster, origins, horizon)
+    scores = score_backtest(result, mase_scale(values, origins, season))
+
+    return pd.DataFrame({
+        'SERIES': series,
+        'ORIGINS': len(origins),
+        'HORIZON': horizon,
+        **scores
+    })
+
+
+def align_forecasts(forecasts, series, origin_month, horizon):
+    """
+    Place long forecast rows into (series x horizon) arrays
+
+    Args:
+        forecasts (pd.DataFrame): SERIES, TS, FORECAST, LOWER_BOUND, UPPER_BOUND
+        series (np.ndarray): Series identifier of each history row
+        origin_month (pd.Timestamp): Last training month
+        horizon (int): Months forecast
+
+    Returns:
+        tuple: (forecast, lower, upper) arrays of shape (n_series, horizon), NaN where missing
+    """
+    from data_loader import clean_state_codes
+
+    ts = pd.to_datetime(forecasts['TS'])
+    step = ((ts.dt.year - origin_month.year) * 12 + (ts.dt.month - origin_month.month)).to_numpy() - 1
+    row = pd.Index(series).get_indexer(clean_state_codes(forecasts['SERIES']))
+    keep = (row >= 0) & (step >= 0) & (step < horizon)
+
+    arrays = []
+    for col in ('FORECAST', 'LOWER_BOUND', 'UPPER_BOUND'):
+        out = np.full((len(series), horizon), np.nan)
+        # Several rows per month (e.g. daily timestamps) are averaged
+        sums = np.zeros_like(out)
+        counts = np.zeros_like(out)
+        np.add.at(sums, (row[keep], step[keep]), forecasts[col].to_numpy(dtype=float)[keep])
+        np.add.at(counts, (row[keep], step[keep]), 1)
+        np.divide(sums, counts, out=out, where=counts > 0)
+        arrays.append(out)
+    return tuple(arrays)
+
+
+def make_snowflake_forecaster(session, history_table=HISTORY_TEMP_TABLE, model_name=BACKTEST_MODEL,
+                              features_table=FEATURES_TABLE, future_table=FUTURE_TEMP_TABLE):
+    """
+    Build a forecaster that retrains SNOWFLAKE.ML.FORECAST at each origin
+
+    Mirrors the production pipeline without its evaluation pass: the model
+    is trained on the target joined to the MODEL_FEATURES of each month up
+    to the origin, and forecasts from each series' trailing
+    FEATURE_TRAILING_MONTHS average of those features, held flat. Stored
+    feature months are their latest restatement, so late cancellations are
+    known to the backtest earlier than they were to the model. One
+    multi-series model is trained per origin, so cost grows with the number
+    of origins, not the number of series.
+
+    Args:
+        session: Snowpark session holding history_table
+        history_table (str): Table with SERIES, TS and ACTUAL monthly history
+        model_name (str): Scratch model name, replaced at every origin
+        features_table (str): Monthly features table (SERIES, TS and MODEL_FEATURES)
+        future_table (str): Session-scoped table rebuilt with the future features of each origin
+
+    Returns:
+        callable: Forecaster for run_backtest()
+    """
+    feature_cols = ', '.join(f"f.{c}" for c in MODEL_FEATURES)
+    trailing_cols = ', '.join(f"AVG(f.{c}) AS {c}" for c in MODEL_FEATURES)
+
+    def forecast(values, months, series, origin, horizon):
+        cutoff = months[origin].strftime('%Y-%m-%d')
+        training_query = (f"SELECT h.series, h.ts, h.actual, {feature_cols} FROM {history_table} h "
+                          f"JOIN {features_table} f ON f.series = h.series AND f.ts = h.ts "
+                          f"WHERE h.ts <= ''{cutoff}''")
+        session.sql(f"""
+        CREATE OR REPLACE SNOWFLAKE.ML.FORECAST {model_name}(
+            INPUT_DATA => SYSTEM$QUERY_REFERENCE('{training_query}'),
+            SERIES_COLNAME => 'SERIES',
+            TIMESTAMP_COLNAME => 'TS',
+            TARGET_COLNAME => 'ACTUAL',
+            CONFIG_OBJECT => {{'method': 'best', 'on_error': 'SKIP', 'evaluate': FALSE}}
+        )
+        """).collect()
+        session.sql(f"""
+        CREATE OR REPLACE TEMPORARY TABLE {future_table} AS
+        WITH trailing AS (
+            SELECT f.series, {trailing_cols}
+            FROM {features_table} f
+            WHERE f.ts > DATEADD(month, -{int(FEATURE_TRAILING_MONTHS)}, '{cutoff}'::TIMESTAMP_NTZ)
+              AND f.ts <= '{cutoff}'::TIMESTAMP_NTZ
+            GROUP BY f.series
+        ),
+        steps AS (
+            SELECT ROW_NUMBER() OVER (ORDER BY SEQ4()) AS step
+            FROM TABLE(GENERATOR(ROWCOUNT => {int(horizon)}))
+        )
+        SELECT t.series, DATEADD(month, s.step, '{cutoff}'::TIMESTAMP_NTZ) AS ts,
+               {', '.join(f"t.{c}" for c in MODEL_FEATURES)}
+        FROM trailing t
+        CROSS JOIN steps s
+        """).collect()
+        forecasts = session.sql(f"""
+        SELECT series, ts, forecast, lower_bound, upper_bound
+        FROM TABLE({model_name}!FORECAST(
+            INPUT_DATA => SYSTEM$REFERENCE('TABLE', '{future_table}'),
+            SERIES_COLNAME => 'SERIES',
+            TIMESTAMP_COLNAME => 'TS'
+        ))
+        """).to_pandas()
+        return align_forecasts(forecasts, series, months[origin], horizon)
+
+    return forecast
+
+
+def load_history(session, source=HISTORY_SOURCE_VIEW):
+    """
+    Load monthly history and keep a session copy for per-origin training
+
+    Args:
+        session: Snowpark session
+        source (str): Policy-level source view
+
+    Returns:
+        pd.DataFrame: SERIES (cleaned), TS and ACTUAL columns
+    """
+    from data_loader import clean_state_codes
+
+    query = HISTORY_QUERY.format(source=source)
+    session.sql(f"CREATE OR REPLACE TEMPORARY TABLE {HISTORY_TEMP_TABLE} AS {query}").collect()
+    history = session.sql(f"SELECT series, ts, actual FROM {HISTORY_TEMP_TABLE}").to_pandas()
+    history['SERIES'] = clean_state_codes(history['SERIES'])
+    return history
+
+
+def get_model_version(session, model_name=FORECAST_MODEL):
+    """
+    Identify the production model version: the published release, or the model's creation time
+
+    Args:
+        session: Snowpark session
+        model_name (str): Fully qualified model name, used when no release is published
+
+    Returns:
+        str: Version like "20260101120000", or "unknown"
+    """
+    release = latest_release(session)
+    if release is not None:
+        return release[0]
+    database, schema, name = model_name.split('.')
+    try:
+        models = session.sql(
+            f"SHOW SNOWFLAKE.ML.FORECAST LIKE '{name}' IN SCHEMA {database}.{schema}"
+        ).to_pandas()
+        models.columns = [c.strip('"').lower() for c in models.columns]
+        return pd.Timestamp(models['created_on'].iloc[0]).strftime('%Y%m%d%H%M%S')
+    except Exception:
+        return "unknown"
+
+
+def is_stored(session, model_version):
+    """
+    Check whether metrics for a model version are already stored
+
+    Args:
+        session: Snowpark session
+        model_version (str): Model version
+
+    Returns:
+        bool: True if the backtest table has rows for the version
+    """
+    session.sql(BACKTEST_DDL).collect()
+    rows = session.sql(
+        f"SELECT COUNT(*) AS n FROM {BACKTEST_TABLE} WHERE model_version = ?", params=[model_version]
+    ).collect()
+    return rows[0][0] > 0
+
+
+def save_metrics(session, metrics, model_version):
+    """
+    Replace the stored metrics for a model version
+
+    Args:
+        session: Snowpark session
+        metrics (pd.DataFrame): Output of backtest_metrics()
+        model_version (str): Model version the metrics belong to
+
+    Returns:
+        int: Rows written
+    """
+    database, schema, table = BACKTEST_TABLE.split('.')
+    rows = metrics.assign(
+        MODEL_VERSION=model_version,
+        COMPUTED_AT=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    )[['MODEL_VERSION', 'SERIES', 'ORIGINS', 'HORIZON', 'POINTS',
+       'MAPE', 'SMAPE', 'MASE', 'COVERAGE_PCT', 'COMPUTED_AT']]
+
+    session.sql(BACKTEST_DDL).collect()
+    session.sql(f"DELETE FROM {BACKTEST_TABLE} WHERE model_version = ?", params=[model_version]).collect()
+    session.write_pandas(rows, table.upper(), database=database, schema=schema,
+                         auto_create_table=False, overwrite=False, use_logical_type=True)
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling-origin forecast backtest")
+    parser.add_argument('--origins', type=int, default=BACKTEST_ORIGINS, help="Number of forecast origins")
+    parser.add_argument('--horizon', type=int, default=BACKTEST_HORIZON, help="Months forecast per origin")
+    parser.add_argument('--step', type=int, default=BACKTEST_ORIGIN_STEP, help="Months between origins")
+    parser.add_argument('--season', type=int, default=BACKTEST_SEASON, help="Seasonal period for MASE")
+    parser.add_argument('--forecaster', default='snowflake',
+                        choices=('snowflake', 'best', 'seasonal_naive', 'drift', 'holt_winters'),
+                        help="SNOWFLAKE.ML.FORECAST retrained per origin, or a local baseline_forecast method")
+    parser.add_argument('--model-version', help="Version label (default: production model creation time)")
+    parser.add_argument('--force', action='store_true', help="Recompute even if the version is stored")
+    parser.add_argument('--connection', default=None,
+                        help="Connection name from connections.toml (default connection if omitted)")
+    parser.add_argument('--output', help="Also write the metrics to this CSV file")
+    args = parser.parse_args(argv)
+
+    from snowflake.snowpark import Session
+
+    builder = Session.builder
+    if args.connection:
+        builder = builder.config('connection_name', args.connection)
+    session = builder.create()
+
+    try:
+        if args.model_version:
+            model_version = args.model_version
+        elif args.forecaster == 'snowflake':
+            model_version = get_model_version(session)
+        else:
+            model_version = f"baseline-{args.forecaster}"
+        if not args.force and is_stored(session, model_version):
+            print(f"Backtest for model version {model_version} already stored (use --force to recompute)")
+            return 0
+
+        history = load_history(session)
+        if args.forecaster == 'snowflake':
+            forecaster = make_snowflake_forecaster(session)
+        else:
+            from baseline_forecast import make_baseline_forecaster
+            forecaster = make_baseline_forecaster(args.forecaster, args.season)
+        metrics = backtest_metrics(history, forecaster, args.origins, args.horizon, args.step, args.season)
+        written = save_metrics(session, metrics, model_version)
+    finally:
+        session.close()
+
+    print(f"Model version {model_version}: {written} series backtested over "
+          f"{metrics['ORIGINS'].iloc[0]} origins x {args.horizon} months")
+    print(metrics[['MAPE', 'SMAPE', 'MASE', 'COVERAGE_PCT']].median().round(2).to_string())
+    if args.output:
+        metrics.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
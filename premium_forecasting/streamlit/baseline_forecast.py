@@ -0,0 +1,446 @@
+"""
+Baseline Forecaster for Insurance Premium Dashboard
+Seasonal naive, drift and additive Holt-Winters forecasts fitted across all
+series at once in NumPy, producing the premium_predictions schema
+(SERIES, TS, FORECAST, LOWER_BOUND, UPPER_BOUND).
+
+Runs in seconds without a warehouse, so the dashboard tables can be refreshed
+between full SNOWFLAKE.ML.FORECAST retrains, backtested with backtest.py, or
+built from a CSV for an end-to-end run without Snowflake.
+
+Usage:
+    python baseline_forecast.py --output-dir baseline_tables          # history from Snowflake
+    python baseline_forecast.py --history-csv history.csv --output-dir out
+    python baseline_forecast.py --method holt_winters --write         # publish as a new release
+"""
+import argparse
+import os
+import statistics
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    DEFAULT_TABLE,
+    YOY_GROWTH_TABLE,
+    PREDICTIONS_TABLE,
+    NATIONAL_SUMMARY_TABLE,
+    RELEASE_OUTPUT_TABLES,
+    BACKTEST_SEASON,
+    FORECAST_PERIODS,
+    DEFAULT_FORECAST_HORIZON,
+    BACKTEST_NOMINAL_COVERAGE
+)
+
+BASELINE_METHODS = ('seasonal_naive', 'drift', 'holt_winters')
+
+# Holt-Winters smoothing grid; every series picks its own best (alpha, beta, gamma) by in-sample SSE
+HW_ALPHAS = (0.2, 0.5, 0.8)
+HW_BETAS = (0.01, 0.1)
+HW_GAMMAS = (0.05, 0.3)
+
+# Two-sided normal quantile for the interval width
+INTERVAL_Z = statistics.NormalDist().inv_cdf(0.5 + BACKTEST_NOMINAL_COVERAGE / 200)
+
+
+def fill_gaps(values):
+    """
+    Forward-fill missing months after each series' first observation
+
+    Months before a series starts stay NaN rather than being invented from
+    its first value; the fitters start each series at its first observation.
+
+    Args:
+        values (np.ndarray): (n_series, n_months) history matrix
+
+    Returns:
+        np.ndarray: Filled copy; leading gaps and all-NaN series stay NaN
+    """
+    return pd.DataFrame(values).ffill(axis=1).to_numpy()
+
+
+def first_observed(values):
+    """Index of each series' first non-NaN month (n_months for all-NaN series)"""
+    observed = ~np.isnan(values)
+    return np.where(observed.any(axis=1), observed.argmax(axis=1), values.shape[1])
+
+
+def _residual_sigma(errors):
+    """Root mean squared error per series, ignoring NaN"""
+    if not errors.shape[1]:
+        return np.full(len(errors), np.nan)
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.sqrt(np.nanmean(errors ** 2, axis=1))
+
+
+def seasonal_naive(values, horizon, season=BACKTEST_SEASON):
+    """
+    Repeat the last observed season
+
+    Series with less than one season of history fall back to drift.
+
+    Args:
+        values (np.ndarray): (n_series, n_months) gap-filled history
+        horizon (int): Months to forecast
+        season (int): Seasonal period in months
+
+    Returns:
+        tuple: (forecast, sigma_h) arrays of shape (n_series, horizon)
+    """
+    n_months = values.shape[1]
+    if n_months < season:
+        return drift(values, horizon)
+
+    h = np.arange(horizon)
+    forecast = values[:, n_months - season + (h % season)]
+
+    sigma = _residual_sigma(values[:, season:] - values[:, :-season])
+    steps = np.sqrt(h // season + 1)
+    sigma_h = sigma[:, None] * steps[None, :]
+
+    short = n_months - first_observed(values) < season
+    if short.any():
+        forecast[short], sigma_h[short] = drift(values[short], horizon)
+    return forecast, sigma_h
+
+
+def drift(values, horizon):
+    """
+    Extend the line from each series' first to its last observation
+
+    Args:
+        values (np.ndarray): (n_series, n_months) gap-filled history
+        horizon (int): Months to forecast
+
+    Returns:
+        tuple: (forecast, sigma_h) arrays of shape (n_series, horizon)
+    """
+    n_months = values.shape[1]
+    start = first_observed(values)
+    first = values[np.arange(len(values)), np.minimum(start, n_months - 1)]
+    steps_observed = np.maximum(n_months - 1 - start, 1)
+
+    h = np.arange(1, horizon + 1)
+    slope = (values[:, -1] - first) / steps_observed
+    forecast = values[:, -1:] + slope[:, None] * h[None, :]
+
+    sigma = _residual_sigma(np.diff(values, axis=1) - slope[:, None])
+    steps = np.sqrt(h[None, :] * (1 + h[None, :] / steps_observed[:, None]))
+    return forecast, sigma[:, None] * steps
+
+
+def holt_winters(values, horizon, season=BACKTEST_SEASON):
+    """
+    Additive Holt-Winters fitted for every series and smoothing grid point at once
+
+    State arrays have shape (grid, series); each time step is one vector
+    update, so cost grows with history length, not series count. Each
+    series is initialized from its first two observed seasons and updated
+    only from then on. Series with fewer than two seasons of history fall
+    back to seasonal naive (and that to drift below one season).
+
+    Args:
+        values (np.ndarray): (n_series, n_months) gap-filled history
+        horizon (int): Months to forecast
+        season (int): Seasonal period in months
+
+    Returns:
+        tuple: (forecast, sigma_h) arrays of shape (n_series, horizon)
+    """
+    n_months = values.shape[1]
+    start = first_observed(values)
+    fit = n_months - start >= 2 * season
+    if not fit.all():
+        forecast, sigma_h = seasonal_naive(values, horizon, season)
+        if fit.any():
+            forecast[fit], sigma_h[fit] = holt_winters(values[fit], horizon, season)
+        return forecast, sigma_h
+
+    n_series = len(values)
+    grid = np.array([(a, b, g) for a in HW_ALPHAS for b in HW_BETAS for g in HW_GAMMAS])
+    alpha, beta, gamma = (grid[:, i:i + 1] for i in range(3))
+
+    # First two observed seasons of each series; seasonal terms sit at their calendar position
+    rows = np.arange(n_series)[:, None]
+    months = start[:, None] + np.arange(season)[None, :]
+    first_season = values[rows, months]
+    first = first_season.mean(axis=1)
+    second = values[rows, months + season].mean(axis=1)
+    initial_seasonal = np.empty((n_series, season))
+    initial_seasonal[rows, months % season] = first_season - first[:, None]
+
+    level = np.broadcast_to(first, (len(grid), n_series)).copy()
+    trend = np.broadcast_to((second - first) / season, (len(grid), n_series)).copy()
+    seasonal = np.broadcast_to(initial_seasonal, (len(grid), n_series, season)).copy()
+
+    sse = np.zeros((len(grid), n_series))
+    errors = np.full((len(grid), n_series, n_months - season), np.nan)
+    for t in range(season, n_months):
+        # Series update once their first season has passed
+        active = t >= start + season
+        if not active.any():
+            continue
+        s = t % season
+        y = values[:, t]
+        error = y - (level + trend + seasonal[:, :, s])
+        errors[:, active, t - season] = error[:, active]
+        sse[:, active] += error[:, active] ** 2
+        new_level = alpha * (y - seasonal[:, :, s]) + (1 - alpha) * (level + trend)
+        trend = np.where(active, beta * (new_level - level) + (1 - beta) * trend, trend)
+        seasonal[:, :, s] = np.where(active, gamma * (y - new_level) + (1 - gamma) * seasonal[:, :, s],
+                                     seasonal[:, :, s])
+        level = np.where(active, new_level, level)
+
+    # Best grid point per series
+    best = np.argmin(np.where(np.isnan(sse), np.inf, sse), axis=0)
+    pick = (best, np.arange(n_series))
+    h = np.arange(1, horizon + 1)
+    season_idx = (n_months - 1 + h) % season
+    forecast = (level[pick][:, None] + trend[pick][:, None] * h[None, :]
+                + seasonal[best, np.arange(n_series)][:, season_idx])
+
+    # ETS(A,A,A) forecast variance: sigma^2 * (1 + sum_{j<h} c_j^2)
+    sigma = _residual_sigma(errors[best, np.arange(n_series)])
+    j = np.arange(1, horizon)
+    c = (grid[best, 0:1] * (1 + j[None, :] * grid[best, 1:2])
+         + grid[best, 2:3] * (j[None, :] % season == 0))
+    multiplier = np.sqrt(1 + np.concatenate([np.zeros((n_series, 1)), np.cumsum(c ** 2, axis=1)], axis=1))
+    return forecast, sigma[:, None] * multiplier
+
+
+def forecast_arrays(values, horizon, method='best', season=BACKTEST_SEASON):
+    """
+    Forecast every series with one baseline method, or the best one per series
+
+    'best' mirrors SNOWFLAKE.ML.FORECAST's method selection: each method
+    forecasts a held-out final stretch of history and each series keeps the
+    method with the lowest mean absolute error there.
+
+    Args:
+        values (np.ndarray): (n_series, n_months) history matrix (NaN allowed)
+        horizon (int): Months to forecast
+        method (str): 'best' or one of BASELINE_METHODS
+        season (int): Seasonal period in months
+
+    Returns:
+        tuple: (forecast, lower, upper) arrays of shape (n_series, horizon)
+    """
+    filled = fill_gaps(values)
+    fitters = {
+        'seasonal_naive': lambda v, h: seasonal_naive(v, h, season),
+        'drift': drift,
+        'holt_winters': lambda v, h: holt_winters(v, h, season)
+    }
+
+    if method != 'best':
+        forecast, sigma = fitters[method](filled, horizon)
+    else:
+        holdout = max(1, min(horizon, season, filled.shape[1] // 3))
+        train, test = filled[:, :-holdout], values[:, -holdout:]
+        maes = []
+        for name in BASELINE_METHODS:
+            holdout_forecast, _ = fitters[name](train, holdout)
+            with np.errstate(invalid='ignore'):
+                mae = np.nanmean(np.abs(holdout_forecast - test), axis=1)
+            maes.append(np.where(np.isnan(mae), np.inf, mae))
+        choice = np.argmin(np.stack(maes), axis=0)
+
+        fits = [fitters[name](filled, horizon) for name in BASELINE_METHODS]
+        rows = np.arange(len(filled))
+        forecast = np.stack([f for f, _ in fits])[choice, rows]
+        sigma = np.stack([s for _, s in fits])[choice, rows]
+
+    margin = INTERVAL_Z * np.nan_to_num(sigma)
+    return forecast, forecast - margin, forecast + margin
+
+
+def forecast_frame(history, horizon=FORECAST_PERIODS, method='best', season=BACKTEST_SEASON):
+    """
+    Forecast monthly history into the premium_predictions schema
+
+    Args:
+        history (pd.DataFrame): SERIES, TS and ACTUAL columns
+        horizon (int): Months to forecast after the last history month
+        method (str): 'best' or one of BASELINE_METHODS
+        season (int): Seasonal period in months
+
+    Returns:
+        pd.DataFrame: SERIES, TS, FORECAST, LOWER_BOUND, UPPER_BOUND
+    """
+    from backtest import history_matrix
+
+    series, months, values = history_matrix(history)
+    forecast, lower, upper = forecast_arrays(values, horizon, method, season)
+    ts = pd.date_range(months[-1], periods=horizon + 1, freq='MS')[1:]
+
+    predictions = pd.DataFrame({
+        'SERIES': np.repeat(series, horizon),
+        'TS': np.tile(ts, len(series)),
+        'FORECAST': forecast.ravel(),
+        'LOWER_BOUND': lower.ravel(),
+        'UPPER_BOUND': upper.ravel()
+    })
+    return predictions.dropna(subset=['FORECAST']).reset_index(drop=True)
+
+
+def make_baseline_forecaster(method='best', season=BACKTEST_SEASON):
+    """
+    Build a backtest.run_backtest() forecaster from a baseline method
+
+    Args:
+        method (str): 'best' or one of BASELINE_METHODS
+        season (int): Seasonal period in months
+
+    Returns:
+        callable: Forecaster using history up to the origin only
+    """
+    def forecast(values, months, series, origin, horizon):
+        return forecast_arrays(values[:, :origin + 1], horizon, method, season)
+
+    return forecast
+
+
+def build_dashboard_tables(history, predictions):
+    """
+    Derive the dashboard tables from history and predictions in pandas
+
+    Mirrors the CREATE TABLE ... AS statements in premium_forecasting_model.sql:
+    the summary covers the first DEFAULT_FORECAST_HORIZON forecast months and
+    the trailing 12 months are taken from the end of the history.
+
+    Args:
+        history (pd.DataFrame): SERIES, TS and ACTUAL columns
+        predictions (pd.DataFrame): Output of forecast_frame()
+
+    Returns:
+        dict: Fully qualified table name -> pd.DataFrame
+    """
+    from data_loader import compute_national_summary
+
+    first_month = predictions['TS'].min()
+    summary_rows = predictions[predictions['TS'] < first_month + pd.DateOffset(months=DEFAULT_FORECAST_HORIZON)]
+    grouped = summary_rows.groupby('SERIES', sort=True)
+    summary = pd.DataFrame({
+        'FORECAST_START_DATE': grouped['TS'].min(),
+        'FORECAST_END_DATE': grouped['TS'].max(),
+        'MEAN_PREMIUM': grouped['FORECAST'].mean(),
+        'MIN_PREMIUM': grouped['FORECAST'].min(),
+        'MAX_PREMIUM': grouped['FORECAST'].max(),
+        'PREMIUM_STDDEV': grouped['FORECAST'].std(),
+        'AVG_LOWER_BOUND': grouped['LOWER_BOUND'].mean(),
+        'AVG_UPPER_BOUND': grouped['UPPER_BOUND'].mean()
+    }).rename_axis('STATE').reset_index()
+
+    history_ts = pd.to_datetime(history['TS'])
+    recent = history[history_ts > history_ts.max() - pd.DateOffset(months=12)]
+    trailing = recent.groupby('SERIES')['ACTUAL'].mean().rename('TRAILING_12MO_AVG')
+    yoy_growth = summary[['STATE', 'MEAN_PREMIUM', 'MIN_PREMIUM', 'MAX_PREMIUM']].join(trailing, on='STATE')
+    yoy_growth = yoy_growth.rename(columns={'MEAN_PREMIUM': 'FORECAST_12MO_AVG'})
+    yoy_growth['YOY_GROWTH_PCT'] = ((yoy_growth['FORECAST_12MO_AVG'] - yoy_growth['TRAILING_12MO_AVG'])
+                                    / yoy_growth['TRAILING_12MO_AVG'] * 100)
+    yoy_growth = yoy_growth[['STATE', 'TRAILING_12MO_AVG', 'FORECAST_12MO_AVG', 'YOY_GROWTH_PCT',
+                             'MIN_PREMIUM', 'MAX_PREMIUM']].sort_values('YOY_GROWTH_PCT', ascending=False)
+
+    national_summary = pd.DataFrame([compute_national_summary(summary, yoy_growth)])
+
+    return {
+        PREDICTIONS_TABLE: predictions,
+        DEFAULT_TABLE: summary,
+        YOY_GROWTH_TABLE: yoy_growth.reset_index(drop=True),
+        NATIONAL_SUMMARY_TABLE: national_summary
+    }
+
+
+def write_release(session, tables, source):
+    """
+    Write the dashboard tables under a new release version and publish it
+
+    The output tables the baseline does not produce (history, cube and
+    covariates) are zero-copy clones of the current release's, so the
+    dashboard switches to the baseline forecasts in one step.
+
+    Args:
+        session: Snowpark session
+        tables (dict): Output of build_dashboard_tables()
+        source (str): Release source, e.g. 'baseline-best'
+
+    Returns:
+        str: The published version
+    """
+    from releases import latest_release, new_release_version, publish_release, release_data_version, versioned_table
+
+    current = latest_release(session)
+    current_version = release_data_version(current[0]) if current else None
+    version = new_release_version()
+    new_version = release_data_version(version)
+
+    for name, frame in tables.items():
+        database, schema, table = versioned_table(name, new_version).split('.')
+        session.write_pandas(frame, table.upper(), database=database, schema=schema,
+                             auto_create_table=True, overwrite=True, use_logical_type=True)
+    for name in RELEASE_OUTPUT_TABLES:
+        if name not in tables:
+            session.sql(f"CREATE OR REPLACE TABLE {versioned_table(name, new_version)} "
+                        f"CLONE {versioned_table(name, current_version)}").collect()
+
+    publish_release(session, version, source)
+    return version
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local baseline forecast for the dashboard tables")
+    parser.add_argument('--method', default='best', choices=('best',) + BASELINE_METHODS)
+    parser.add_argument('--horizon', type=int, default=FORECAST_PERIODS, help="Months to forecast")
+    parser.add_argument('--season', type=int, default=BACKTEST_SEASON, help="Seasonal period in months")
+    parser.add_argument('--history-csv', help="Monthly history CSV (SERIES, TS, ACTUAL) instead of Snowflake")
+    parser.add_argument('--output-dir', help="Write the dashboard tables as CSV files here")
+    parser.add_argument('--write', action='store_true',
+                        help="Publish the baseline results to the dashboard as a new release")
+    parser.add_argument('--connection', default=None,
+                        help="Connection name from connections.toml (default connection if omitted)")
+    args = parser.parse_args(argv)
+
+    session = None
+    if not args.history_csv or args.write:
+        from snowflake.snowpark import Session
+
+        builder = Session.builder
+        if args.connection:
+            builder = builder.config('connection_name', args.connection)
+        session = builder.create()
+
+    try:
+        if args.history_csv:
+            history = pd.read_csv(args.history_csv, dtype={'SERIES': str}, parse_dates=['TS'])
+        else:
+            from backtest import load_history
+            history = load_history(session)
+
+        predictions = forecast_frame(history, args.horizon, args.method, args.season)
+        tables = build_dashboard_tables(history, predictions)
+
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            for name, frame in tables.items():
+                frame.to_csv(os.path.join(args.output_dir, name.split('.')[-1] + ".csv"), index=False)
+
+        if args.write:
+            version = write_release(session, tables, f"baseline-{args.method}")
+    finally:
+        if session is not None:
+            session.close()
+
+    print(f"{predictions['SERIES'].nunique():,} series forecast {args.horizon} months ahead "
+          f"with method '{args.method}'")
+    if args.output_dir:
+        print(f"Tables written to {args.output_dir}")
+    if args.write:
+        print(f"Published release {version}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
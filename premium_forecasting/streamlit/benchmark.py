@@ -0,0 +1,657 @@
+"""
+Performance Benchmark Harness for Insurance Premium Dashboard
+Drives the loaders, visualizations and tab bodies headlessly against
+synthetic fixture data and compares the results to a stored baseline.
+
+Usage:
+    python benchmark.py                       # run and compare to baseline
+    python benchmark.py --save-baseline       # record a new baseline
+    python benchmark.py --sizes 50 3000       # run a subset of fixture sizes
+    python benchmark.py --allow-missing-baseline --output results.json   # first run on a new machine
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import data_loader
+from config import (
+    METRIC_CONFIG, DEFAULT_TABLE, STATE_COORDS, FORECAST_PERIODS, DEFAULT_FORECAST_HORIZON, SEGMENT_ALL
+)
+from data_loader import (
+    load_forecast_data, prepare_map_data, compute_national_summary, get_map_data, FORECAST_CACHE,
+    load_backtest_metrics, load_history, load_cube, load_carriers, fetch_filtered_tables, load_covariates,
+    load_model_health, get_data_version
+)
+from correlations import build_correlations
+from rankings import build_rank_index
+from scenarios import prediction_arrays, compute_scenario, run_scenario
+from segments import segment_view
+from visualizations import (
+    create_choropleth_map, create_bar_chart, get_choropleth_deck, get_bar_figure, get_series_traces
+)
+from utils import display_summary_cards
+from tabs import (
+    render_state_rankings_tab,
+    render_growth_analysis_tab,
+    render_state_deep_dive_tab,
+    render_correlation_tab,
+    render_forecast_accuracy_tab,
+    render_model_health_tab,
+    render_raw_data_tab
+)
+
+# Number of forecast series in each fixture
+BENCHMARK_SIZES = [50, 3000, 50000]
+
+# Stored baseline, written with --save-baseline
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Allowed growth over baseline before a stage counts as a regression
+REGRESSION_TOLERANCE = {
+    'wall_s': 0.25,
+    'peak_alloc_bytes': 0.10,
+    'payload_bytes': 0.05,
+    'max_rss_bytes': 0.15
+}
+
+# Published release in the fixtures, also the latest model version in the model health tables
+FIXTURE_RELEASE_VERSION = "20260105120000"
+
+# Wall-time differences below this are treated as timer noise
+WALL_NOISE_FLOOR_S = 0.02
+
+
+def make_series_ids(n_series):
+    """
+    Build series identifiers: real state codes first, then county-like codes
+
+    Args:
+        n_series (int): Number of series to generate
+
+    Returns:
+        list: Series identifiers
+    """
+    states = sorted(STATE_COORDS)
+    if n_series <= len(states):
+        return states[:n_series]
+    extra = n_series - len(states)
+    return states + [f"{states[i % len(states)]}{i // len(states):04d}" for i in range(extra)]
+
+
+def make_fixture_tables(n_series, periods=FORECAST_PERIODS, seed=0):
+    """
+    Generate fixture tables shaped like the Snowflake forecast outputs
+
+    Args:
+        n_series (int): Number of forecast series
+        periods (int): Forecast periods per series
+        seed (int): Random seed for reproducible fixtures
+
+    Returns:
+        dict: Table name -> pd.DataFrame for each dashboard table
+    """
+    rng = np.random.default_rng(seed)
+    series = np.array(make_series_ids(n_series))
+    ts = pd.date_range("2025-12-01", periods=periods, freq="MS")
+
+    base = rng.uniform(550, 1500, n_series)
+    slope = rng.uniform(-5, 12, n_series)
+    forecast = (base[:, None]
+                + slope[:, None] * np.arange(periods)[None, :]
+                + rng.normal(0, 25, (n_series, periods)))
+    width = rng.uniform(40, 160, (n_series, periods))
+
+    predictions = pd.DataFrame({
+        'SERIES': np.repeat(series, periods),
+        'TS': np.tile(ts, n_series),
+        'FORECAST': forecast.ravel(),
+        'LOWER_BOUND': (forecast - width).ravel(),
+        'UPPER_BOUND': (forecast + width).ravel()
+    })
+
+    # Stored summaries cover the first DEFAULT_FORECAST_HORIZON months, as in the SQL pipeline
+    grouped = predictions[predictions['TS'] < ts[min(DEFAULT_FORECAST_HORIZON, periods) - 1] + pd.DateOffset(months=1)
+                          ].groupby('SERIES', sort=True)
+    summary = pd.DataFrame({
+        'STATE': grouped['TS'].min().index,
+        'FORECAST_START_DATE': grouped['TS'].min().values,
+        'FORECAST_END_DATE': grouped['TS'].max().values,
+        'MEAN_PREMIUM': grouped['FORECAST'].mean().values,
+        'MIN_PREMIUM': grouped['FORECAST'].min().values,
+        'MAX_PREMIUM': grouped['FORECAST'].max().values,
+        'PREMIUM_STDDEV': grouped['FORECAST'].std().values,
+        'AVG_LOWER_BOUND': grouped['LOWER_BOUND'].mean().values,
+        'AVG_UPPER_BOUND': grouped['UPPER_BOUND'].mean().values
+    })
+
+    trailing = summary['MEAN_PREMIUM'].values * rng.uniform(0.85, 1.05, n_series)
+    yoy_growth = pd.DataFrame({
+        'STATE': summary['STATE'].values,
+        'TRAILING_12MO_AVG': trailing,
+        'FORECAST_12MO_AVG': summary['MEAN_PREMIUM'].values,
+        'YOY_GROWTH_PCT': (summary['MEAN_PREMIUM'].values - trailing) / trailing * 100,
+        'MIN_PREMIUM': summary['MIN_PREMIUM'].values,
+        'MAX_PREMIUM': summary['MAX_PREMIUM'].values
+    }).sort_values('STATE').reset_index(drop=True)
+
+    national_summary = pd.DataFrame([compute_national_summary(summary, yoy_growth)])
+
+    mape = rng.gamma(2.0, 2.5, n_series)
+    backtest_metrics = pd.DataFrame({
+        'SERIES': series,
+        'ORIGINS': 6,
+        'HORIZON': DEFAULT_FORECAST_HORIZON,
+        'POINTS': 6 * DEFAULT_FORECAST_HORIZON,
+        'MAPE': mape,
+        'SMAPE': mape * rng.uniform(0.95, 1.05, n_series),
+        'MASE': mape / rng.uniform(3, 6, n_series),
+        'COVERAGE_PCT': rng.uniform(70, 100, n_series)
+    })
+
+    # 36 months of actuals leading up to the forecast
+    history_ts = pd.date_range(end=ts[0] - pd.DateOffset(months=1), periods=36, freq="MS")
+    actual = (base[:, None]
+              - slope[:, None] * np.arange(36, 0, -1)[None, :]
+              + rng.normal(0, 25, (n_series, 36)))
+    history = pd.DataFrame({
+        'SERIES': np.repeat(series, 36),
+        'TS': np.tile(history_ts, n_series),
+        'ACTUAL': actual.ravel()
+    })
+
+    # Segment cube over the states: base cells plus every CUBE() rollup to 'ALL'
+    cube_states = series[:min(n_series, len(STATE_COORDS))]
+    cube_ts = history_ts[-24:]
+    cells = pd.MultiIndex.from_product(
+        [cube_states, ['Carrier A', 'Carrier B', 'Carrier C'], ['6', '12'], ['Personal', 'Commercial'], cube_ts],
+        names=['STATE', 'CARRIER', 'POLICY_TERM', 'BUSINESS_LINE', 'TS']).to_frame(index=False)
+    cells['POLICIES'] = rng.integers(20, 400, len(cells))
+    cells['PREMIUM_SUM'] = cells['POLICIES'] * rng.uniform(500, 1600, len(cells))
+    dims = ['CARRIER', 'POLICY_TERM', 'BUSINESS_LINE']
+    rollups = []
+    for mask in range(1 << len(dims)):
+        kept = [d for i, d in enumerate(dims) if not mask & (1 << i)]
+        rolled = cells.groupby(['STATE', 'TS'] + kept, as_index=False)[['POLICIES', 'PREMIUM_SUM']].sum()
+        rollups.append(rolled.assign(**{d: 'ALL' for d in dims if d not in kept}))
+    cube = pd.concat(rollups, ignore_index=True)
+
+    # Long-layout covariates, one row per state and covariate
+    covariates = pd.DataFrame({
+        'STATE': np.repeat(series, 2),
+        'COVARIATE': np.tile(['LOSS_RATIO', 'POLICIES_12MO'], n_series),
+        'VALUE': np.column_stack([rng.uniform(45, 85, n_series), rng.integers(500, 50000, n_series)]).ravel()
+    })
+
+    # Persisted training outputs: five model versions of evaluation metrics, the latest
+    # version's feature importance and training logs (a few series skipped)
+    versions = [f"2026010{i}120000" for i in range(1, 5)] + [FIXTURE_RELEASE_VERSION]
+    error_metrics = ['MAE', 'MAPE', 'SMAPE']
+    n_eval = len(versions) * n_series * len(error_metrics)
+    evaluation = pd.DataFrame({
+        'MODEL_VERSION': np.repeat(versions, n_series * len(error_metrics)),
+        'SERIES': np.tile(np.repeat(series, len(error_metrics)), len(versions)),
+        'ERROR_METRIC': np.tile(error_metrics, len(versions) * n_series),
+        'METRIC_VALUE': rng.gamma(2.0, 0.05, n_eval),
+        'STANDARD_DEVIATION': rng.gamma(2.0, 0.01, n_eval)
+    })
+    feature_names = ['aggregated_endogenous_trend_features', 'aggregated_endogenous_lag_features',
+                     'POLICY_VOLUME', 'CANCELLATION_RATE', 'SIX_MONTH_TERM_PCT', 'CARRIER_COUNT']
+    importance = pd.DataFrame({
+        'SERIES': np.repeat(series, len(feature_names)),
+        'RANK': np.tile(np.arange(1, len(feature_names) + 1), n_series),
+        'FEATURE_NAME': np.tile(feature_names, n_series),
+        'SCORE': rng.dirichlet(np.ones(len(feature_names)), n_series).ravel()
+    })
+    has_error = rng.random(n_series) < 0.02
+    training_logs = pd.DataFrame({
+        'SERIES': series,
+        'HAS_ERROR': has_error,
+        'ERRORS': np.where(has_error, '["Not enough data to train"]', None),
+        'WARNINGS': None
+    })
+
+    releases = pd.DataFrame({
+        'VERSION': [FIXTURE_RELEASE_VERSION],
+        'MODEL_NAME': [f"INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_model_v{FIXTURE_RELEASE_VERSION}"]
+    })
+
+    return {
+        'forecast_releases': releases,
+        'state_covariates': covariates,
+        'premium_cube_monthly': cube,
+        'premium_history_monthly': history,
+        'premium_forecast_summary': summary,
+        'yoy_growth_all_states': yoy_growth,
+        'premium_predictions': predictions,
+        'national_summary': national_summary,
+        'forecast_backtest_metrics': backtest_metrics,
+        'model_evaluation_metrics': evaluation,
+        'model_feature_importance': importance,
+        'model_training_logs': training_logs
+    }
+
+
+# Rows per batch yielded by FixtureResult.to_pandas_batches()
+FIXTURE_BATCH_ROWS = 100_000
+
+
+class FixtureResult:
+    """Stand-in for a Snowpark DataFrame backed by a fixture table"""
+
+    def __init__(self, frame):
+        self._frame = frame
+
+    def to_pandas(self, statement_params=None):
+        return self._frame.copy()
+
+    def to_pandas_batches(self, statement_params=None):
+        for start in range(0, len(self._frame), FIXTURE_BATCH_ROWS):
+            yield self._frame.iloc[start:start + FIXTURE_BATCH_ROWS].copy()
+
+    def collect(self, statement_params=None):
+        return []
+
+
+class FixtureSession:
+    """Stand-in for a Snowpark session that answers loader queries from fixtures"""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.queries = []
+
+    def sql(self, query, params=None):
+        self.queries.append(query)
+        query_lower = query.lower()
+        if 'information_schema' in query_lower:
+            return FixtureResult(pd.DataFrame({'DATA_VERSION': ['fixture']}))
+        for name, frame in self.tables.items():
+            if name in query_lower:
+                return FixtureResult(frame)
+        return FixtureResult(pd.DataFrame())
+
+
+@contextmanager
+def fixture_session(tables):
+    """
+    Route loader queries to fixture tables for the duration of the block
+
+    Args:
+        tables (dict): Table name -> pd.DataFrame
+
+    Yields:
+        FixtureSession: The session the loaders will receive
+    """
+    session = FixtureSession(tables)
+    original = data_loader.get_active_session
+    data_loader.get_active_session = lambda: session
+    FORECAST_CACHE.clear()
+    try:
+        yield session
+    finally:
+        data_loader.get_active_session = original
+        FORECAST_CACHE.clear()
+        get_data_version.clear()
+        get_map_data.clear()
+        build_rank_index.clear()
+        get_choropleth_deck.clear()
+        get_bar_figure.clear()
+        load_backtest_metrics.clear()
+        load_history.clear()
+        load_cube.clear()
+        load_carriers.clear()
+        fetch_filtered_tables.clear()
+        load_covariates.clear()
+        build_correlations.clear()
+        load_model_health.clear()
+        segment_view.clear()
+        prediction_arrays.clear()
+        compute_scenario.clear()
+        get_series_traces.clear()
+
+
+def _plotly_nbytes(figure_or_data):
+    """Size of the JSON figure spec Streamlit sends for a Plotly chart"""
+    import plotly.io as pio
+    return len(pio.to_json(figure_or_data, validate=False).encode('utf-8'))
+
+
+def _deck_nbytes(deck):
+    """Size of the JSON deck spec Streamlit sends for a PyDeck chart"""
+    return len(deck.to_json().encode('utf-8'))
+
+
+def _arrow_nbytes(data):
+    """Size of the Arrow IPC stream Streamlit sends for a dataframe"""
+    import pyarrow as pa
+    table = pa.Table.from_pandas(pd.DataFrame(data))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+class PayloadRecorder:
+    """
+    Context manager that records bytes handed to Streamlit's heavy elements
+
+    Wraps st.plotly_chart, st.pydeck_chart, st.dataframe and
+    st.download_button, measuring the serialized payload of each call
+    before delegating to the original function.
+    """
+
+    def __init__(self):
+        self.payload_bytes = 0
+        self.elements = 0
+        self._originals = {}
+
+    def _wrap(self, name, measure):
+        original = getattr(st, name)
+        self._originals[name] = original
+
+        def recorder(data, *args, **kwargs):
+            self.payload_bytes += measure(data)
+            self.elements += 1
+            return original(data, *args, **kwargs)
+
+        setattr(st, name, recorder)
+
+    def __enter__(self):
+        self._wrap('plotly_chart', _plotly_nbytes)
+        self._wrap('pydeck_chart', _deck_nbytes)
+        self._wrap('dataframe', _arrow_nbytes)
+        self._originals['download_button'] = st.download_button
+
+        def download_recorder(label, data, *args, **kwargs):
+            payload = data.encode('utf-8') if isinstance(data, str) else data
+            self.payload_bytes += len(payload)
+            self.elements += 1
+            return self._originals['download_button'](label, data, *args, **kwargs)
+
+        st.download_button = download_recorder
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for name, original in self._originals.items():
+            setattr(st, name, original)
+        return False
+
+
+def _max_rss_bytes():
+    """Peak resident set size of this process so far"""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def measure_stage(func, repeats=5):
+    """
+    Measure one benchmark stage
+
+    The stage runs in separate passes so the payload recorder and
+    tracemalloc do not distort the wall-time samples.
+
+    Args:
+        func (callable): Zero-argument stage function
+        repeats (int): Number of timed runs
+
+    Returns:
+        dict: wall_s (fastest run), peak_alloc_bytes, payload_bytes, elements, max_rss_bytes
+    """
+    with PayloadRecorder() as recorder:
+        func()
+
+    # Two traced passes, each after a collection so garbage left by earlier stages does not
+    # count; the lower peak leaves out one-off allocations such as lazily built library caches
+    peaks = []
+    for _ in range(2):
+        gc.collect()
+        tracemalloc.start()
+        func()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    peak_alloc = min(peaks)
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    return {
+        # The fastest run is the least disturbed by other load on the machine
+        'wall_s': min(samples),
+        'peak_alloc_bytes': peak_alloc,
+        'payload_bytes': recorder.payload_bytes,
+        'elements': recorder.elements,
+        'max_rss_bytes': _max_rss_bytes()
+    }
+
+
+def run_size(n_series, repeats=5):
+    """
+    Run every benchmark stage against one fixture size
+
+    Args:
+        n_series (int): Number of forecast series in the fixture
+        repeats (int): Number of timed runs per stage
+
+    Returns:
+        dict: Stage name -> measurement dict
+    """
+    tables = make_fixture_tables(n_series)
+    results = {}
+
+    with fixture_session(tables):
+        data_version = get_data_version(DEFAULT_TABLE)
+
+        def load_cold():
+            FORECAST_CACHE.clear()
+            return load_forecast_data(DEFAULT_TABLE, data_version)
+
+        results['load_forecast_data'] = measure_stage(load_cold, repeats)
+        (forecast_summary, yoy_growth, predictions,
+         national_summary), _ = load_forecast_data(DEFAULT_TABLE, data_version)
+
+        results['display_summary_cards'] = measure_stage(
+            lambda: display_summary_cards(national_summary), repeats)
+        results['prepare_map_data'] = measure_stage(
+            lambda: prepare_map_data(forecast_summary, yoy_growth), repeats)
+        map_data = get_map_data(data_version, forecast_summary, yoy_growth)
+
+        def rank_index_cold():
+            build_rank_index.clear()
+            return build_rank_index(data_version, map_data)
+
+        results['build_rank_index'] = measure_stage(rank_index_cold, repeats)
+        rank_index = build_rank_index(data_version, map_data)
+
+        # A +5% national rate change on the cached arrays, recomputed each time
+        scenario = [{'states': None, 'start': None, 'end': None, 'change_pct': 5.0}]
+
+        def scenario_cold():
+            compute_scenario.clear()
+            return run_scenario(data_version, predictions, yoy_growth, scenario)
+
+        results['run_scenario'] = measure_stage(scenario_cold, repeats)
+
+        # Summary, growth and ranks over the longest horizon instead of the stored one
+        def horizon_cold():
+            compute_scenario.clear()
+            return run_scenario(data_version, predictions, yoy_growth, [], FORECAST_PERIODS)
+
+        results['horizon_slice'] = measure_stage(horizon_cold, repeats)
+
+        # One carrier / term / business line slice of the cached cube
+        cube = load_cube(data_version)
+        segment = (cube['options']['CARRIER'][0], SEGMENT_ALL, cube['options']['BUSINESS_LINE'][0])
+
+        def segment_cold():
+            segment_view.clear()
+            return segment_view(data_version, segment, cube)
+
+        results['segment_view'] = measure_stage(segment_cold, repeats)
+
+        def correlations_cold():
+            build_correlations.clear()
+            return build_correlations(data_version, map_data, load_covariates(data_version))
+
+        results['build_correlations'] = measure_stage(correlations_cold, repeats)
+
+        default_metric = next(iter(METRIC_CONFIG))
+        config = METRIC_CONFIG[default_metric]
+        map_data_clean = map_data.dropna(subset=[config['column'], 'STATE'])
+
+        results['create_choropleth_map'] = measure_stage(
+            lambda: create_choropleth_map(map_data_clean, config, default_metric), repeats)
+        results['create_bar_chart'] = measure_stage(
+            lambda: create_bar_chart(map_data_clean, config, default_metric), repeats)
+
+        tab_stages = {
+            'tab:state_rankings': lambda: render_state_rankings_tab(map_data, rank_index, data_version, cube),
+            'tab:growth_analysis': lambda: render_growth_analysis_tab(
+                yoy_growth, national_summary, map_data, rank_index),
+            'tab:state_deep_dive': lambda: render_state_deep_dive_tab(
+                forecast_summary, yoy_growth, predictions, national_summary, rank_index, data_version,
+                DEFAULT_FORECAST_HORIZON, load_history(data_version)),
+            'tab:correlation': lambda: render_correlation_tab(
+                build_correlations(data_version, map_data, load_covariates(data_version))),
+            'tab:forecast_accuracy': lambda: render_forecast_accuracy_tab(
+                load_backtest_metrics(data_version), data_version),
+            'tab:model_health': lambda: render_model_health_tab(
+                load_model_health(FIXTURE_RELEASE_VERSION), FIXTURE_RELEASE_VERSION),
+            'tab:raw_data': lambda: render_raw_data_tab(forecast_summary, yoy_growth)
+        }
+        for stage, func in tab_stages.items():
+            results[stage] = measure_stage(func, repeats)
+
+    return results
+
+
+def merge_slowest(runs):
+    """
+    Combine repeated benchmark runs into one, keeping the highest value of every metric
+
+    A baseline recorded this way already contains the run-to-run noise of the
+    machine, so ordinary jitter does not count as a regression.
+
+    Args:
+        runs (list): Size -> stage -> measurement dicts
+
+    Returns:
+        dict: Same structure
+    """
+    merged = json.loads(json.dumps(runs[0]))
+    for run in runs[1:]:
+        for size, stages in run.items():
+            for stage, measured in stages.items():
+                reference = merged[size][stage]
+                for metric, value in measured.items():
+                    reference[metric] = max(reference[metric], value)
+    return merged
+
+
+def compare_to_baseline(results, baseline):
+    """
+    Compare benchmark results against a stored baseline
+
+    Args:
+        results (dict): Size -> stage -> measurement
+        baseline (dict): Same structure, loaded from BASELINE_FILE
+
+    Returns:
+        list: Human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+    for size, stages in results.items():
+        for stage, measured in stages.items():
+            reference = baseline.get(size, {}).get(stage)
+            if reference is None:
+                continue
+            for metric, tolerance in REGRESSION_TOLERANCE.items():
+                limit = reference[metric] * (1 + tolerance)
+                if metric == 'wall_s':
+                    limit = max(limit, reference[metric] + WALL_NOISE_FLOOR_S)
+                if measured[metric] > limit:
+                    regressions.append(
+                        f"{size} series / {stage}: {metric} {measured[metric]:,.4g} "
+                        f"> baseline {reference[metric]:,.4g} (+{tolerance:.0%} allowed)"
+                    )
+    return regressions
+
+
+def print_results(results):
+    """Print a compact table of benchmark results"""
+    print(f"{'series':>7}  {'stage':<24} {'wall ms':>10} {'peak alloc MB':>14} "
+          f"{'payload KB':>11} {'max RSS MB':>11}")
+    for size, stages in results.items():
+        for stage, m in stages.items():
+            print(f"{size:>7}  {stage:<24} {m['wall_s'] * 1000:>10.1f} "
+                  f"{m['peak_alloc_bytes'] / 1e6:>14.2f} {m['payload_bytes'] / 1e3:>11.1f} "
+                  f"{m['max_rss_bytes'] / 1e6:>11.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the premium forecasting dashboard")
+    parser.add_argument('--sizes', type=int, nargs='+', default=BENCHMARK_SIZES,
+                        help="Fixture sizes (number of series) to run")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed runs per stage")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Write results as the new baseline instead of comparing")
+    parser.add_argument('--baseline-runs', type=int, default=3,
+                        help="With --save-baseline, runs combined into the baseline (slowest of each metric)")
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help="Exit 0 when there is no baseline to compare to")
+    parser.add_argument('--output', help="Also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    # Bare-mode Streamlit warns about the missing script context on every call
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    runs = []
+    for _ in range(args.baseline_runs if args.save_baseline else 1):
+        runs.append({str(size): run_size(size, args.repeats) for size in args.sizes})
+    results = merge_slowest(runs)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0 if args.allow_missing_baseline else 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+
+    print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
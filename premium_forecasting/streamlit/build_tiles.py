@@ -0,0 +1,138 @@
+"""
+Vector Tile Builder for Insurance Premium Dashboard
+Cuts simplified Mapbox Vector Tiles of county/ZIP3 boundary polygons with
+tippecanoe, one directory per geography level.
+
+Tiles hold geometry, the region id and name, and a dense region index
+only; metric values are loaded per data version by the dashboard and
+joined to the tiles in the browser. Rebuild (and redeploy, since tiles are
+served from the app's static/ folder) only when the boundaries change.
+
+Usage:
+    python build_tiles.py --level County --boundaries counties.geojson
+    python build_tiles.py --level ZIP3 --boundaries zip3.geojson
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from config import GEOGRAPHY_LEVELS
+from geo_tiles import TILE_LAYER, TILE_INFO_FILE, TILE_INDEX_PROPERTY
+
+# Douglas-Peucker tolerance in tile units; higher means smaller tiles
+TILE_SIMPLIFICATION = 10
+
+
+def build_features(boundaries, level_config):
+    """
+    Reduce boundary features to geometry, region id, name and region index
+
+    Args:
+        boundaries (dict): GeoJSON FeatureCollection of region polygons
+        level_config (dict): Geography level from GEOGRAPHY_LEVELS
+
+    Returns:
+        tuple: (list of GeoJSON features, list of region ids in region index order)
+    """
+    id_key = level_config['id_property']
+    name_key = level_config['name_property']
+
+    features, ids, index = [], [], {}
+    for feature in boundaries['features']:
+        region_id = str(feature['properties'].get(id_key, '')).strip().upper()
+        if not region_id:
+            continue
+        # Multi-part regions split across features share one index
+        if region_id not in index:
+            index[region_id] = len(ids)
+            ids.append(region_id)
+        properties = {
+            id_key: region_id,
+            name_key: feature['properties'].get(name_key, region_id),
+            TILE_INDEX_PROPERTY: index[region_id]
+        }
+        features.append({'type': 'Feature', 'properties': properties, 'geometry': feature['geometry']})
+
+    return features, ids
+
+
+def run_tippecanoe(features, output_dir, level_config):
+    """
+    Cut simplified, uncompressed vector tiles for one geography level
+
+    Args:
+        features (list): Output of build_features()
+        output_dir (str): Destination tile directory ({z}/{x}/{y}.pbf)
+        level_config (dict): Geography level from GEOGRAPHY_LEVELS
+
+    Returns:
+        None
+    """
+    if shutil.which('tippecanoe') is None:
+        raise RuntimeError("tippecanoe is not installed (https://github.com/felt/tippecanoe)")
+
+    with tempfile.NamedTemporaryFile('w', suffix='.geojsonseq', delete=False) as f:
+        for feature in features:
+            f.write(json.dumps(feature) + "\n")
+        features_path = f.name
+
+    try:
+        subprocess.run([
+            'tippecanoe',
+            '--output-to-directory', output_dir,
+            '--layer', TILE_LAYER,
+            '--minimum-zoom', str(level_config['min_zoom']),
+            '--maximum-zoom', str(level_config['max_zoom']),
+            f'--simplification={TILE_SIMPLIFICATION}',
+            '--detect-shared-borders',
+            # Static file serving sends no Content-Encoding header, so tiles stay raw
+            '--no-tile-compression',
+            '--force',
+            features_path
+        ], check=True)
+    finally:
+        os.remove(features_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build vector tiles for the tiled choropleth map")
+    parser.add_argument('--level', required=True,
+                        choices=[name for name, cfg in GEOGRAPHY_LEVELS.items() if cfg['source'] == 'tiles'])
+    parser.add_argument('--boundaries', required=True, help="GeoJSON FeatureCollection of region polygons")
+    args = parser.parse_args(argv)
+
+    level_config = GEOGRAPHY_LEVELS[args.level]
+    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), level_config['tile_dir'])
+
+    with open(args.boundaries) as f:
+        boundaries = json.load(f)
+
+    features, ids = build_features(boundaries, level_config)
+    print(f"{len(features)} {args.level} polygons, {len(ids)} regions")
+
+    run_tippecanoe(features, output_dir, level_config)
+
+    tile_info = {
+        'level': args.level,
+        'features': len(features),
+        'ids': ids,
+        'built_at': datetime.datetime.now(datetime.timezone.utc).isoformat()
+    }
+    with open(os.path.join(output_dir, TILE_INFO_FILE), 'w') as f:
+        json.dump(tile_info, f)
+
+    tile_bytes = sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(output_dir) for name in names if name.endswith('.pbf')
+    )
+    print(f"Tiles written to {output_dir} ({tile_bytes / 1e6:.1f} MB total)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Startup Import Check for Insurance Premium Dashboard
+Reports what the app imports before its first element renders, using
+``python -X importtime``, and fails if any of the app's own modules imports
+a deferred heavy module at module level or the optional time budget is
+exceeded.
+
+The startup set is every module imported at the top of streamlit_app.py;
+the app script itself is not executed. The deferral check reads the app's
+sources (the AST), so a top-level import is caught even when a dependency
+such as Streamlit already loads the module.
+
+Usage:
+    python check_imports.py
+    python check_imports.py --top 30 --budget-ms 1500
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_SCRIPT = os.path.join(APP_DIR, "streamlit_app.py")
+
+# Modules that must only load when the view that needs them renders.
+# plotly is not listed: Streamlit imports it at startup
+# (streamlit.elements.plotly_chart), so deferring it gains nothing
+DEFERRED_MODULES = (
+    'pydeck',
+    'us_states_geojson'
+)
+
+
+def startup_modules(app_script=APP_SCRIPT):
+    """
+    List the modules imported at the top level of the app script
+
+    Args:
+        app_script (str): Path to streamlit_app.py
+
+    Returns:
+        list: Module names in import order
+    """
+    with open(app_script) as f:
+        tree = ast.parse(f.read(), filename=app_script)
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _importtime(code):
+    """Run code in a fresh interpreter under -X importtime and parse its report"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the startup modules failed:\n{result.stderr[-2000:]}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        records.append({
+            'module': name.strip(),
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            # importtime indents nested imports by two spaces per level
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2
+        })
+    return records
+
+
+def measure_imports(modules):
+    """
+    Import modules in a fresh interpreter under -X importtime
+
+    Modules the bare interpreter loads on its own (site, encodings, ...)
+    are left out.
+
+    Args:
+        modules (list): Module names to import
+
+    Returns:
+        list: Dicts with module, self_us, cumulative_us, depth and owner (the
+        top-level import that loaded it), in import order
+    """
+    interpreter = {r['module'] for r in _importtime("pass")}
+    records = _importtime("; ".join(f"import {m}" for m in modules))
+
+    # importtime lists nested imports before their parent: attribute each
+    # module to the top-level import that pulled it in
+    pending = []
+    for r in records:
+        pending.append(r)
+        if r['depth'] == 0:
+            for p in pending:
+                p['owner'] = r['module']
+            pending = []
+    return [r for r in records if r['module'] not in interpreter]
+
+
+def is_app_module(module):
+    """Check whether a top-level module is one of the app's own files"""
+    return os.path.exists(os.path.join(APP_DIR, module.split('.')[0] + ".py"))
+
+
+def _module_level_imports(tree):
+    """Yield (lineno, module) for imports that run when the module is imported"""
+    stack = list(tree.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield node.lineno, alias.name
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            yield node.lineno, node.module
+        else:
+            stack.extend(ast.iter_child_nodes(node))
+
+
+def deferred_violations(modules, deferred=DEFERRED_MODULES, app_dir=APP_DIR):
+    """
+    Find module-level imports of deferred modules in the app's own sources
+
+    Starts from the app modules in the startup set and follows their
+    module-level imports of other app modules. Imports inside functions are
+    allowed; any other import of a deferred package is a violation, whether
+    or not a third-party package happens to load it first.
+
+    Args:
+        modules (list): Startup modules from startup_modules()
+        deferred (tuple): Top-level package names that must not load at startup
+        app_dir (str): Directory holding the app's modules
+
+    Returns:
+        list: "file:line imports module" strings
+    """
+    violations = []
+    seen = set()
+    pending = [m.split('.')[0] for m in modules if is_app_module(m)]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        path = os.path.join(app_dir, name + ".py")
+        with open(path) as f:
+            tree = ast.parse(f.read(), filename=path)
+        for lineno, module in _module_level_imports(tree):
+            if module.split('.')[0] in deferred:
+                violations.append(f"{name}.py:{lineno} imports {module}")
+            elif is_app_module(module):
+                pending.append(module.split('.')[0])
+    return sorted(violations)
+
+
+def deferred_costs(records, deferred=DEFERRED_MODULES):
+    """
+    Cumulative import time of each deferred module on top of the startup set
+
+    Args:
+        records (list): Output of measure_imports() for the startup modules
+            followed by the deferred modules
+        deferred (tuple): Top-level package names kept off the startup path
+
+    Returns:
+        dict: Module -> milliseconds (0 if the startup set already loads it)
+    """
+    costs = {m: 0.0 for m in deferred}
+    for r in records:
+        if r['depth'] == 0 and r['module'] in costs:
+            costs[r['module']] = r['cumulative_us'] / 1000
+    return costs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report and check the dashboard's startup imports")
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest top-level imports to list")
+    parser.add_argument('--budget-ms', type=float, help="Fail if total startup import time exceeds this")
+    args = parser.parse_args(argv)
+
+    modules = startup_modules()
+    # The deferred modules are imported last, so their cost is what they add to startup
+    measured = measure_imports(modules + [m for m in DEFERRED_MODULES if m not in modules])
+    records = [r for r in measured if r.get('owner') not in DEFERRED_MODULES]
+
+    top_level = [r for r in records if r['depth'] == 0]
+    total_ms = sum(r['cumulative_us'] for r in top_level) / 1000
+
+    print(f"Startup imports of streamlit_app.py: {', '.join(modules)}")
+    print(f"{len(records)} modules loaded, {total_ms:,.0f} ms total\n")
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for r in sorted(top_level, key=lambda r: r['cumulative_us'], reverse=True)[:args.top]:
+        print(f"{r['cumulative_us'] / 1000:>14,.1f}  {r['self_us'] / 1000:>8,.1f}  {r['module']}")
+
+    # What the app's own modules pull in directly, e.g. Snowpark under data_loader
+    direct = [r for r in records
+              if r['depth'] == 1 and is_app_module(r.get('owner', '')) and not is_app_module(r['module'])]
+    print("\nSlowest third-party imports made by app modules:")
+    for r in sorted(direct, key=lambda r: r['cumulative_us'], reverse=True)[:5]:
+        print(f"{r['cumulative_us'] / 1000:>14,.1f}  {r['owner']} -> {r['module']}")
+
+    print("\nKept off the startup path (imported on first use):")
+    for module, ms in deferred_costs(measured).items():
+        print(f"{ms:>14,.1f}  {module}" + ("" if ms else "  (already loaded at startup)"))
+
+    failed = False
+    violations = deferred_violations(modules)
+    if violations:
+        failed = True
+        print(f"\n❌ Deferred modules imported at module level: {'; '.join(violations)}")
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failed = True
+        print(f"\n❌ Startup imports took {total_ms:,.0f} ms (budget {args.budget_ms:,.0f} ms)")
+    if not failed:
+        print("\n✅ Startup imports within budget")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -30,9 +30,137 @@ METRIC_CONFIG = {
     }
 }
 
+# Forecast runs write their model and output tables under a version suffix (<table>_v<version>)
+# and publish the version with one INSERT into RELEASE_TABLE; the dashboard reads the latest
+# published version, so a rebuild in progress is never visible. The table names below are the
+# unversioned bases.
+RELEASE_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.forecast_releases"
+# Data versions that name a published release start with this prefix (see releases.py)
+RELEASE_VERSION_PREFIX = "v"
+
 # Default table name for premium forecast data
 DEFAULT_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary"
 
+# Companion tables loaded alongside the forecast summary
+YOY_GROWTH_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.yoy_growth_all_states"
+PREDICTIONS_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.premium_predictions"
+NATIONAL_SUMMARY_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.national_summary"
+
+# Monthly average premium per state, pre-aggregated from the history the model is trained on
+HISTORY_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.premium_history_monthly"
+
+# State x carrier x term x business line x month cube with every rollup materialized;
+# rolled-up dimensions hold SEGMENT_ALL
+CUBE_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.premium_cube_monthly"
+SEGMENT_ALL = "ALL"
+SEGMENT_DIMENSIONS = {
+    'CARRIER': "Carrier",
+    'POLICY_TERM': "Policy Term",
+    'BUSINESS_LINE': "Business Line"
+}
+SEGMENT_CACHE_ENTRIES = 32     # segment views (map data + rank index) kept per process
+
+# Per-state covariates (STATE, COVARIATE, VALUE), e.g. loss ratio, correlated with the
+# premium metrics in the Correlation Analysis tab
+COVARIATES_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.state_covariates"
+
+# Output tables written under each release's version suffix
+RELEASE_OUTPUT_TABLES = (DEFAULT_TABLE, YOY_GROWTH_TABLE, PREDICTIONS_TABLE, NATIONAL_SUMMARY_TABLE,
+                         HISTORY_TABLE, CUBE_TABLE, COVARIATES_TABLE)
+
+# Correlation Analysis (correlations.py): premium metrics in the matrix, scatter plots with
+# a fitted line, and the p-value below which a coefficient is marked significant
+CORRELATION_METRICS = ('MEAN_PREMIUM', 'PREMIUM_STDDEV', 'MIN_PREMIUM', 'MAX_PREMIUM',
+                       'PRICE_RANGE', 'VOLATILITY', 'YOY_GROWTH_PCT')
+CORRELATION_SCATTERS = (
+    ('MEAN_PREMIUM', 'YOY_GROWTH_PCT', 'Mean Premium vs YoY Growth', 'Mean Premium ($)', 'YoY Growth (%)'),
+    ('MEAN_PREMIUM', 'VOLATILITY', 'Mean Premium vs Volatility', 'Mean Premium ($)', 'Volatility (%)')
+)
+CORRELATION_SIGNIFICANCE = 0.05
+
+# Dashboard filters (filters.py) are compiled to SQL predicates; each distinct filter's
+# rows are fetched once and kept per process
+FILTER_CACHE_ENTRIES = 16
+
+# Backtest metrics written by backtest.py, one row per model version and series
+BACKTEST_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.forecast_backtest_metrics"
+
+# Policy-level history the forecast model is trained on
+HISTORY_SOURCE_VIEW = "INSURANCE_ANALYTICS.POLICY_DATA.premium_view_normalized"
+
+# Exogenous state-month features the forecast model is trained with (premium_forecasting_model.sql, Step 1b)
+FEATURES_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.premium_features_monthly"
+
+# Production forecast model; each release trains FORECAST_MODEL_v<version>, and the model version
+# is the release version (the creation time for models trained before releases)
+FORECAST_MODEL = "INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_model"
+
+# Rolling-origin backtest defaults
+BACKTEST_ORIGINS = 6          # forecast origins, one per BACKTEST_ORIGIN_STEP months
+BACKTEST_ORIGIN_STEP = 1      # months between origins
+BACKTEST_HORIZON = 12         # months forecast from each origin
+BACKTEST_SEASON = 12          # seasonal period (months) of the MASE naive benchmark
+BACKTEST_MIN_TRAIN = 24       # months of history required before the first origin
+BACKTEST_NOMINAL_COVERAGE = 95  # prediction interval width produced by SNOWFLAKE.ML.FORECAST (%)
+
+# Model health tables written by premium_forecasting_model.sql, one set of rows per model version
+MODEL_EVALUATION_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.model_evaluation_metrics"
+MODEL_FEATURE_IMPORTANCE_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.model_feature_importance"
+MODEL_TRAINING_LOGS_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.model_training_logs"
+MODEL_HEALTH_VERSIONS = 10      # model versions shown in the quality trend
+MODEL_HEALTH_METRICS = ('MAPE', 'SMAPE', 'MAE')  # headline error metrics (lower is better)
+
+# SQL pipeline runner (pipeline.py): sessions running independent steps concurrently, and the
+# table of step runs (fingerprint, status, timings) used to skip steps whose inputs are unchanged
+PIPELINE_PARALLEL = 4
+PIPELINE_STATE_TABLE = "INSURANCE_ANALYTICS.POLICY_DATA.pipeline_step_runs"
+
+# Streaming retrieval of the predictions table
+# Result chunk size in MB (Snowflake accepts 48-160); bounds the rows held per batch
+PREDICTION_CHUNK_SIZE_MB = 48
+# Forecast timestamps are averaged up to this pandas period ('M' = month); None keeps raw TS
+PREDICTION_TS_GRAIN = 'M'
+
+# Largest absolute error accepted when storing a float column as float32 (half a cent)
+FLOAT32_MAX_ABS_ERROR = 0.005
+
+# How often (seconds) to re-check the published release (or table LAST_ALTERED) for a new data version
+DATA_VERSION_TTL_SECONDS = 60
+
+# Query tag settings for warehouse cost attribution (see cost_report.py)
+QUERY_TAG_APP = "insurance_premium_dashboard"
+QUERY_TAG_PAGE = "main"
+QUERY_TAG_PIPELINE_PAGE = "pipeline"   # page of pipeline.py step queries
+
+# Metric selected when the dashboard opens; its figures are pre-built by the warm-up
+DEFAULT_MAP_METRIC = "Mean Premium"
+
+# Start the background cache warm-up (warmup.py) when the app process starts
+WARMUP_ON_START = True
+
+# Forecast horizon: the pipeline forecasts FORECAST_PERIODS months once; the stored summary,
+# YoY and national tables cover the first DEFAULT_FORECAST_HORIZON months and other horizons
+# are sliced from the cached predictions
+FORECAST_PERIODS = 36
+FORECAST_HORIZONS = (3, 6, 12, 24, 36)
+DEFAULT_FORECAST_HORIZON = 12
+
+# What-if scenarios (scenarios.py)
+SCENARIO_MAX_CHANGE_PCT = 25   # slider range for a rate change, +/- percent
+SCENARIO_CACHE_ENTRIES = 32    # scenario results kept per process
+
+# Timeline downsampling (downsample.py): points per trace, about the chart's pixel width,
+# and the reduction used above it ('lttb' keeps shape, 'minmax' keeps every spike)
+TIMELINE_POINT_BUDGET = 800
+TIMELINE_DOWNSAMPLE = 'lttb'
+
+# Multi-state comparison (State Deep Dive)
+COMPARISON_DEFAULT_STATES = ('CA', 'TX', 'FL', 'NY', 'SD')
+COMPARISON_MAX_SERIES = 10
+# Qualitative palette, assigned by position in the comparison selection (no repeats up to COMPARISON_MAX_SERIES)
+COMPARISON_COLORS = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+                     '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf')
+
 # State coordinates for map visualization (approximate center of each state)
 STATE_COORDS = {
     'AL': [32.806671, -86.791130], 'AK': [61.370716, -152.404419], 'AZ': [33.729759, -111.431221],
@@ -54,6 +182,56 @@ STATE_COORDS = {
     'WI': [44.268543, -89.616508], 'WY': [42.755966, -107.302490]
 }
 
+# US Census regions, used by the region filter
+STATE_REGIONS = {
+    'Northeast': ('CT', 'MA', 'ME', 'NH', 'NJ', 'NY', 'PA', 'RI', 'VT'),
+    'Midwest': ('IA', 'IL', 'IN', 'KS', 'MI', 'MN', 'MO', 'ND', 'NE', 'OH', 'SD', 'WI'),
+    'South': ('AL', 'AR', 'DC', 'DE', 'FL', 'GA', 'KY', 'LA', 'MD', 'MS', 'NC', 'OK', 'SC', 'TN', 'TX',
+              'VA', 'WV'),
+    'West': ('AK', 'AZ', 'CA', 'CO', 'HI', 'ID', 'MT', 'NM', 'NV', 'OR', 'UT', 'WA', 'WY')
+}
+
+# Geography levels for the choropleth map
+# 'State' uses the embedded US_STATES_GEOJSON; finer levels use pre-built vector
+# tiles (see build_tiles.py) so the browser only fetches tiles in view. Tiles hold
+# geometry only; values_table (summary columns keyed by region id in STATE) is
+# loaded per data version and joined to the tiles in the browser.
+# id_pattern is the full-match format of the level's region ids (STATE column values).
+GEOGRAPHY_LEVELS = {
+    "State": {
+        'source': 'geojson',
+        'label': 'State',
+        'plural': 'States',
+        'id_pattern': r'[A-Z]{2}'
+    },
+    "County": {
+        'source': 'tiles',
+        'label': 'County',
+        'plural': 'Counties',
+        'values_table': "INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary_county",
+        'tile_dir': 'static/tiles/county',
+        'tile_url': 'app/static/tiles/county/{z}/{x}/{y}.pbf',
+        'id_property': 'GEOID',
+        'id_pattern': r'\d{5}',
+        'name_property': 'NAME',
+        'min_zoom': 2,
+        'max_zoom': 10
+    },
+    "ZIP3": {
+        'source': 'tiles',
+        'label': 'ZIP3',
+        'plural': 'ZIP3s',
+        'values_table': "INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary_zip3",
+        'tile_dir': 'static/tiles/zip3',
+        'tile_url': 'app/static/tiles/zip3/{z}/{x}/{y}.pbf',
+        'id_property': 'ZIP3',
+        'id_pattern': r'\d{3}',
+        'name_property': 'ZIP3',
+        'min_zoom': 2,
+        'max_zoom': 10
+    }
+}
+
 # App configuration
 APP_CONFIG = {
     'title': '🏠 Insurance Premium Forecasting Dashboard',
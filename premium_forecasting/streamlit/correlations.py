@@ -0,0 +1,155 @@
+"""
+Correlation Statistics for Insurance Premium Dashboard
+Pearson and Spearman matrices with p-values and fitted scatter lines,
+computed once per data version so the Correlation Analysis tab only
+renders precomputed values
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from config import CORRELATION_METRICS, CORRELATION_SCATTERS
+from timing import span
+
+
+def pairwise_counts(values):
+    """
+    Number of rows where both columns of each pair are present
+
+    Args:
+        values (pd.DataFrame): Numeric columns
+
+    Returns:
+        pd.DataFrame: Column x column counts
+    """
+    present = values.notna().to_numpy(dtype=np.float64)
+    return pd.DataFrame(present.T @ present, index=values.columns, columns=values.columns).astype(np.int64)
+
+
+def correlation_pvalues(r, n):
+    """
+    Two-sided p-values of correlation coefficients (t-test with n - 2 degrees of freedom)
+
+    Uses the same approximation as scipy.stats for Spearman's rho.
+
+    Args:
+        r (pd.DataFrame): Correlation matrix
+        n (pd.DataFrame): Pairwise counts from pairwise_counts()
+
+    Returns:
+        pd.DataFrame: p-values shaped like r, NaN where n < 3
+    """
+    from scipy.stats import t as t_dist
+
+    dof = n.to_numpy(dtype=np.float64) - 2
+    rho = np.clip(r.to_numpy(dtype=np.float64), -1.0, 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = rho * np.sqrt(dof / (1.0 - rho ** 2))
+        p = 2 * t_dist.sf(np.abs(t_stat), np.where(dof > 0, dof, np.nan))
+    return pd.DataFrame(p, index=r.index, columns=r.columns)
+
+
+def line_fit(x, y):
+    """
+    Least-squares line through the complete (x, y) pairs
+
+    Args:
+        x, y (pd.Series): Values
+
+    Returns:
+        dict: slope, intercept and the x range to draw, or None with fewer than 2 pairs
+    """
+    complete = x.notna() & y.notna()
+    if complete.sum() < 2:
+        return None
+    xs, ys = x[complete].to_numpy(dtype=np.float64), y[complete].to_numpy(dtype=np.float64)
+    slope, intercept = np.polyfit(xs, ys, 1)
+    return {'slope': float(slope), 'intercept': float(intercept), 'x_range': (xs.min(), xs.max())}
+
+
+def compute_correlations(map_data, covariates=None):
+    """
+    Correlate the premium metrics with each other and with external covariates
+
+    Args:
+        map_data (pd.DataFrame): Output of prepare_map_data()
+        covariates (pd.DataFrame): Output of data_loader.load_covariates(), or None
+
+    Returns:
+        dict: metrics and covariates (column lists), pearson, spearman,
+        pearson_p, spearman_p and n (column x column frames), points (STATE
+        and the scatter columns) and fits (scatter pair -> line_fit())
+    """
+    metrics = [c for c in CORRELATION_METRICS if c in map_data.columns]
+    frame = map_data[['STATE'] + metrics]
+    covariate_cols = []
+    if covariates is not None and len(covariates) > 0:
+        covariate_cols = [c for c in covariates.columns if c != 'STATE']
+        frame = frame.merge(covariates, on='STATE', how='left')
+
+    values = frame[metrics + covariate_cols].astype(np.float64)
+    n = pairwise_counts(values)
+    pearson = values.corr(method='pearson')
+    spearman = values.corr(method='spearman')
+
+    scatter_cols = sorted({c for x, y, *_ in CORRELATION_SCATTERS for c in (x, y) if c in values.columns})
+    fits = {
+        (x, y): line_fit(values[x], values[y])
+        for x, y, *_ in CORRELATION_SCATTERS if x in values.columns and y in values.columns
+    }
+
+    return {
+        'metrics': metrics,
+        'covariates': covariate_cols,
+        'pearson': pearson,
+        'spearman': spearman,
+        'pearson_p': correlation_pvalues(pearson, n),
+        'spearman_p': correlation_pvalues(spearman, n),
+        'n': n,
+        'points': frame[['STATE'] + scatter_cols],
+        'fits': fits
+    }
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+@span("pandas.build_correlations", "pandas")
+def build_correlations(data_version, _map_data, _covariates=None):
+    """
+    Compute correlation statistics once per data version and share them across reruns
+
+    The result is shared across sessions and must be treated as read-only.
+
+    Args:
+        data_version (str): Data version (or horizon/filter view version); the cache key
+        _map_data (pd.DataFrame): Output of get_map_data() (not hashed)
+        _covariates (pd.DataFrame): Output of load_covariates(), or None (not hashed)
+
+    Returns:
+        dict: See compute_correlations()
+    """
+    return compute_correlations(_map_data, _covariates)
+
+
+def covariate_table(correlations):
+    """
+    Long table of premium metric x covariate statistics
+
+    Args:
+        correlations (dict): Output of compute_correlations()
+
+    Returns:
+        pd.DataFrame: METRIC, COVARIATE, PEARSON, PEARSON_P, SPEARMAN, SPEARMAN_P, N
+    """
+    metrics, covariate_cols = correlations['metrics'], correlations['covariates']
+    index = pd.MultiIndex.from_product([metrics, covariate_cols], names=['METRIC', 'COVARIATE'])
+
+    def pick(key):
+        return correlations[key].loc[metrics, covariate_cols].to_numpy().ravel()
+
+    return pd.DataFrame({
+        'PEARSON': pick('pearson'),
+        'PEARSON_P': pick('pearson_p'),
+        'SPEARMAN': pick('spearman'),
+        'SPEARMAN_P': pick('spearman_p'),
+        'N': pick('n')
+    }, index=index).reset_index()
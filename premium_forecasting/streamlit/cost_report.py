@@ -0,0 +1,96 @@
+"""
+Warehouse Cost Attribution Report for Insurance Premium Dashboard
+Summarizes tagged dashboard queries from ACCOUNT_USAGE per dashboard action
+
+Usage:
+    python cost_report.py                         # last 7 days, default connection
+    python cost_report.py --days 30 --connection prod
+"""
+import argparse
+import sys
+
+from config import QUERY_TAG_APP
+
+# ACCOUNT_USAGE views lag real time by up to ~45 minutes (QUERY_HISTORY)
+# and several hours (QUERY_ATTRIBUTION_HISTORY).
+COST_REPORT_QUERY = """
+WITH tagged AS (
+    SELECT
+        query_id,
+        TRY_PARSE_JSON(query_tag) AS tag,
+        total_elapsed_time,
+        bytes_scanned
+    FROM SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY
+    WHERE start_time >= DATEADD(day, -?, CURRENT_TIMESTAMP())
+      AND query_tag LIKE '%' || ? || '%'
+)
+SELECT
+    t.tag:page::STRING AS page,
+    t.tag:tab::STRING AS tab,
+    t.tag:action::STRING AS action,
+    t.tag:cache_miss_reason::STRING AS cache_miss_reason,
+    COUNT(*) AS query_count,
+    COUNT(DISTINCT t.tag:data_version::STRING) AS data_versions,
+    AVG(t.total_elapsed_time) / 1000 AS avg_latency_s,
+    APPROX_PERCENTILE(t.total_elapsed_time, 0.95) / 1000 AS p95_latency_s,
+    SUM(t.bytes_scanned) AS bytes_scanned,
+    SUM(a.credits_attributed_compute) AS credits
+FROM tagged t
+LEFT JOIN SNOWFLAKE.ACCOUNT_USAGE.QUERY_ATTRIBUTION_HISTORY a
+    ON a.query_id = t.query_id
+WHERE t.tag:app::STRING = ?
+GROUP BY ALL
+ORDER BY credits DESC NULLS LAST, query_count DESC
+"""
+
+
+def load_cost_report(session, days=7, app=QUERY_TAG_APP):
+    """
+    Summarize latency, bytes scanned and credits per dashboard action
+
+    Queries too short to be billed individually have no attribution row,
+    so their credits show as NULL.
+
+    Args:
+        session: Snowpark session with access to SNOWFLAKE.ACCOUNT_USAGE
+        days (int): Look-back window in days
+        app (str): Value of the "app" field in the query tag
+
+    Returns:
+        pd.DataFrame: One row per page/tab/action/cache-miss reason
+    """
+    return session.sql(COST_REPORT_QUERY, params=[days, app, app]).to_pandas()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard warehouse cost attribution report")
+    parser.add_argument('--days', type=int, default=7, help="Look-back window in days")
+    parser.add_argument('--connection', default=None,
+                        help="Connection name from connections.toml (default connection if omitted)")
+    parser.add_argument('--output', help="Also write the report to this CSV file")
+    args = parser.parse_args(argv)
+
+    from snowflake.snowpark import Session
+
+    builder = Session.builder
+    if args.connection:
+        builder = builder.config('connection_name', args.connection)
+    session = builder.create()
+
+    try:
+        report = load_cost_report(session, args.days)
+    finally:
+        session.close()
+
+    if report.empty:
+        print(f"No tagged {QUERY_TAG_APP} queries in the last {args.days} days")
+        return 0
+
+    print(report.to_string(index=False))
+    if args.output:
+        report.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
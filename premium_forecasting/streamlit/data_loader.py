@@ -1,90 +1,941 @@
 """
 Data Loading Functions for Insurance Premium Dashboard
 """
+import json
+import threading
+from contextlib import contextmanager
 import streamlit as st
+import numpy as np
 import pandas as pd
 from snowflake.snowpark.context import get_active_session
+from config import (
+    YOY_GROWTH_TABLE,
+    BACKTEST_TABLE,
+    MODEL_EVALUATION_TABLE,
+    MODEL_FEATURE_IMPORTANCE_TABLE,
+    MODEL_TRAINING_LOGS_TABLE,
+    MODEL_HEALTH_VERSIONS,
+    PREDICTIONS_TABLE,
+    NATIONAL_SUMMARY_TABLE,
+    HISTORY_TABLE,
+    CUBE_TABLE,
+    COVARIATES_TABLE,
+    SEGMENT_DIMENSIONS,
+    SEGMENT_ALL,
+    FILTER_CACHE_ENTRIES,
+    PREDICTION_CHUNK_SIZE_MB,
+    PREDICTION_TS_GRAIN,
+    DATA_VERSION_TTL_SECONDS,
+    QUERY_TAG_APP,
+    QUERY_TAG_PAGE,
+    GEOGRAPHY_LEVELS
+)
+from filters import normalize_filters, is_unfiltered, filter_key, compile_filters
+from memory import compact_frame
+from releases import LATEST_RELEASE_QUERY, release_data_version, release_version, versioned_table
+from shared_cache import SharedCache
+from timing import span
 
+# Data version last loaded per cache key, used to explain cache misses
+_LOADED_VERSIONS = {}
 
-@st.cache_data
-def load_forecast_data(forecast_table):
+# Loaded tables per forecast table, shared by every session in the process
+FORECAST_CACHE = SharedCache("forecast_data")
+
+# Serializes temporary session parameter changes on the shared session
+_SESSION_PARAMETER_LOCK = threading.Lock()
+
+
+def build_query_tag(action, tab=None, data_version=None, cache_miss_reason=None):
+    """
+    Build the JSON query tag attached to dashboard queries
+    
+    Args:
+        action (str): Loader action, e.g. "forecast_summary"
+        tab (str): Dashboard tab that needs the data (None for shared loads)
+        data_version (str): Data version being loaded
+        cache_miss_reason (str): Why the cached copy could not be used
+        
+    Returns:
+        str: JSON string for Snowflake's QUERY_TAG
+    """
+    return json.dumps({
+        'app': QUERY_TAG_APP,
+        'page': QUERY_TAG_PAGE,
+        'tab': tab or 'shared',
+        'action': action,
+        'data_version': data_version,
+        'cache_miss_reason': cache_miss_reason
+    })
+
+
+def tag_params(query_tag):
+    """
+    Statement parameters that tag a single query
+    
+    The tag travels with the statement instead of being set on the session,
+    so loaders running concurrently on the shared session (background
+    refreshes, the warm-up thread) cannot see or restore each other's tags.
+    
+    Args:
+        query_tag (str): JSON tag from build_query_tag()
+        
+    Returns:
+        dict: statement_params for a Snowpark DataFrame action
+    """
+    return {'QUERY_TAG': query_tag}
+
+
+@contextmanager
+def session_parameter(session, name, value):
+    """
+    Temporarily set a session parameter, restoring the previous value on exit
+    
+    The current value is read with SHOW PARAMETERS first and restored in a
+    finally block (UNSET when it was at its default), and the change is held
+    under a lock so concurrent loaders on the shared session cannot
+    interleave their set/restore pairs. Failures to read or set the
+    parameter are ignored; the block then runs with the session as is.
+    
+    Args:
+        session: Snowpark session
+        name (str): Session parameter name
+        value: Value to set for the duration of the block
+        
+    Yields:
+        None
+    """
+    with _SESSION_PARAMETER_LOCK:
+        try:
+            rows = session.sql(f"SHOW PARAMETERS LIKE '{name}' IN SESSION").collect()
+            current = rows[0].as_dict() if rows else None
+            session.sql(f"ALTER SESSION SET {name} = {value}").collect()
+        except Exception:
+            current = None
+            changed = False
+        else:
+            changed = True
+        try:
+            yield
+        finally:
+            if changed:
+                try:
+                    if current is None or current.get('level') in (None, ''):
+                        session.sql(f"ALTER SESSION UNSET {name}").collect()
+                    else:
+                        session.sql(f"ALTER SESSION SET {name} = {current['value']}").collect()
+                except Exception:
+                    pass
+
+
+def run_query(session, query, query_tag, params=None):
+    """
+    Run a query under a query tag and return the result as pandas
+    
+    Args:
+        session: Snowpark session
+        query (str): SQL to execute
+        query_tag (str): JSON tag from build_query_tag()
+        params (list): Values bound to ? placeholders
+        
+    Returns:
+        pd.DataFrame: Query result
+    """
+    result = session.sql(query, params=params) if params else session.sql(query)
+    return result.to_pandas(statement_params=tag_params(query_tag))
+
+
+def clean_state_codes(codes):
+    """
+    Standardize STATE/SERIES codes: strip quotes and whitespace, uppercase
+    
+    Args:
+        codes (pd.Series): Raw code column
+        
+    Returns:
+        pd.Series: Cleaned codes
+    """
+    return (codes
+            .astype(str)
+            .str.strip()
+            .str.replace('"', '', regex=False)
+            .str.replace("'", '', regex=False)
+            .str.strip()
+            .str.upper())
+
+
+def stream_predictions(session, query, query_tag, params=None):
+    """
+    Stream the predictions table in result batches and aggregate incrementally
+    
+    Each Arrow result batch is cleaned (on its unique SERIES values only),
+    bucketed to PREDICTION_TS_GRAIN and folded into running per-series sums
+    and counts before the next batch is fetched, so the raw result set is
+    never held in memory. Batch size is bounded by PREDICTION_CHUNK_SIZE_MB,
+    set on the session only while the batches are fetched.
+    
+    Args:
+        session: Snowpark session
+        query (str): SELECT returning SERIES, TS, FORECAST, LOWER_BOUND, UPPER_BOUND
+        query_tag (str): JSON tag from build_query_tag()
+        params (list): Values bound to ? placeholders
+        
+    Returns:
+        pd.DataFrame: SERIES (category), TS and float32 FORECAST/LOWER_BOUND/UPPER_BOUND,
+        sorted by SERIES and TS
+    """
+    value_cols = ['FORECAST', 'LOWER_BOUND', 'UPPER_BOUND']
+    
+    totals = None
+    result = session.sql(query, params=params) if params else session.sql(query)
+    # The chunk size applies while batches are fetched; the session's own value is restored after
+    with session_parameter(session, 'CLIENT_RESULT_CHUNK_SIZE', int(PREDICTION_CHUNK_SIZE_MB)):
+        for batch in result.to_pandas_batches(statement_params=tag_params(query_tag)):
+            # Clean each distinct code once instead of every row
+            codes, uniques = pd.factorize(batch['SERIES'])
+            cleaned = clean_state_codes(pd.Series(uniques)).to_numpy()
+            keep = codes >= 0
+            
+            ts = pd.to_datetime(batch['TS'])
+            if PREDICTION_TS_GRAIN:
+                ts = ts.dt.to_period(PREDICTION_TS_GRAIN).dt.start_time
+            
+            partial = pd.DataFrame({
+                'SERIES': cleaned[codes[keep]],
+                'TS': ts.to_numpy()[keep],
+                **{c: batch[c].to_numpy(dtype='float64')[keep] for c in value_cols}
+            }).groupby(['SERIES', 'TS']).agg(['sum', 'count'])
+            del batch
+            
+            totals = partial if totals is None else totals.add(partial, fill_value=0)
+    
+    if totals is None:
+        return pd.DataFrame(columns=['SERIES', 'TS'] + value_cols)
+    
+    predictions = pd.DataFrame(index=totals.index)
+    for col in value_cols:
+        predictions[col] = (totals[(col, 'sum')] / totals[(col, 'count')]).astype('float32')
+    predictions = predictions.reset_index().sort_values(['SERIES', 'TS'], ignore_index=True)
+    predictions['SERIES'] = predictions['SERIES'].astype('category')
+    return predictions
+
+
+def get_cache_miss_reason(cache_key, data_version):
+    """
+    Explain why a cached loader is running and remember the loaded version
+    
+    Args:
+        cache_key (str): Loader cache key (e.g. the forecast table)
+        data_version (str): Data version about to be loaded
+        
+    Returns:
+        str: "cold_start", "data_version_changed" or "cache_evicted"
+    """
+    previous = _LOADED_VERSIONS.get(cache_key)
+    _LOADED_VERSIONS[cache_key] = data_version
+    if previous is None:
+        return "cold_start"
+    if previous != data_version:
+        return "data_version_changed"
+    return "cache_evicted"
+
+
+@st.cache_data(ttl=DATA_VERSION_TTL_SECONDS, show_spinner=False)
+@span("loader.get_data_version", "loader")
+def get_data_version(forecast_table):
+    """
+    Identify the current version of the dashboard tables
+    
+    The version is the published release (e.g. "v20261018120000"), whose
+    versioned output tables every loader reads, so a forecast run in progress
+    is never seen and publishing is the only cache invalidation. Before any
+    release is published it is the latest LAST_ALTERED across the forecast,
+    growth, prediction, national summary, history, cube and covariate tables,
+    so any rebuild or DML produces a new cache key.
+    
+    Args:
+        forecast_table (str): Fully qualified table name for forecast summary
+        
+    Returns:
+        str: Data version string ("unknown" if it cannot be determined)
+    """
+    session = get_active_session()
+    try:
+        with span("snowflake.release", "snowflake"):
+            release = run_query(session, LATEST_RELEASE_QUERY, build_query_tag("release"))
+        if len(release) > 0:
+            data_version = release_data_version(release.iloc[0, 0])
+            if release_version(data_version):
+                return data_version
+    except Exception:
+        pass
+    
+    tables = [forecast_table, YOY_GROWTH_TABLE, PREDICTIONS_TABLE, NATIONAL_SUMMARY_TABLE, HISTORY_TABLE,
+              CUBE_TABLE, COVARIATES_TABLE]
+    database = forecast_table.split('.')[0]
+    names = ", ".join(
+        "'" + ".".join(t.split('.')[-2:]).upper() + "'" for t in tables
+    )
+    
+    version_query = f"""
+    SELECT TO_VARCHAR(MAX(last_altered), 'YYYYMMDDHH24MISSFF3') AS data_version
+    FROM {database}.INFORMATION_SCHEMA.TABLES
+    WHERE table_schema || '.' || table_name IN ({names})
+    """
+    
+    try:
+        with span("snowflake.data_version", "snowflake"):
+            result = run_query(session, version_query, build_query_tag("data_version"))
+        if len(result) > 0 and result.iloc[0, 0] is not None:
+            return str(result.iloc[0, 0])
+    except Exception:
+        pass
+    return "unknown"
+
+
+@span("loader.load_forecast_data", "loader")
+def load_forecast_data(forecast_table, data_version="unknown"):
     """
     Load all forecast-related tables with enhanced error handling
     
+    Results live in FORECAST_CACHE: one compact copy per forecast table for
+    all sessions, loaded once even when many sessions miss at the same
+    time. When the data version moves on, the previous tables keep being
+    served while the new version loads in the background. Callers must
+    treat the tables as read-only and key derived caches on the returned
+    version, not the requested one.
+    
+    Args:
+        forecast_table (str): Fully qualified table name for forecast summary
+        data_version (str): Version from get_data_version()
+        
+    Returns:
+        tuple: ((forecast_summary, yoy_growth, predictions, national_summary),
+        served_data_version)
+    """
+    try:
+        return FORECAST_CACHE.get(forecast_table, data_version, fetch_forecast_tables)
+    except Exception as e:
+        st.error(f"❌ Error loading data: {str(e)}")
+        st.info(f"📋 Tables checked: `{forecast_table}`")
+        return (None, None, None, None), data_version
+
+
+def fetch_forecast_tables(forecast_table, data_version, filters=None):
+    """
+    Query all forecast-related tables (uncached; use load_forecast_data)
+    
+    May run on a background refresh thread, so failures of the main table
+    are raised rather than rendered. Filters are pushed into every query as
+    bound predicates; a filtered load computes its national statistics from
+    the rows it fetched.
+    
     Args:
         forecast_table (str): Fully qualified table name for forecast summary
+        data_version (str): Data version being loaded; selects the release tables
+            and is recorded in query tags
+        filters (tuple): Output of filters.normalize_filters() (None for all rows)
         
     Returns:
-        tuple: (forecast_summary, yoy_growth, predictions_12mo)
+        tuple: (forecast_summary, yoy_growth, predictions, national_summary)
     """
     session = get_active_session()
+    filters = filters or normalize_filters()
+    cache_key = forecast_table if is_unfiltered(filters) else f"{forecast_table}/{filter_key(filters)}"
+    miss_reason = get_cache_miss_reason(cache_key, data_version)
+    state_where, state_params = compile_filters(filters, state="state")
+    series_where, series_params = compile_filters(filters, state="series", ts="ts")
+    
+    def tag(action):
+        return build_query_tag(action, data_version=data_version, cache_miss_reason=miss_reason)
+    
+    # Load forecast summary data
+    summary_query = f"""
+    SELECT * FROM {versioned_table(forecast_table, data_version)}
+    {state_where}
+    ORDER BY state
+    """
+    with span("snowflake.forecast_summary", "snowflake"):
+        forecast_summary = run_query(session, summary_query, tag("forecast_summary"), params=state_params)
     
+    # Clean and standardize STATE column
+    if 'STATE' in forecast_summary.columns:
+        with span("pandas.clean_forecast_summary", "pandas"):
+            forecast_summary['STATE'] = clean_state_codes(forecast_summary['STATE'])
+    
+    # Load YoY growth data
     try:
-        # Load forecast summary data
-        summary_query = f"""
-        SELECT * FROM {forecast_table}
+        growth_query = f"""
+        SELECT * FROM {versioned_table(YOY_GROWTH_TABLE, data_version)}
+        {state_where}
         ORDER BY state
         """
-        forecast_summary = session.sql(summary_query).to_pandas()
-        
-        # Clean and standardize STATE column
-        if 'STATE' in forecast_summary.columns:
-            forecast_summary['STATE'] = (forecast_summary['STATE']
-                                        .astype(str)
-                                        .str.strip()
-                                        .str.replace('"', '', regex=False)
-                                        .str.replace("'", '', regex=False)
-                                        .str.strip()
-                                        .str.upper())
-        
-        # Load YoY growth data
-        try:
-            growth_query = """
-            SELECT * FROM INSURANCE_ANALYTICS.POLICY_DATA.yoy_growth_all_states
-            ORDER BY state
-            """
-            yoy_growth = session.sql(growth_query).to_pandas()
-            
-            if 'STATE' in yoy_growth.columns:
-                yoy_growth['STATE'] = (yoy_growth['STATE']
-                                      .astype(str)
-                                      .str.strip()
-                                      .str.replace('"', '', regex=False)
-                                      .str.replace("'", '', regex=False)
-                                      .str.strip()
-                                      .str.upper())
-        except Exception as e:
-            st.warning(f"⚠️ Could not load YoY growth data: {str(e)}")
-            yoy_growth = None
-        
-        # Load 12-month predictions
+        with span("snowflake.yoy_growth", "snowflake"):
+            yoy_growth = run_query(session, growth_query, tag("yoy_growth"), params=state_params)
+        
+        if 'STATE' in yoy_growth.columns:
+            with span("pandas.clean_yoy_growth", "pandas"):
+                yoy_growth['STATE'] = clean_state_codes(yoy_growth['STATE'])
+    except Exception as e:
+        st.warning(f"⚠️ Could not load YoY growth data: {str(e)}")
+        yoy_growth = None
+    
+    # Load the full-horizon predictions (streamed and aggregated batch by batch;
+    # sorted locally, so no ORDER BY is pushed to the warehouse)
+    try:
+        pred_query = f"""
+        SELECT series, ts, forecast, lower_bound, upper_bound
+        FROM {versioned_table(PREDICTIONS_TABLE, data_version)}
+        {series_where}
+        """
+        with span("snowflake.predictions", "snowflake"):
+            predictions = stream_predictions(session, pred_query, tag("predictions"), params=series_params)
+    except Exception as e:
+        st.warning(f"⚠️ Could not load predictions: {str(e)}")
+        predictions = None
+    
+    # Load pre-aggregated national statistics (single row); it covers every state,
+    # so a filtered load aggregates its own rows below instead
+    national_summary = None
+    if is_unfiltered(filters):
         try:
-            pred_query = """
-            SELECT * FROM INSURANCE_ANALYTICS.POLICY_DATA.premium_predictions_12months
-            ORDER BY series, ts
-            """
-            predictions_12mo = session.sql(pred_query).to_pandas()
-            
-            if 'SERIES' in predictions_12mo.columns:
-                predictions_12mo['SERIES'] = (predictions_12mo['SERIES']
-                                             .astype(str)
-                                             .str.strip()
-                                             .str.replace('"', '', regex=False)
-                                             .str.replace("'", '', regex=False)
-                                             .str.strip()
-                                             .str.upper())
-        except Exception as e:
-            st.warning(f"⚠️ Could not load 12-month predictions: {str(e)}")
-            predictions_12mo = None
-        
-        return forecast_summary, yoy_growth, predictions_12mo
+            national_query = f"SELECT * FROM {versioned_table(NATIONAL_SUMMARY_TABLE, data_version)}"
+            with span("snowflake.national_summary", "snowflake"):
+                national_df = run_query(session, national_query, tag("national_summary"))
+            national_summary = _first_row_as_dict(national_df)
+        except Exception:
+            national_summary = None
+    
+    # Older pipelines have no national_summary table; aggregate once here instead
+    if national_summary is None:
+        with span("pandas.compute_national_summary", "pandas"):
+            national_summary = compute_national_summary(forecast_summary, yoy_growth)
+    
+    # Category-coded keys and float32 values for the long-lived cached copies
+    with span("pandas.compact_frames", "pandas"):
+        compact_frame(forecast_summary)
+        compact_frame(yoy_growth)
+    
+    return forecast_summary, yoy_growth, predictions, national_summary
+
+
+@st.cache_resource(max_entries=FILTER_CACHE_ENTRIES, show_spinner=False)
+@span("loader.fetch_filtered_tables", "loader")
+def fetch_filtered_tables(forecast_table, data_version, key, _filters):
+    """
+    Fetch the rows matching one filter, once per data version and filter key
+    
+    Shared across sessions and read-only, like the unfiltered tables.
+    
+    Args:
+        forecast_table (str): Fully qualified table name for forecast summary
+        data_version (str): Data version; part of the cache key
+        key (str): filter_key() of the filters; part of the cache key
+        _filters (tuple): Output of normalize_filters() (not hashed)
+        
+    Returns:
+        tuple: (forecast_summary, yoy_growth, predictions, national_summary)
+    """
+    return fetch_forecast_tables(forecast_table, data_version, _filters)
+
+
+def load_filtered_data(forecast_table, data_version, filters):
+    """
+    Load forecast tables restricted to a filter, with the filter pushed into the queries
+    
+    Args:
+        forecast_table (str): Fully qualified table name for forecast summary
+        data_version (str): Data version served by load_forecast_data()
+        filters (tuple): Output of normalize_filters()
         
+    Returns:
+        tuple: ((forecast_summary, yoy_growth, predictions, national_summary),
+        view_version) where view_version keys caches derived from the filtered rows
+    """
+    key = filter_key(filters)
+    view_version = f"{data_version}/f{key}"
+    try:
+        return fetch_filtered_tables(forecast_table, data_version, key, filters), view_version
     except Exception as e:
-        st.error(f"❌ Error loading data: {str(e)}")
-        st.info(f"📋 Tables checked: `{forecast_table}`")
-        return None, None, None
+        st.error(f"❌ Error loading filtered data: {str(e)}")
+        return (None, None, None, None), view_version
 
 
+def history_arrays(history):
+    """
+    Lay monthly history out as a series x month array with a per-series index
+    
+    Args:
+        history (pd.DataFrame): SERIES, TS and ACTUAL columns
+        
+    Returns:
+        dict: series, months (datetime64[M]), actual (float32, NaN where a month
+        has no policies) and positions (series code -> row)
+    """
+    codes = clean_state_codes(history['SERIES'])
+    series_codes, series = pd.factorize(codes, sort=True)
+    month_codes, months = pd.factorize(
+        pd.to_datetime(history['TS']).to_numpy().astype('datetime64[M]'), sort=True)
+    
+    actual = np.full((len(series), len(months)), np.nan, dtype=np.float32)
+    actual[series_codes, month_codes] = history['ACTUAL'].to_numpy(dtype=np.float32)
+    return {
+        'series': np.asarray(series, dtype=object),
+        'months': np.asarray(months, dtype='datetime64[M]'),
+        'actual': actual,
+        'positions': {code: row for row, code in enumerate(series)}
+    }
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+@span("loader.load_history", "loader")
+def load_history(data_version):
+    """
+    Load the monthly history table once per data version, in one bulk query
+    
+    Shared across sessions and read-only. Per-state lookups go through the
+    returned positions index, so no state ever triggers its own query.
+    
+    Args:
+        data_version (str): Data version; the cache key and the release whose table is read
+        
+    Returns:
+        dict: Output of history_arrays(), or None if the table is unavailable
+    """
+    session = get_active_session()
+    history_query = f"SELECT series, ts, actual FROM {versioned_table(HISTORY_TABLE, data_version)}"
+    try:
+        with span("snowflake.history", "snowflake"):
+            history = run_query(session, history_query,
+                                build_query_tag("history", tab="state_deep_dive", data_version=data_version))
+    except Exception:
+        return None
+    if len(history) == 0:
+        return None
+    return history_arrays(history)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+@span("loader.load_covariates", "loader")
+def load_covariates(data_version):
+    """
+    Load the per-state covariates once per data version, one column per covariate
+    
+    Args:
+        data_version (str): Data version; the cache key and the release whose table is read
+        
+    Returns:
+        pd.DataFrame: STATE plus one float column per covariate, or None if
+        the table is unavailable
+    """
+    session = get_active_session()
+    covariates_query = f"SELECT state, covariate, value FROM {versioned_table(COVARIATES_TABLE, data_version)}"
+    try:
+        with span("snowflake.covariates", "snowflake"):
+            covariates = run_query(session, covariates_query,
+                                   build_query_tag("covariates", tab="correlation", data_version=data_version))
+    except Exception:
+        return None
+    if len(covariates) == 0:
+        return None
+    
+    covariates['STATE'] = clean_state_codes(covariates['STATE'])
+    covariates['COVARIATE'] = covariates['COVARIATE'].astype(str).str.upper()
+    wide = covariates.pivot_table(index='STATE', columns='COVARIATE', values='VALUE', aggfunc='mean')
+    wide.columns.name = None
+    return wide.astype('float64').reset_index()
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+@span("loader.load_region_values", "loader")
+def load_region_values(geography, data_version):
+    """
+    Load a tiled geography level's forecast summary once per data version
+    
+    The level's tiles hold geometry only; these values are joined to them in
+    the browser, so the County/ZIP3 map follows the current release without
+    rebuilding tiles. The release's copy of the level's values_table is read
+    if it has one, otherwise the unversioned table (region summaries are
+    produced outside premium_forecasting_model.sql).
+    
+    Args:
+        geography (str): Key of GEOGRAPHY_LEVELS with a values_table
+        data_version (str): Data version; the cache key and the release whose table is read
+        
+    Returns:
+        pd.DataFrame: Map data like prepare_map_data() with region ids in STATE,
+        or None if the table is unavailable
+    """
+    table = GEOGRAPHY_LEVELS[geography]['values_table']
+    session = get_active_session()
+    tag = build_query_tag("region_values", tab="state_rankings", data_version=data_version)
+    values = None
+    for source in dict.fromkeys([versioned_table(table, data_version), table]):
+        try:
+            with span("snowflake.region_values", "snowflake"):
+                values = run_query(session, f"SELECT * FROM {source}", tag)
+            break
+        except Exception:
+            continue
+    if values is None or len(values) == 0:
+        return None
+    
+    values['STATE'] = clean_state_codes(values['STATE'])
+    if 'YOY_GROWTH_PCT' not in values.columns:
+        values['YOY_GROWTH_PCT'] = np.nan
+    if 'PRICE_RANGE' not in values.columns:
+        values['PRICE_RANGE'] = values['MAX_PREMIUM'] - values['MIN_PREMIUM']
+    if 'VOLATILITY' not in values.columns:
+        values['VOLATILITY'] = (values['PREMIUM_STDDEV'] / values['MEAN_PREMIUM'] * 100).fillna(0)
+    return values
+
+
+def state_history(history, state):
+    """
+    Months and actuals of one state from history_arrays() output
+    
+    Args:
+        history (dict): Output of load_history()
+        state (str): State code
+        
+    Returns:
+        tuple: (months as datetime64[ns], actual) with empty months dropped, or None
+    """
+    row = history['positions'].get(state) if history is not None else None
+    if row is None:
+        return None
+    actual = history['actual'][row]
+    present = ~np.isnan(actual)
+    return history['months'][present].astype('datetime64[ns]'), actual[present]
+
+
+def cube_index(cube):
+    """
+    Compact the segment cube and index its rows by segment
+    
+    Args:
+        cube (pd.DataFrame): STATE, CARRIER, POLICY_TERM, BUSINESS_LINE, TS,
+            POLICIES and PREMIUM_SUM columns
+        
+    Returns:
+        dict: frame (STATE, TS, POLICIES, PREMIUM_SUM), groups ((carrier, term,
+        business line) -> row positions), options (dimension -> values other
+        than SEGMENT_ALL), pinned (dimensions without SEGMENT_ALL rows, i.e.
+        fixed by a pushed-down filter) and last_month
+    """
+    dims = list(SEGMENT_DIMENSIONS)
+    keys = cube[dims].astype(str)
+    groups = {key: rows for key, rows in keys.groupby(dims, sort=False).indices.items()}
+    
+    frame = pd.DataFrame({
+        'STATE': clean_state_codes(cube['STATE']).astype('category'),
+        'TS': pd.to_datetime(cube['TS']).to_numpy().astype('datetime64[M]'),
+        'POLICIES': cube['POLICIES'].to_numpy(dtype=np.int32),
+        'PREMIUM_SUM': cube['PREMIUM_SUM'].to_numpy(dtype=np.float64)
+    })
+    options = {dim: sorted(v for v in keys[dim].unique() if v != SEGMENT_ALL) for dim in dims}
+    return {
+        'frame': frame,
+        'groups': groups,
+        'options': options,
+        'pinned': tuple(dim for dim in dims if not (keys[dim] == SEGMENT_ALL).any()),
+        'last_month': frame['TS'].to_numpy().astype('datetime64[M]').max()
+    }
+
+
+@st.cache_resource(max_entries=FILTER_CACHE_ENTRIES, show_spinner=False)
+@span("loader.load_cube", "loader")
+def load_cube(data_version, key="all", _filters=None):
+    """
+    Load the segment cube once per data version and filter, in one bulk query
+    
+    Shared across sessions and read-only. Every segment filter is served from
+    it; no aggregation over raw policies runs in the app or the warehouse.
+    Dashboard filters on state and carrier are pushed into the query.
+    
+    Args:
+        data_version (str): Data version; part of the cache key, selects the release table
+        key (str): filter_key() of the filters; part of the cache key
+        _filters (tuple): Output of normalize_filters() (not hashed; None for all rows)
+        
+    Returns:
+        dict: Output of cube_index(), or None if the table is unavailable
+    """
+    session = get_active_session()
+    where, params = compile_filters(_filters or normalize_filters(), state="state", carrier="carrier")
+    cube_query = f"""
+    SELECT state, carrier, policy_term, business_line, ts, policies, premium_sum
+    FROM {versioned_table(CUBE_TABLE, data_version)}
+    {where}
+    """
+    try:
+        with span("snowflake.cube", "snowflake"):
+            cube = run_query(session, cube_query,
+                             build_query_tag("cube", tab="state_rankings", data_version=data_version),
+                             params=params)
+    except Exception:
+        return None
+    if len(cube) == 0:
+        return None
+    return cube_index(cube)
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+@span("loader.load_carriers", "loader")
+def load_carriers(data_version):
+    """
+    List the carriers offered by the carrier filter
+    
+    Args:
+        data_version (str): Data version; the cache key and the release whose table is read
+        
+    Returns:
+        list: Carrier names in the segment cube (empty if it is unavailable)
+    """
+    session = get_active_session()
+    carrier_query = f"""
+    SELECT DISTINCT carrier
+    FROM {versioned_table(CUBE_TABLE, data_version)}
+    WHERE carrier <> ?
+    ORDER BY carrier
+    """
+    try:
+        carriers = run_query(session, carrier_query, build_query_tag("carriers", data_version=data_version),
+                             params=[SEGMENT_ALL])
+    except Exception:
+        return []
+    if len(carriers) == 0:
+        return []
+    return [str(c) for c in carriers.iloc[:, 0]]
+
+
+@st.cache_data(ttl=DATA_VERSION_TTL_SECONDS, show_spinner=False)
+@span("loader.get_backtest_version", "loader")
+def get_backtest_version():
+    """
+    Find the model version of the most recent backtest run of the production model
+    
+    Baseline runs (stored as ``baseline-<method>`` by backtest.py) are ignored.
+    
+    Returns:
+        str: Model version, or None if no backtest has been stored
+    """
+    session = get_active_session()
+    version_query = f"""
+    SELECT model_version
+    FROM {BACKTEST_TABLE}
+    WHERE model_version NOT LIKE 'baseline-%'
+    ORDER BY computed_at DESC
+    LIMIT 1
+    """
+    try:
+        result = run_query(session, version_query, build_query_tag("backtest_version", tab="forecast_accuracy"))
+        if len(result) > 0:
+            return str(result.iloc[0, 0])
+    except Exception:
+        pass
+    return None
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+@span("loader.load_backtest_metrics", "loader")
+def load_backtest_metrics(model_version):
+    """
+    Load per-series backtest metrics for one model version
+    
+    Metrics only change when backtest.py runs for a new model version,
+    so they are cached per version rather than per data version.
+    
+    Args:
+        model_version (str): Version from get_backtest_version()
+        
+    Returns:
+        pd.DataFrame: SERIES, ORIGINS, HORIZON, POINTS, MAPE, SMAPE, MASE, COVERAGE_PCT
+    """
+    session = get_active_session()
+    metrics_query = f"""
+    SELECT series, origins, horizon, points, mape, smape, mase, coverage_pct
+    FROM {BACKTEST_TABLE}
+    WHERE model_version = ?
+    """
+    tag = build_query_tag("backtest_metrics", tab="forecast_accuracy", data_version=model_version)
+    with span("snowflake.backtest_metrics", "snowflake"):
+        metrics = run_query(session, metrics_query, tag, params=[model_version])
+    if 'SERIES' in metrics.columns:
+        metrics['SERIES'] = clean_state_codes(metrics['SERIES'])
+    return compact_frame(metrics)
+
+
+@st.cache_data(ttl=DATA_VERSION_TTL_SECONDS, show_spinner=False)
+@span("loader.get_model_health_version", "loader")
+def get_model_health_version(data_version=None):
+    """
+    Find the model version whose persisted evaluation metrics the Model Health tab shows
+    
+    That is the published release's model, so a training run in progress is
+    not shown before its forecasts are. Without a release (or when the release
+    came from a baseline forecast) it is the most recent captured version.
+    
+    Args:
+        data_version (str): Data version served by load_forecast_data()
+        
+    Returns:
+        str: Model version, or None if no training run has been captured
+    """
+    session = get_active_session()
+    version_query = f"""
+    SELECT COALESCE(MAX(IFF(model_version = ?, model_version, NULL)), MAX(model_version)) AS model_version
+    FROM {MODEL_EVALUATION_TABLE}
+    """
+    try:
+        result = run_query(session, version_query, build_query_tag("model_health_version", tab="model_health"),
+                           params=[release_version(data_version)])
+        if len(result) > 0 and result.iloc[0, 0] is not None:
+            return str(result.iloc[0, 0])
+    except Exception:
+        pass
+    return None
+
+
+def model_health_frames(evaluation, importance, logs, model_version):
+    """
+    Shape the persisted model outputs for the Model Health tab
+    
+    Args:
+        evaluation (pd.DataFrame): MODEL_VERSION, SERIES, ERROR_METRIC, METRIC_VALUE,
+            STANDARD_DEVIATION for the recent model versions
+        importance (pd.DataFrame): SERIES, RANK, FEATURE_NAME, SCORE of model_version
+        logs (pd.DataFrame): SERIES, HAS_ERROR, ERRORS, WARNINGS of model_version
+        model_version (str): Current model version
+        
+    Returns:
+        dict: trend (version x error metric mean), series (SERIES x error metric
+        of model_version), features (mean score and series count per feature),
+        skipped (series whose training failed, with errors) and series_trained
+    """
+    evaluation['SERIES'] = clean_state_codes(evaluation['SERIES'])
+    evaluation['ERROR_METRIC'] = evaluation['ERROR_METRIC'].astype(str).str.upper()
+    trend = evaluation.pivot_table(index='MODEL_VERSION', columns='ERROR_METRIC',
+                                   values='METRIC_VALUE', aggfunc='mean').sort_index()
+    current = evaluation[evaluation['MODEL_VERSION'] == model_version]
+    series = current.pivot_table(index='SERIES', columns='ERROR_METRIC', values='METRIC_VALUE', aggfunc='mean')
+    
+    features = (importance.groupby('FEATURE_NAME')['SCORE']
+                .agg(MEAN_SCORE='mean', SERIES='count')
+                .sort_values('MEAN_SCORE', ascending=False)
+                .reset_index())
+    
+    logs['SERIES'] = clean_state_codes(logs['SERIES'])
+    skipped = logs[logs['HAS_ERROR'].fillna(False).astype(bool)][['SERIES', 'ERRORS', 'WARNINGS']]
+    
+    return {
+        'trend': trend,
+        'series': series.reset_index(),
+        'features': features,
+        'skipped': skipped.sort_values('SERIES').reset_index(drop=True),
+        'series_trained': int(logs['SERIES'].nunique()) if len(logs) else len(series)
+    }
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+@span("loader.load_model_health", "loader")
+def load_model_health(model_version):
+    """
+    Load evaluation metrics, feature importance and training logs for one model version
+    
+    Evaluation metrics of the previous MODEL_HEALTH_VERSIONS - 1 versions are
+    loaded too, so quality regressions show up as a trend. Cached per model
+    version, like the backtest metrics.
+    
+    Args:
+        model_version (str): Version from get_model_health_version()
+        
+    Returns:
+        dict: Output of model_health_frames()
+    """
+    session = get_active_session()
+    tag = build_query_tag("model_health", tab="model_health", data_version=model_version)
+    
+    evaluation_query = f"""
+    SELECT model_version, series, error_metric, metric_value, standard_deviation
+    FROM {MODEL_EVALUATION_TABLE}
+    WHERE model_version IN (
+        SELECT DISTINCT model_version FROM {MODEL_EVALUATION_TABLE}
+        WHERE model_version <= ?
+        ORDER BY model_version DESC
+        LIMIT {int(MODEL_HEALTH_VERSIONS)}
+    )
+    """
+    importance_query = f"""
+    SELECT series, rank, feature_name, score
+    FROM {MODEL_FEATURE_IMPORTANCE_TABLE}
+    WHERE model_version = ?
+    """
+    logs_query = f"""
+    SELECT series, has_error, TO_VARCHAR(logs:Errors) AS errors, TO_VARCHAR(logs:Warnings) AS warnings
+    FROM {MODEL_TRAINING_LOGS_TABLE}
+    WHERE model_version = ?
+    """
+    with span("snowflake.model_health", "snowflake"):
+        evaluation = run_query(session, evaluation_query, tag, params=[model_version])
+        try:
+            importance = run_query(session, importance_query, tag, params=[model_version])
+        except Exception:
+            importance = pd.DataFrame(columns=['SERIES', 'RANK', 'FEATURE_NAME', 'SCORE'])
+        try:
+            logs = run_query(session, logs_query, tag, params=[model_version])
+        except Exception:
+            logs = pd.DataFrame(columns=['SERIES', 'HAS_ERROR', 'ERRORS', 'WARNINGS'])
+    return model_health_frames(evaluation, importance, logs, model_version)
+
+
+def _first_row_as_dict(df):
+    """Return the first row of a DataFrame as a dict with NaN mapped to None"""
+    if df is None or len(df) == 0:
+        return None
+    return {k: (None if pd.isna(v) else v) for k, v in df.iloc[0].items()}
+
+
+def compute_national_summary(forecast_summary, yoy_growth):
+    """
+    Compute the national_summary row in pandas
+    
+    Mirrors the national_summary table built by premium_forecasting_model.sql
+    and is only used when that table is not available.
+    
+    Args:
+        forecast_summary (pd.DataFrame): Forecast summary data
+        yoy_growth (pd.DataFrame): Year-over-year growth data
+        
+    Returns:
+        dict: National statistics keyed by national_summary column name
+    """
+    volatility = forecast_summary['PREMIUM_STDDEV'] / forecast_summary['MEAN_PREMIUM'] * 100
+    summary = {
+        'STATES_ANALYZED': len(forecast_summary),
+        'NATIONAL_AVG_PREMIUM': forecast_summary['MEAN_PREMIUM'].mean(),
+        'AVG_VOLATILITY_PCT': volatility.mean(),
+        'AVG_YOY_GROWTH_PCT': None,
+        'MEDIAN_YOY_GROWTH_PCT': None,
+        'STDDEV_YOY_GROWTH_PCT': None,
+        'POSITIVE_GROWTH_STATES': 0,
+        'GROWTH_STATES': 0
+    }
+    
+    if yoy_growth is not None and len(yoy_growth) > 0:
+        growth = yoy_growth['YOY_GROWTH_PCT']
+        summary.update({
+            'AVG_YOY_GROWTH_PCT': growth.mean(),
+            'MEDIAN_YOY_GROWTH_PCT': growth.median(),
+            'STDDEV_YOY_GROWTH_PCT': growth.std(),
+            'POSITIVE_GROWTH_STATES': int((growth > 0).sum()),
+            'GROWTH_STATES': len(yoy_growth)
+        })
+    
+    return {k: (None if pd.isna(v) else v) for k, v in summary.items()}
+
+
+@span("pandas.prepare_map_data", "pandas")
 def prepare_map_data(forecast_summary, yoy_growth):
     """
     Prepare and merge data for map visualization
@@ -104,8 +955,9 @@ def prepare_map_data(forecast_summary, yoy_growth):
             how='left'
         )
     else:
-        map_data = forecast_summary.copy()
-        map_data['YOY_GROWTH_PCT'] = 0
+        # Shallow copy: shares column buffers, new columns stay off the cached frame
+        map_data = forecast_summary.copy(deep=False)
+        map_data['YOY_GROWTH_PCT'] = 0.0
     
     # Calculate derived metrics
     map_data['PRICE_RANGE'] = map_data['MAX_PREMIUM'] - map_data['MIN_PREMIUM']
@@ -113,3 +965,35 @@ def prepare_map_data(forecast_summary, yoy_growth):
     
     return map_data
 
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_map_data(data_version, _forecast_summary, _yoy_growth):
+    """
+    Prepare map data once per data version and share it across reruns
+    
+    The returned frame is shared across sessions and must not be mutated.
+    
+    Args:
+        data_version (str): Data version; the cache key
+        _forecast_summary (pd.DataFrame): Forecast summary data (not hashed)
+        _yoy_growth (pd.DataFrame): Year-over-year growth data (not hashed)
+        
+    Returns:
+        pd.DataFrame: Merged and prepared map data
+    """
+    return prepare_map_data(_forecast_summary, _yoy_growth)
+
+
+def valid_region_mask(regions, geography="State"):
+    """
+    Flag region ids in the id format of a geography level
+    
+    Args:
+        regions (pd.Series): STATE column (state codes, county GEOIDs or ZIP3s)
+        geography (str): Key of GEOGRAPHY_LEVELS
+        
+    Returns:
+        pd.Series: Boolean mask, True for ids like CA (State), 06037 (County) or 900 (ZIP3)
+    """
+    pattern = GEOGRAPHY_LEVELS[geography]['id_pattern']
+    return regions.astype(str).str.fullmatch(pattern)
@@ -83,9 +83,18 @@ if [ $? -eq 0 ]; then
     echo "  4. Click to launch the dashboard"
     echo ""
     echo -e "${YELLOW}${BOLD}Required Data Tables:${NC}"
+    echo "  • INSURANCE_ANALYTICS.POLICY_DATA.forecast_releases (published version; tables below are read"
+    echo "    as <table>_v<version>, unversioned until the first release)"
     echo "  • INSURANCE_ANALYTICS.POLICY_DATA.premium_forecast_summary"
     echo "  • INSURANCE_ANALYTICS.POLICY_DATA.yoy_growth_all_states"
-    echo "  • INSURANCE_ANALYTICS.POLICY_DATA.premium_predictions_12months"
+    echo "  • INSURANCE_ANALYTICS.POLICY_DATA.premium_predictions"
+    echo "  • INSURANCE_ANALYTICS.POLICY_DATA.national_summary (optional)"
+    echo "  • INSURANCE_ANALYTICS.POLICY_DATA.premium_history_monthly (optional, actuals overlay)"
+    echo "  • INSURANCE_ANALYTICS.POLICY_DATA.premium_cube_monthly (optional, segment filters)"
+    echo "  • INSURANCE_ANALYTICS.POLICY_DATA.state_covariates (optional, correlation covariates)"
+    echo "  • INSURANCE_ANALYTICS.POLICY_DATA.forecast_backtest_metrics (optional, python backtest.py)"
+    echo "  • INSURANCE_ANALYTICS.POLICY_DATA.model_evaluation_metrics / model_feature_importance /"
+    echo "    model_training_logs (optional, model health)"
     echo ""
     echo -e "${BLUE}${BOLD}Quick Commands:${NC}"
     echo "  # Get app URL:"
@@ -0,0 +1,137 @@
+"""
+Time-series Downsampling for Insurance Premium Dashboard
+Largest-Triangle-Three-Buckets (LTTB) and min-max reduction of long
+timelines to a point budget before they are handed to Plotly
+"""
+import numpy as np
+
+from config import TIMELINE_POINT_BUDGET, TIMELINE_DOWNSAMPLE
+
+
+def _bucket_edges(n, n_buckets):
+    """Split positions 1..n-2 into n_buckets contiguous ranges (first and last points kept apart)"""
+    return np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Pick n_out points that preserve the visual shape of a line (LTTB)
+
+    The first and last points are always kept; each bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the next bucket's average.
+
+    Args:
+        x (np.ndarray): Increasing x values (numeric or datetime64)
+        y (np.ndarray): y values
+        n_out (int): Points to keep (at least 3)
+
+    Returns:
+        np.ndarray: Sorted positions into x and y
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype(np.int64)
+    x = x.astype(np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+
+    edges = _bucket_edges(n, n_out - 2)
+    # Bucket averages, used as the third triangle vertex for the bucket before
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    avg_x = np.append(avg_x, x[-1])
+    avg_y = np.append(avg_y, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        start, stop = edges[b], edges[b + 1]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((x[prev] - avg_x[b + 1]) * (y[start:stop] - y[prev])
+                      - (x[prev] - x[start:stop]) * (avg_y[b + 1] - y[prev]))
+        prev = start + int(np.argmax(area))
+        selected[b + 1] = prev
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Keep the minimum and maximum of each bucket so no spike is lost
+
+    Args:
+        y (np.ndarray): y values
+        n_out (int): Approximate points to keep (two per bucket plus the endpoints)
+
+    Returns:
+        np.ndarray: Sorted, unique positions into y
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = (n_out - 2) // 2
+    edges = _bucket_edges(n, n_buckets)
+    # Pad each bucket to the longest so argmin/argmax run over a 2-D array at once
+    width = int(np.diff(edges).max())
+    offsets = edges[:-1, None] + np.arange(width)[None, :]
+    valid = offsets < edges[1:, None]
+    window = np.where(valid, y[np.minimum(offsets, n - 1)], np.nan)
+
+    filled_low = np.where(np.isnan(window), np.inf, window)
+    filled_high = np.where(np.isnan(window), -np.inf, window)
+    low = edges[:-1] + np.argmin(filled_low, axis=1)
+    high = edges[:-1] + np.argmax(filled_high, axis=1)
+    return np.unique(np.concatenate(([0, n - 1], low, high)))
+
+
+def downsample_band(x, y, lower=None, upper=None, budget=TIMELINE_POINT_BUDGET, method=TIMELINE_DOWNSAMPLE):
+    """
+    Reduce a line and its interval to at most about budget points
+
+    The line keeps the points chosen by LTTB (or min-max); each interval
+    bound takes the envelope (min of lower, max of upper) of the points
+    between consecutive kept points, so the shaded band never shrinks.
+
+    Args:
+        x (array-like): Increasing x values
+        y (array-like): Line values
+        lower, upper (array-like): Interval bounds, or None
+        budget (int): Maximum points per trace, roughly the chart's pixel width
+        method (str): 'lttb' or 'minmax'
+
+    Returns:
+        tuple: (x, y, lower, upper) as NumPy arrays (bounds None when not given)
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if len(y) <= budget:
+        return (x, y,
+                None if lower is None else np.asarray(lower),
+                None if upper is None else np.asarray(upper))
+
+    keep = minmax_indices(y, budget) if method == 'minmax' else lttb_indices(x, y, budget)
+
+    # Envelope of each run of dropped points, attributed to the kept point that starts it
+    band_lower = None if lower is None else np.fmin.reduceat(np.asarray(lower, dtype=np.float64), keep)
+    band_upper = None if upper is None else np.fmax.reduceat(np.asarray(upper, dtype=np.float64), keep)
+    return x[keep], y[keep], band_lower, band_upper
+
+
+def window_bounds(x, start, end):
+    """
+    Positions of the points between start and end (inclusive) in an increasing x
+
+    Args:
+        x (np.ndarray): Increasing x values
+        start, end: Window edges comparable with x
+
+    Returns:
+        slice: Slice selecting the window
+    """
+    return slice(int(np.searchsorted(x, start, side='left')), int(np.searchsorted(x, end, side='right')))
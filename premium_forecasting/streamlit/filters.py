@@ -0,0 +1,113 @@
+"""
+Dashboard Filters for Insurance Premium Dashboard
+A filter model (states, regions, date range, carrier) compiled to SQL
+predicates with bound parameters, so loader queries only return the rows
+a filtered view needs
+"""
+import hashlib
+import json
+
+from config import STATE_REGIONS
+
+
+def normalize_filters(states=None, regions=None, start=None, end=None, carrier=None):
+    """
+    Put dashboard filters in a canonical, hashable form
+
+    Regions expand to their states and are merged with the selected states,
+    so "West" and the thirteen western states are the same filter.
+
+    Args:
+        states (list): State codes (None or empty for all)
+        regions (list): Keys of STATE_REGIONS (None or empty for all)
+        start, end (str): First and last month, 'YYYY-MM' (None for open-ended)
+        carrier (str): Carrier name (None for all)
+
+    Returns:
+        tuple: (states, start, end, carrier) with states a sorted tuple or None
+    """
+    selected = {str(s).strip().upper() for s in states or ()}
+    for region in regions or ():
+        selected.update(STATE_REGIONS[region])
+    return (tuple(sorted(selected)) or None, start or None, end or None, carrier or None)
+
+
+def is_unfiltered(normalized):
+    """Check whether normalized filters select everything"""
+    return all(value is None for value in normalized)
+
+
+def has_date_range(normalized):
+    """Check whether normalized filters restrict the months"""
+    return normalized[1] is not None or normalized[2] is not None
+
+
+def filter_key(normalized):
+    """
+    Hash filters so equal filters share one cache entry
+
+    Args:
+        normalized (tuple): Output of normalize_filters()
+
+    Returns:
+        str: Short hex digest ("all" when nothing is filtered)
+    """
+    if is_unfiltered(normalized):
+        return "all"
+    return hashlib.sha1(json.dumps(normalized).encode()).hexdigest()[:16]
+
+
+def clean_code_sql(column):
+    """SQL mirror of data_loader.clean_state_codes() for a code column"""
+    return f"UPPER(TRIM(REPLACE(REPLACE({column}, '\"', ''), '''', '')))"
+
+
+def compile_filters(normalized, state=None, ts=None, carrier=None):
+    """
+    Compile normalized filters to a WHERE clause with ? placeholders
+
+    Only the filters whose column is given are applied, so one filter can be
+    pushed into tables with different layouts (SERIES vs STATE, no carrier).
+    Values are always bound, never formatted into the SQL.
+
+    Args:
+        normalized (tuple): Output of normalize_filters()
+        state (str): State/series column, or None
+        ts (str): Month timestamp column, or None
+        carrier (str): Carrier column, or None
+
+    Returns:
+        tuple: (clause, params) with clause '' or 'WHERE ...'
+    """
+    states, start, end, carrier_name = normalized
+    predicates, params = [], []
+
+    if state and states:
+        predicates.append(f"{clean_code_sql(state)} IN ({', '.join('?' for _ in states)})")
+        params.extend(states)
+    if ts and start:
+        predicates.append(f"{ts} >= TO_DATE(?, 'YYYY-MM')")
+        params.append(start)
+    if ts and end:
+        predicates.append(f"{ts} < DATEADD(month, 1, TO_DATE(?, 'YYYY-MM'))")
+        params.append(end)
+    if carrier and carrier_name:
+        predicates.append(f"{carrier} = ?")
+        params.append(carrier_name)
+
+    if not predicates:
+        return "", []
+    return "WHERE " + "\n      AND ".join(predicates), params
+
+
+def describe_filters(normalized):
+    """Readable summary of active filters, e.g. '5 states · 2025-01 to 2025-12'"""
+    states, start, end, carrier = normalized
+    parts = []
+    if states:
+        parts.append(f"{len(states)} state{'s' if len(states) != 1 else ''}")
+    if start or end:
+        parts.append(f"{start or '…'} to {end or '…'}")
+    if carrier:
+        parts.append(carrier)
+    return " · ".join(parts) or "No filters"
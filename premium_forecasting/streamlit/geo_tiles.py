@@ -0,0 +1,117 @@
+"""
+Vector Tile Helpers for Insurance Premium Dashboard
+Shared by the tiled choropleth (visualizations.py) and the tile builder (build_tiles.py)
+
+Tiles carry only geometry, the region id and name, and a dense region
+index. Metric values are sent with the page as a packed string (one
+character per region, in region index order) that the colour expression
+indexes in the browser, so tiles are built once per boundary set and the
+values follow the dashboard's data version.
+"""
+import json
+import math
+import os
+
+# Layer name inside every generated tile
+TILE_LAYER = "regions"
+
+# Written next to the tiles by build_tiles.py
+TILE_INFO_FILE = "tiles_info.json"
+
+# Tile property holding the region's position in tiles_info.json 'ids'
+TILE_INDEX_PROPERTY = "REGION_INDEX"
+
+# Fill used for regions without a value
+NO_DATA_COLOR = [200, 200, 200, 100]
+
+# Normalized values are quantized to 0..VALUE_LEVELS and packed as characters
+# from '(' (code 40) to '[' (code 91), a range without quotes or backslashes
+VALUE_LEVELS = 51
+_FIRST_LEVEL_CODE = 40
+
+# Packed character of regions without a value (decodes below zero)
+NO_DATA_CHAR = " "
+
+
+def pack_values(normalized):
+    """
+    Pack 0-1 normalized region values into the string sent with the page
+
+    Args:
+        normalized (iterable): Values in region index order; NaN/None for no data
+
+    Returns:
+        str: One character per region
+    """
+    return "".join(
+        NO_DATA_CHAR if value is None or math.isnan(value)
+        else chr(_FIRST_LEVEL_CODE + int(round(min(max(value, 0.0), 1.0) * VALUE_LEVELS)))
+        for value in normalized
+    )
+
+
+def value_expression(packed):
+    """
+    Build a deck.gl expression decoding a tile feature's normalized value
+
+    Args:
+        packed (str): Output of pack_values()
+
+    Returns:
+        str: Expression evaluating to 0-1, or a negative number for no data
+    """
+    return (f'(("{packed}".charCodeAt(properties.{TILE_INDEX_PROPERTY}) - {_FIRST_LEVEL_CODE})'
+            f' / {VALUE_LEVELS})')
+
+
+def get_color_expression(color_scale, packed):
+    """
+    Build a deck.gl accessor expression equivalent to get_color_for_scale()
+
+    The expression runs in the browser against each tile feature and looks
+    its value up in the packed string by region index, so switching metric
+    or data version never refetches geometry.
+
+    Args:
+        color_scale (str): Color scale name from METRIC_CONFIG
+        packed (str): Output of pack_values() for the metric
+
+    Returns:
+        str: Accessor expression for get_fill_color
+    """
+    v = value_expression(packed)
+
+    if color_scale == 'Reds':
+        color = f"[255, 255 * (1 - {v} * 0.8), 255 * (1 - {v} * 0.8), 180]"
+    elif color_scale == 'Blues':
+        color = f"[255 * (1 - {v} * 0.8), 255 * (1 - {v} * 0.6), 255, 180]"
+    elif color_scale == 'Oranges':
+        color = f"[255, 255 * (1 - {v} * 0.4), 255 * (1 - {v} * 0.8), 180]"
+    elif color_scale == 'RdYlGn':
+        color = (f"{v} < 0.5 ? [255, 255 * {v} * 2, 0, 180]"
+                 f" : [255 * (1 - ({v} - 0.5) * 2), 255, 0, 180]")
+    elif color_scale == 'RdYlGn_r':
+        color = (f"{v} < 0.5 ? [255 * {v} * 2, 255, 0, 180]"
+                 f" : [255, 255 * (1 - ({v} - 0.5) * 2), 0, 180]")
+    else:
+        distance = f"({v} > 0.5 ? {v} - 0.5 : 0.5 - {v})"
+        color = f"[255 * {v}, 100 * (1 - {distance} * 2), 255 * (1 - {v}), 180]"
+
+    return f"{v} < 0 ? {json.dumps(NO_DATA_COLOR)} : ({color})"
+
+
+def read_tile_info(tile_dir):
+    """
+    Read the tile build info (region ids in index order) for a geography level
+
+    Args:
+        tile_dir (str): Tile directory, relative to the app root
+
+    Returns:
+        dict: Contents of tiles_info.json, or None if tiles have not been built
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), tile_dir, TILE_INFO_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,99 @@
+"""
+Memory Helpers for Insurance Premium Dashboard
+Compact in-app frame representation and per-object memory reporting
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from config import FLOAT32_MAX_ABS_ERROR
+
+
+def compact_frame(df, key_columns=('STATE', 'SERIES')):
+    """
+    Shrink a loaded frame in place: category-coded keys, float32 where precision allows
+
+    A float64 column is downcast only if every value survives the round trip
+    to float32 within FLOAT32_MAX_ABS_ERROR (half a cent by default), so
+    premiums keep their cents while growth rates and ratios lose nothing
+    visible.
+
+    Args:
+        df (pd.DataFrame): Frame to compact (modified and returned)
+        key_columns (tuple): Key columns to store as categoricals
+
+    Returns:
+        pd.DataFrame: The same frame
+    """
+    if df is None:
+        return None
+
+    for col in key_columns:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+
+    for col in df.select_dtypes(include='float64').columns:
+        values = df[col].to_numpy()
+        downcast = values.astype(np.float32)
+        error = np.abs(downcast.astype(np.float64) - values)
+        if len(values) == 0 or np.all(np.isnan(error)) or np.nanmax(error) <= FLOAT32_MAX_ABS_ERROR:
+            df[col] = downcast
+
+    return df
+
+
+def object_nbytes(obj):
+    """
+    Estimate the memory held by a cached object
+
+    Counts pandas frames deeply (including string/categorical payloads),
+    NumPy arrays by buffer size, and dicts/lists/tuples recursively.
+
+    Args:
+        obj: Object to measure
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    if obj is None:
+        return 0
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True, index=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(object_nbytes(k) + object_nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(object_nbytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def memory_report(objects):
+    """
+    Build a memory report for named cached objects
+
+    Args:
+        objects (dict): Name -> cached object
+
+    Returns:
+        pd.DataFrame: OBJECT, TYPE, ROWS, MB and dtype summary, largest first
+    """
+    rows = []
+    for name, obj in objects.items():
+        if isinstance(obj, pd.DataFrame):
+            rows_count = len(obj)
+            dtypes = ", ".join(f"{dtype}×{count}" for dtype, count in obj.dtypes.astype(str).value_counts().items())
+        else:
+            rows_count = len(obj) if hasattr(obj, '__len__') else None
+            dtypes = ""
+        rows.append({
+            'OBJECT': name,
+            'TYPE': type(obj).__name__,
+            'ROWS': rows_count,
+            'MB': round(object_nbytes(obj) / 1e6, 3),
+            'DTYPES': dtypes
+        })
+    return pd.DataFrame(rows).sort_values('MB', ascending=False, ignore_index=True)
@@ -0,0 +1,774 @@
+"""
+SQL Pipeline Runner for Insurance Premium Dashboard
+Runs insurance_analytics_setup.sql and premium_forecasting_model.sql as a
+dependency graph of steps instead of statement by statement in a worksheet.
+
+Steps are marked with comment directives, so the scripts still run top to
+bottom in a worksheet:
+
+    -- @step forecast after train, future_features
+    -- @reads $policy_table
+    -- @versioned
+
+- @step starts a step (it runs after the named steps; steps of scripts that
+  are not loaded are assumed done)
+- @reads names tables the step reads that no step writes, by name or
+  $variable; their LAST_ALTERED is part of the step's fingerprint
+- @versioned marks steps that write objects named by the run version;
+  they all run or all skip, since a release is built as a whole
+
+Everything before a script's first step is its prelude (SET / USE). It is
+applied to each session before the session runs a step of that script. SET
+values that are not literals (e.g. the run version) are evaluated once and
+copied to the other sessions. A SET inside a step is only visible to it.
+
+Independent steps run concurrently on a pool of sessions. A step is skipped
+when its fingerprint matches its last successful run. The fingerprint covers
+the prelude and step SQL, the LAST_ALTERED of its @reads tables and the
+fingerprints of the steps it runs after. Every step's status and timing is
+printed and stored in PIPELINE_STATE_TABLE.
+
+Usage:
+    python pipeline.py                       # forecasting model, default connection
+    python pipeline.py --plan                # show which steps would run, and why
+    python pipeline.py --force --parallel 8 --connection prod
+    python pipeline.py --setup               # also regenerate the synthetic data (recreates the database)
+    python pipeline.py --local               # LocalEngine: no Snowflake, statements are logged
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import PIPELINE_PARALLEL, PIPELINE_STATE_TABLE, QUERY_TAG_APP, QUERY_TAG_PIPELINE_PAGE
+from releases import new_release_version
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+SETUP_SCRIPT = os.path.join(SQL_DIR, "insurance_analytics_setup.sql")
+MODEL_SCRIPT = os.path.join(SQL_DIR, "premium_forecasting_model.sql")
+
+DIRECTIVE = re.compile(r'^\s*--\s*@(\w+)\s*(.*?)\s*$')
+STEP_HEADER = re.compile(r'^(\w+)(?:\s+after\s+(.+))?$', re.I)
+SET_STATEMENT = re.compile(r'^SET\s+(\w+)\s*=\s*(.+?)$', re.I | re.S)
+LITERAL = re.compile(r"^(?:'(?:[^'\\]|''|\\.)*'|-?\d+(?:\.\d+)?)$", re.S)
+
+STATE_DDL = f"""
+CREATE TABLE IF NOT EXISTS {PIPELINE_STATE_TABLE} (
+    run_id VARCHAR,
+    step VARCHAR,
+    script VARCHAR,
+    status VARCHAR,
+    reason VARCHAR,
+    fingerprint VARCHAR,
+    started_s FLOAT,
+    seconds FLOAT,
+    statements INTEGER,
+    error VARCHAR,
+    finished_at TIMESTAMP_NTZ
+)
+"""
+
+# Fingerprint of each step's last successful (or skipped) run
+STATE_QUERY = f"""
+SELECT step, fingerprint
+FROM {PIPELINE_STATE_TABLE}
+WHERE status IN ('ran', 'skipped')
+QUALIFY ROW_NUMBER() OVER (PARTITION BY step ORDER BY finished_at DESC) = 1
+"""
+
+STATE_COLUMNS = ('run_id', 'step', 'script', 'status', 'reason', 'fingerprint',
+                 'started_s', 'seconds', 'statements', 'error')
+
+
+def split_statements(sql):
+    """
+    Split SQL text on semicolons outside strings, quoted identifiers, $$ blocks and comments
+
+    Args:
+        sql (str): Script text
+
+    Returns:
+        list: Statements (with their leading comments); comment-only chunks are dropped
+    """
+    statements, current, has_code = [], [], False
+    i, n = 0, len(sql)
+    while i < n:
+        if sql.startswith('--', i) or sql.startswith('/*', i):
+            if sql[i + 1] == '-':
+                end = sql.find('\n', i)
+                end = n if end == -1 else end
+            else:
+                end = sql.find('*/', i + 2)
+                end = n if end == -1 else end + 2
+            current.append(sql[i:end])
+            i = end
+            continue
+        if sql.startswith('$$', i):
+            end = sql.find('$$', i + 2)
+            end = n if end == -1 else end + 2
+        elif sql[i] in "'\"":
+            quote, end = sql[i], i + 1
+            while end < n:
+                if sql[end] == '\\' and quote == "'":
+                    end += 2
+                elif sql[end] == quote:
+                    if not sql.startswith(quote * 2, end):
+                        break
+                    end += 2
+                else:
+                    end += 1
+            end = min(end + 1, n)
+        elif sql[i] == ';':
+            if has_code:
+                statements.append(''.join(current).strip())
+            current, has_code = [], False
+            i += 1
+            continue
+        else:
+            end = i + 1
+        current.append(sql[i:end])
+        has_code = has_code or not sql[i:end].isspace()
+        i = end
+    if has_code:
+        statements.append(''.join(current).strip())
+    return statements
+
+
+def strip_comment_lines(statement):
+    """Statement without its full-line comments"""
+    return '\n'.join(line for line in statement.splitlines() if not line.lstrip().startswith('--')).strip()
+
+
+def parse_set(statement):
+    """
+    Read a single-variable SET statement
+
+    Returns:
+        tuple: (name, expression), or None for other statements
+    """
+    match = SET_STATEMENT.match(strip_comment_lines(statement))
+    return (match.group(1).lower(), match.group(2).strip()) if match else None
+
+
+def sql_literal(value):
+    """SQL literal for a session variable value read back from a session"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(value)
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def parse_script(path):
+    """
+    Split a script into its prelude and @step sections
+
+    Args:
+        path (str): SQL file
+
+    Returns:
+        dict: name, prelude (statements), prelude_text, variables (literal prelude
+        SETs, name -> value) and steps (dicts in file order with name, script,
+        after, reads, versioned, text and statements)
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path) as f:
+        lines = f.read().splitlines(keepends=True)
+
+    prelude, steps, step = [], [], None
+    for line in lines:
+        directive = DIRECTIVE.match(line)
+        if directive and directive.group(1) == 'step':
+            header = STEP_HEADER.match(directive.group(2))
+            if not header:
+                raise ValueError(f"{path}: malformed step directive: {line.strip()}")
+            after = [d.strip() for d in (header.group(2) or '').split(',') if d.strip()]
+            step = {'name': header.group(1), 'script': name, 'after': after, 'reads': [],
+                    'versioned': False, 'lines': []}
+            steps.append(step)
+        elif directive and directive.group(1) in ('reads', 'versioned'):
+            if step is None:
+                raise ValueError(f"{path}: @{directive.group(1)} before the first @step")
+            if directive.group(1) == 'reads':
+                step['reads'].extend(t.strip() for t in directive.group(2).split(',') if t.strip())
+            else:
+                step['versioned'] = True
+        elif directive:
+            raise ValueError(f"{path}: unknown directive @{directive.group(1)}")
+        (step['lines'] if step else prelude).append(line)
+
+    prelude_text = ''.join(prelude)
+    variables = {}
+    for statement in split_statements(prelude_text):
+        assignment = parse_set(statement)
+        if assignment and LITERAL.match(assignment[1]):
+            value = assignment[1]
+            variables[assignment[0]] = value[1:-1].replace("''", "'") if value.startswith("'") else value
+
+    for step in steps:
+        step['text'] = ''.join(step.pop('lines'))
+        step['statements'] = split_statements(step['text'])
+        resolved = []
+        for table in step['reads']:
+            if table.startswith('$'):
+                if table[1:].lower() not in variables:
+                    raise ValueError(f"{path}: step {step['name']} reads {table}, "
+                                     f"which is not a literal SET in the prelude")
+                table = variables[table[1:].lower()]
+            resolved.append(table.upper())
+        step['reads'] = resolved
+
+    return {
+        'name': name,
+        'prelude': split_statements(prelude_text),
+        'prelude_text': prelude_text,
+        'variables': variables,
+        'steps': steps
+    }
+
+
+def load_pipeline(paths):
+    """
+    Parse scripts into one dependency graph
+
+    Args:
+        paths (list): SQL files, in the order their steps should be listed
+
+    Returns:
+        dict: scripts (name -> parsed script), steps (name -> step) and order
+        (step names, topologically sorted, file order among independent steps)
+
+    Raises:
+        ValueError: Duplicate step names or a dependency cycle
+    """
+    scripts, steps = {}, {}
+    for path in paths:
+        script = parse_script(path)
+        scripts[script['name']] = script
+        for step in script['steps']:
+            if step['name'] in steps:
+                raise ValueError(f"Step {step['name']} is defined twice")
+            steps[step['name']] = step
+
+    # Dependencies on steps of scripts that are not loaded are assumed satisfied
+    for step in steps.values():
+        step['external'] = [d for d in step['after'] if d not in steps]
+        step['after'] = [d for d in step['after'] if d in steps]
+
+    order, placed = [], set()
+    while len(order) < len(steps):
+        ready = [name for name, step in steps.items()
+                 if name not in placed and all(d in placed for d in step['after'])]
+        if not ready:
+            cycle = sorted(set(steps) - placed)
+            raise ValueError(f"Dependency cycle among steps: {', '.join(cycle)}")
+        order.extend(ready)
+        placed.update(ready)
+    return {'scripts': scripts, 'steps': steps, 'order': order}
+
+
+def fingerprint_steps(pipeline, input_versions):
+    """
+    Fingerprint every step from its SQL, inputs and upstream fingerprints
+
+    Args:
+        pipeline (dict): Output of load_pipeline()
+        input_versions (dict): @reads table -> LAST_ALTERED (None if missing)
+
+    Returns:
+        dict: Step name -> 16-character hex digest
+    """
+    fingerprints = {}
+    for name in pipeline['order']:
+        step = pipeline['steps'][name]
+        digest = hashlib.sha1()
+        for part in [pipeline['scripts'][step['script']]['prelude_text'], step['text']]:
+            digest.update(part.encode())
+            digest.update(b'\0')
+        for table in step['reads']:
+            digest.update(f"{table}={input_versions.get(table)}\0".encode())
+        for dep in step['after']:
+            digest.update(fingerprints[dep].encode())
+        fingerprints[name] = digest.hexdigest()[:16]
+    return fingerprints
+
+
+def plan_steps(pipeline, fingerprints, previous, force=False):
+    """
+    Decide which steps run
+
+    A step runs when it is new or its fingerprint changed, when a step it runs
+    after runs, and when any versioned step of its script runs (if it is
+    versioned itself).
+
+    Args:
+        pipeline (dict): Output of load_pipeline()
+        fingerprints (dict): Output of fingerprint_steps()
+        previous (dict): Step name -> fingerprint of its last successful run
+        force (bool): Run every step
+
+    Returns:
+        dict: Step name -> reason ('forced', 'new', 'changed', 'upstream' or
+        'versioned'), or None for steps that are skipped
+    """
+    steps = pipeline['steps']
+    reasons = {}
+    for name in pipeline['order']:
+        if force:
+            reasons[name] = 'forced'
+        elif name not in previous:
+            reasons[name] = 'new'
+        elif previous[name] != fingerprints[name]:
+            reasons[name] = 'changed'
+        else:
+            reasons[name] = None
+
+    changed = True
+    while changed:
+        changed = False
+        for name in pipeline['order']:
+            if reasons[name] is None and any(reasons[d] for d in steps[name]['after']):
+                reasons[name], changed = 'upstream', True
+        for script in pipeline['scripts']:
+            group = [n for n in pipeline['order'] if steps[n]['script'] == script and steps[n]['versioned']]
+            if any(reasons[n] for n in group):
+                for n in group:
+                    if reasons[n] is None:
+                        reasons[n], changed = 'versioned', True
+    return reasons
+
+
+class SnowflakeEngine:
+    """Snowpark sessions from connections.toml, with step state in PIPELINE_STATE_TABLE"""
+
+    def __init__(self, connection=None):
+        """
+        Args:
+            connection (str): Connection name from connections.toml (default connection if None)
+        """
+        self.connection = connection
+
+    def connect(self):
+        from snowflake.snowpark import Session
+
+        builder = Session.builder
+        if self.connection:
+            builder = builder.config('connection_name', self.connection)
+        return builder.create()
+
+    def close(self, session):
+        session.close()
+
+    def execute(self, session, statement):
+        return session.sql(statement).collect()
+
+    def set_query_tag(self, session, query_tag):
+        session.query_tag = query_tag
+
+    def table_versions(self, session, tables):
+        """
+        LAST_ALTERED of fully qualified tables
+
+        Returns:
+            dict: Table -> version string, None for tables (or databases) that do not exist
+        """
+        versions = dict.fromkeys(tables)
+        by_database = {}
+        for table in tables:
+            by_database.setdefault(table.split('.')[0], []).append(table)
+        for database, names in by_database.items():
+            listed = ", ".join("'" + ".".join(t.split('.')[-2:]) + "'" for t in names)
+            query = f"""
+            SELECT table_schema || '.' || table_name, TO_VARCHAR(last_altered, 'YYYYMMDDHH24MISSFF3')
+            FROM {database}.INFORMATION_SCHEMA.TABLES
+            WHERE table_schema || '.' || table_name IN ({listed})
+            """
+            try:
+                rows = session.sql(query).collect()
+            except Exception:
+                continue
+            for schema_table, altered in rows:
+                versions[f"{database}.{schema_table}"] = altered
+        return versions
+
+    def load_state(self, session):
+        try:
+            rows = session.sql(STATE_QUERY).collect()
+        except Exception:
+            return {}
+        return {row[0]: row[1] for row in rows}
+
+    def save_state(self, session, records):
+        if not records:
+            return
+        session.sql(STATE_DDL).collect()
+        placeholders = ", ".join(f"({', '.join('?' for _ in STATE_COLUMNS)}, CURRENT_TIMESTAMP())"
+                                 for _ in records)
+        params = [record.get(column) for record in records for column in STATE_COLUMNS]
+        session.sql(
+            f"INSERT INTO {PIPELINE_STATE_TABLE} ({', '.join(STATE_COLUMNS)}, finished_at) "
+            f"VALUES {placeholders}",
+            params=params
+        ).collect()
+
+
+class LocalEngine:
+    """
+    In-process stand-in for Snowflake, for tests and rehearsals of the runner
+
+    Statements are logged rather than executed, except for what the runner
+    relies on: SET evaluates literals, $variables and || (other expressions
+    keep their SQL text), SELECT $name returns a variable, EXECUTE IMMEDIATE
+    $name runs the variable's statement, and statements that create or
+    modify a table bump its version, reported by table_versions() like
+    LAST_ALTERED. Step state is kept on the engine, so a second run with the
+    same engine skips unchanged steps.
+    """
+
+    WRITES = re.compile(
+        r'^(?:CREATE\s+(?:OR\s+REPLACE\s+)?(?:TRANSIENT\s+|TEMPORARY\s+)?(?:TABLE|VIEW|DATABASE|SCHEMA)\s+'
+        r'(?:IF\s+NOT\s+EXISTS\s+)?|INSERT\s+(?:OVERWRITE\s+)?INTO\s+|MERGE\s+INTO\s+|DELETE\s+FROM\s+|UPDATE\s+)'
+        r'(?:IDENTIFIER\(\s*\$(\w+)\s*\)|([\w.$"]+))', re.I)
+    OPERAND = re.compile(r"\s*('(?:[^']|'')*'|\$\$.*?\$\$|\$\w+|-?\d+(?:\.\d+)?)\s*(\|\||$)", re.S)
+
+    def __init__(self, delay=0.0, fail=(), tables=None):
+        """
+        Args:
+            delay (float): Seconds each non-SET statement takes, to make concurrency visible
+            fail (tuple): Statements containing any of these strings raise RuntimeError
+            tables (dict): Initial table versions, fully qualified name -> int
+        """
+        self.delay = delay
+        self.fail = tuple(fail)
+        self.versions = {name.upper(): version for name, version in (tables or {}).items()}
+        self.log = []
+        self.state = {}
+        self.records = []
+        self._lock = threading.Lock()
+        self._clock = itertools.count(max(self.versions.values(), default=0) + 1)
+        self._sessions = itertools.count(1)
+
+    def connect(self):
+        return {'id': next(self._sessions), 'variables': {}, 'query_tag': None}
+
+    def close(self, session):
+        pass
+
+    def evaluate(self, expression, variables):
+        """Value of a SET expression (literals, $variables and ||), else its SQL text"""
+        values, position = [], 0
+        while position < len(expression):
+            match = self.OPERAND.match(expression, position)
+            if not match or match.end() == position:
+                return expression
+            operand = match.group(1)
+            if operand.startswith('$$'):
+                values.append(operand[2:-2])
+            elif operand.startswith('$'):
+                if operand[1:].lower() not in variables:
+                    raise RuntimeError(f"Session variable '{operand}' does not exist")
+                values.append(variables[operand[1:].lower()])
+            elif operand.startswith("'"):
+                values.append(operand[1:-1].replace("''", "'"))
+            else:
+                values.append(float(operand) if '.' in operand else int(operand))
+            position = match.end()
+        if len(values) == 1:
+            return values[0]
+        return ''.join(str(v) for v in values)
+
+    def execute(self, session, statement):
+        with self._lock:
+            self.log.append((session['id'], statement))
+        if any(marker in statement for marker in self.fail):
+            raise RuntimeError(f"LocalEngine failure injected: {statement.splitlines()[-1][:80]}")
+
+        code = strip_comment_lines(statement)
+        assignment = parse_set(statement)
+        if assignment:
+            session['variables'][assignment[0]] = self.evaluate(assignment[1], session['variables'])
+            return []
+        read_back = re.fullmatch(r'SELECT\s+\$(\w+)', code, re.I)
+        if read_back:
+            name = read_back.group(1).lower()
+            if name not in session['variables']:
+                raise RuntimeError(f"Session variable '${name}' does not exist")
+            return [(session['variables'][name],)]
+        dynamic = re.fullmatch(r'EXECUTE\s+IMMEDIATE\s+\$(\w+)', code, re.I)
+        if dynamic:
+            return self.execute(session, str(session['variables'][dynamic.group(1).lower()]))
+
+        if self.delay:
+            time.sleep(self.delay)
+        write = self.WRITES.match(code)
+        if write:
+            table = session['variables'].get(write.group(1).lower()) if write.group(1) else write.group(2)
+            with self._lock:
+                self.versions[str(table).strip('"').upper()] = next(self._clock)
+        return []
+
+    def set_query_tag(self, session, query_tag):
+        session['query_tag'] = query_tag
+
+    def table_versions(self, session, tables):
+        with self._lock:
+            return {table: self.versions.get(table.upper()) for table in tables}
+
+    def load_state(self, session):
+        return dict(self.state)
+
+    def save_state(self, session, records):
+        with self._lock:
+            self.records.extend(records)
+            for record in records:
+                if record['status'] in ('ran', 'skipped'):
+                    self.state[record['step']] = record['fingerprint']
+
+
+class SessionPool:
+    """
+    Sessions shared by the step threads, each with its scripts' preludes applied
+
+    Non-literal prelude SETs are evaluated on the first session that applies
+    the prelude; the other sessions receive the values as literals, so every
+    session sees the same run version.
+    """
+
+    def __init__(self, engine, scripts):
+        self.engine = engine
+        self.scripts = scripts
+        self.sessions = []
+        self._idle = queue.Queue()
+        self._pins = {}
+        self._pin_lock = threading.Lock()
+
+    def add(self, session):
+        entry = {'session': session, 'preludes': set()}
+        self.sessions.append(entry)
+        return entry
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self.add(self.engine.connect())
+
+    def release(self, entry):
+        self._idle.put(entry)
+
+    def prepare(self, entry, script_name):
+        """Apply a script's prelude to a session once"""
+        if script_name in entry['preludes']:
+            return
+        script = self.scripts[script_name]
+        with self._pin_lock:
+            if script_name not in self._pins:
+                self._pins[script_name] = self._evaluate_prelude(entry['session'], script)
+                entry['preludes'].add(script_name)
+                return
+            pins = self._pins[script_name]
+        for statement in script['prelude']:
+            assignment = parse_set(statement)
+            if assignment and assignment[0] in pins:
+                statement = f"SET {assignment[0]} = {sql_literal(pins[assignment[0]])}"
+            self.engine.execute(entry['session'], statement)
+        entry['preludes'].add(script_name)
+
+    def _evaluate_prelude(self, session, script):
+        pins = {}
+        for statement in script['prelude']:
+            self.engine.execute(session, statement)
+            assignment = parse_set(statement)
+            if assignment and not LITERAL.match(assignment[1]):
+                pins[assignment[0]] = self.engine.execute(session, f"SELECT ${assignment[0]}")[0][0]
+        return pins
+
+    def close(self):
+        for entry in self.sessions:
+            try:
+                self.engine.close(entry['session'])
+            except Exception:
+                pass
+
+
+def run_step(engine, pool, step, run_id, reason, fingerprint, started_at):
+    """
+    Run one step's statements on a pooled session
+
+    Returns:
+        dict: Step record (see STATE_COLUMNS)
+    """
+    entry = pool.acquire()
+    start = time.perf_counter()
+    record = {'step': step['name'], 'script': step['script'], 'reason': reason, 'fingerprint': fingerprint,
+              'run_id': run_id, 'started_s': round(start - started_at, 3), 'statements': 0}
+    try:
+        pool.prepare(entry, step['script'])
+        engine.set_query_tag(entry['session'], json.dumps({
+            'app': QUERY_TAG_APP,
+            'page': QUERY_TAG_PIPELINE_PAGE,
+            'tab': step['script'],
+            'action': step['name'],
+            'data_version': run_id,
+            'cache_miss_reason': reason
+        }))
+        for statement in step['statements']:
+            engine.execute(entry['session'], statement)
+            record['statements'] += 1
+        record['status'] = 'ran'
+    except Exception as e:
+        record['status'] = 'failed'
+        record['error'] = str(e)[:1000]
+    finally:
+        record['seconds'] = round(time.perf_counter() - start, 3)
+        pool.release(entry)
+    return record
+
+
+def run_pipeline(engine, pipeline, parallel=PIPELINE_PARALLEL, force=False, plan_only=False, log=print):
+    """
+    Run the pipeline's steps in dependency order, independent steps concurrently
+
+    A failed step blocks the steps after it; independent branches finish.
+
+    Args:
+        engine: SnowflakeEngine or LocalEngine
+        pipeline (dict): Output of load_pipeline()
+        parallel (int): Most steps (and sessions) running at once
+        force (bool): Run unchanged steps too
+        plan_only (bool): Decide what would run, without running it
+        log (callable): Progress output
+
+    Returns:
+        list: Step records in completion order (status 'ran', 'skipped',
+        'failed', 'blocked' or, with plan_only, 'planned')
+    """
+    steps, order = pipeline['steps'], pipeline['order']
+    run_id = new_release_version()
+    pool = SessionPool(engine, pipeline['scripts'])
+    primary = pool.add(engine.connect())
+    records = []
+    try:
+        reads = sorted({table for step in steps.values() for table in step['reads']})
+        fingerprints = fingerprint_steps(pipeline, engine.table_versions(primary['session'], reads))
+        reasons = plan_steps(pipeline, fingerprints, engine.load_state(primary['session']), force)
+        if plan_only:
+            return [{'step': name, 'script': steps[name]['script'], 'status': 'planned',
+                     'reason': reasons[name], 'fingerprint': fingerprints[name]} for name in order]
+        pool.release(primary)
+
+        started_at = time.perf_counter()
+        done, running, pending = {}, {}, list(order)
+        with ThreadPoolExecutor(max_workers=max(1, parallel), thread_name_prefix='pipeline') as executor:
+            while pending or running:
+                resolved = False
+                for name in [n for n in pending if all(d in done for d in steps[n]['after'])]:
+                    pending.remove(name)
+                    record = {'step': name, 'script': steps[name]['script'], 'run_id': run_id,
+                              'reason': reasons[name], 'fingerprint': fingerprints[name],
+                              'started_s': round(time.perf_counter() - started_at, 3),
+                              'seconds': 0.0, 'statements': 0}
+                    blocked_by = [d for d in steps[name]['after'] if done[d]['status'] in ('failed', 'blocked')]
+                    if blocked_by:
+                        record.update(status='blocked', error=f"after failed step {blocked_by[0]}")
+                    elif reasons[name] is None:
+                        record['status'] = 'skipped'
+                    else:
+                        log(f"▶ {name} ({reasons[name]})")
+                        future = executor.submit(run_step, engine, pool, steps[name], run_id,
+                                                 reasons[name], fingerprints[name], started_at)
+                        running[future] = name
+                        continue
+                    done[name] = record
+                    records.append(record)
+                    log(f"{'-' if record['status'] == 'skipped' else '✗'} {name} {record['status']}"
+                        + (f" ({record['error']})" if record.get('error') else " (unchanged)"))
+                    resolved = True
+                if resolved or not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record = future.result()
+                    done[running.pop(future)] = record
+                    records.append(record)
+                    if record['status'] == 'ran':
+                        log(f"✓ {record['step']} {record['seconds']:.1f}s")
+                    else:
+                        log(f"✗ {record['step']} failed after {record['seconds']:.1f}s: {record['error']}")
+    finally:
+        if records:
+            entry = pool.acquire()
+            try:
+                engine.save_state(entry['session'], records)
+            except Exception as e:
+                log(f"Could not record step state in {PIPELINE_STATE_TABLE}: {e}")
+        pool.close()
+    return records
+
+
+def format_timings(records):
+    """
+    Per-step timing table, in start order
+
+    Args:
+        records (list): Output of run_pipeline()
+
+    Returns:
+        str: Table plus a wall time / step time summary line
+    """
+    lines = [f"{'step':<18}{'status':<10}{'reason':<12}{'start s':>9}{'seconds':>10}{'statements':>12}"]
+    ordered = sorted(records, key=lambda r: (r.get('started_s') or 0, r['step']))
+    for r in ordered:
+        lines.append(f"{r['step']:<18}{r['status']:<10}{r.get('reason') or '-':<12}"
+                     f"{r.get('started_s') or 0:>9.1f}{r.get('seconds') or 0:>10.1f}{r.get('statements') or 0:>12}")
+    wall = max(((r.get('started_s') or 0) + (r.get('seconds') or 0) for r in records), default=0)
+    busy = sum(r.get('seconds') or 0 for r in records)
+    lines.append(f"Wall {wall:.1f}s, step time {busy:.1f}s"
+                 + (f" ({busy / wall:.1f}x concurrency)" if wall > 0 else ""))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the SQL pipeline as a dependency graph of steps")
+    parser.add_argument('scripts', nargs='*', help="SQL scripts (default: premium_forecasting_model.sql)")
+    parser.add_argument('--setup', action='store_true',
+                        help="Run insurance_analytics_setup.sql first (recreates the database and its data)")
+    parser.add_argument('--parallel', type=int, default=PIPELINE_PARALLEL, help="Steps run at once")
+    parser.add_argument('--force', action='store_true', help="Run steps whose inputs are unchanged")
+    parser.add_argument('--plan', action='store_true', help="Show which steps would run and exit")
+    parser.add_argument('--local', action='store_true', help="Use LocalEngine instead of Snowflake")
+    parser.add_argument('--connection', default=None,
+                        help="Connection name from connections.toml (default connection if omitted)")
+    args = parser.parse_args(argv)
+
+    paths = args.scripts or [MODEL_SCRIPT]
+    if args.setup:
+        paths = [SETUP_SCRIPT] + [p for p in paths if os.path.abspath(p) != os.path.abspath(SETUP_SCRIPT)]
+    pipeline = load_pipeline(paths)
+    engine = LocalEngine() if args.local else SnowflakeEngine(args.connection)
+
+    records = run_pipeline(engine, pipeline, args.parallel, args.force, args.plan)
+    if args.plan:
+        for r in records:
+            step = pipeline['steps'][r['step']]
+            after = ", ".join(step['after'] + [f"{d} (external)" for d in step['external']]) or "-"
+            print(f"{'run ' if r['reason'] else 'skip'}  {r['step']:<16} {r['reason'] or 'unchanged':<10} "
+                  f"after {after}")
+        return 0
+
+    print()
+    print(format_timings(records))
+    failed = [r['step'] for r in records if r['status'] in ('failed', 'blocked')]
+    if failed:
+        print(f"Failed or blocked: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
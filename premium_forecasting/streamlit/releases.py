@@ -0,0 +1,113 @@
+"""
+Forecast Releases for Insurance Premium Dashboard
+Versioned output tables and the release pointer the dashboard reads.
+
+premium_forecasting_model.sql (and baseline_forecast.py --write) write every
+output table under the run's version suffix, e.g.
+premium_predictions_v20261018120000, and then publish the run with a single
+INSERT into forecast_releases. Until that INSERT the dashboard keeps reading
+the previous version, so a rebuild never shows a mix of old and new tables.
+The published version is the data version the dashboard caches are keyed on.
+"""
+import datetime
+
+from config import RELEASE_TABLE, RELEASE_VERSION_PREFIX
+
+RELEASE_DDL = f"""
+CREATE TABLE IF NOT EXISTS {RELEASE_TABLE} (
+    version VARCHAR,
+    model_name VARCHAR,
+    source VARCHAR,
+    published_at TIMESTAMP_NTZ
+)
+"""
+
+# Latest published release; publishing an older version again rolls back to it
+LATEST_RELEASE_QUERY = f"""
+SELECT version, model_name
+FROM {RELEASE_TABLE}
+ORDER BY published_at DESC
+LIMIT 1
+"""
+
+
+def new_release_version(now=None):
+    """Version id for a new release: YYYYMMDDHHMMSS, the format of the SQL pipeline's run_version"""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return now.strftime('%Y%m%d%H%M%S')
+
+
+def release_data_version(version):
+    """Data version of a published release, e.g. 'v20261018120000'"""
+    return f"{RELEASE_VERSION_PREFIX}{version}"
+
+
+def release_version(data_version):
+    """
+    Release version id named by a data version
+
+    Args:
+        data_version (str): Output of data_loader.get_data_version()
+
+    Returns:
+        str: Version id, or None when the data version is not a release
+        (no release published yet, so the unversioned tables are read)
+    """
+    if not data_version or not data_version.startswith(RELEASE_VERSION_PREFIX):
+        return None
+    version = data_version[len(RELEASE_VERSION_PREFIX):]
+    return version if version.isdigit() else None
+
+
+def versioned_table(table, data_version):
+    """
+    Name of an output table as of a data version
+
+    Args:
+        table (str): Fully qualified base table name, e.g. PREDICTIONS_TABLE
+        data_version (str): Output of data_loader.get_data_version()
+
+    Returns:
+        str: <table>_v<version> for a release, otherwise table itself
+    """
+    version = release_version(data_version)
+    return f"{table}_v{version}" if version else table
+
+
+def latest_release(session):
+    """
+    Find the published release
+
+    Args:
+        session: Snowpark session
+
+    Returns:
+        tuple: (version, model_name), or None if nothing has been published
+    """
+    try:
+        rows = session.sql(LATEST_RELEASE_QUERY).collect()
+    except Exception:
+        return None
+    if not rows:
+        return None
+    return str(rows[0][0]), rows[0][1]
+
+
+def publish_release(session, version, source, model_name=None):
+    """
+    Point the dashboard at a version whose output tables are all written
+
+    A single INSERT, so readers see either the previous release or this one.
+
+    Args:
+        session: Snowpark session
+        version (str): Version id the output tables were written under
+        source (str): What produced the release, e.g. 'baseline-holt_winters'
+        model_name (str): Fully qualified model trained for the release, if any
+    """
+    session.sql(RELEASE_DDL).collect()
+    session.sql(
+        f"INSERT INTO {RELEASE_TABLE} (version, model_name, source, published_at) "
+        f"SELECT ?, ?, ?, CURRENT_TIMESTAMP()",
+        params=[version, model_name, source]
+    ).collect()
@@ -0,0 +1,279 @@
+"""
+What-if Scenarios for Insurance Premium Dashboard
+Rate-change adjustments and horizon slices applied to the cached prediction
+arrays, with the summary, YoY growth, national statistics and ranks
+recomputed in NumPy
+"""
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from config import SCENARIO_CACHE_ENTRIES
+from data_loader import compute_national_summary, prepare_map_data
+from rankings import compute_rank_index
+from timing import span
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+@span("pandas.prediction_arrays", "pandas")
+def prediction_arrays(data_version, _predictions):
+    """
+    Lay the predictions out as series x month arrays once per data version
+
+    Args:
+        data_version (str): Data version; the cache key
+        _predictions (pd.DataFrame): SERIES, TS, FORECAST, LOWER_BOUND, UPPER_BOUND (not hashed)
+
+    Returns:
+        dict: series (array of codes), months (datetime64[M] array) and
+        forecast/lower/upper float32 arrays of shape (series, months),
+        NaN where a series has no prediction for a month
+    """
+    series_codes, series = pd.factorize(_predictions['SERIES'], sort=True)
+    month_codes, months = pd.factorize(
+        pd.to_datetime(_predictions['TS']).to_numpy().astype('datetime64[M]'), sort=True)
+
+    arrays = {
+        'series': np.asarray(series, dtype=object),
+        'months': np.asarray(months, dtype='datetime64[M]')
+    }
+    for key, column in (('forecast', 'FORECAST'), ('lower', 'LOWER_BOUND'), ('upper', 'UPPER_BOUND')):
+        values = np.full((len(series), len(months)), np.nan, dtype=np.float32)
+        values[series_codes, month_codes] = _predictions[column].to_numpy(dtype=np.float32)
+        arrays[key] = values
+    return arrays
+
+
+def normalize_adjustments(adjustments):
+    """
+    Put scenario adjustments in a canonical, hashable form
+
+    Each adjustment is a dict with states (list of codes, None for all),
+    start and end (first and last month, 'YYYY-MM', None for open-ended)
+    and change_pct. Adjustments compound multiplicatively, so their order
+    does not matter and they are sorted; zero changes are dropped.
+
+    Args:
+        adjustments (list): Adjustment dicts
+
+    Returns:
+        tuple: (states, start, end, change_pct) tuples
+    """
+    normalized = set()
+    for adj in adjustments or ():
+        change = round(float(adj.get('change_pct') or 0.0), 4)
+        if change == 0:
+            continue
+        states = adj.get('states')
+        states = tuple(sorted({str(s).upper() for s in states})) if states else None
+        normalized.add((states, adj.get('start'), adj.get('end'), change))
+    return tuple(sorted(normalized, key=repr))
+
+
+def scenario_key(normalized):
+    """
+    Hash a scenario so equal scenarios share one cache entry
+
+    Args:
+        normalized (tuple): Output of normalize_adjustments()
+
+    Returns:
+        str: Short hex digest ("baseline" when no adjustment changes anything)
+    """
+    if not normalized:
+        return "baseline"
+    return hashlib.sha1(json.dumps(normalized).encode()).hexdigest()[:16]
+
+
+def slice_horizon(arrays, horizon):
+    """
+    Restrict prediction arrays to the first horizon months
+
+    Slices are NumPy views, so no prediction values are copied.
+
+    Args:
+        arrays (dict): Output of prediction_arrays()
+        horizon (int): Months to keep (None keeps all)
+
+    Returns:
+        dict: Same keys as arrays
+    """
+    if horizon is None or horizon >= len(arrays['months']):
+        return arrays
+    return {
+        'series': arrays['series'],
+        'months': arrays['months'][:horizon],
+        **{key: arrays[key][:, :horizon] for key in ('forecast', 'lower', 'upper')}
+    }
+
+
+def scenario_multiplier(arrays, adjustments):
+    """
+    Build the series x month multiplier for a scenario
+
+    Args:
+        arrays (dict): Output of prediction_arrays()
+        adjustments (tuple): Output of normalize_adjustments()
+
+    Returns:
+        np.ndarray: float32 factors shaped like arrays['forecast']
+    """
+    series, months = arrays['series'], arrays['months']
+    multiplier = np.ones((len(series), len(months)), dtype=np.float32)
+    for states, start, end, change_pct in adjustments:
+        rows = np.isin(series, states) if states else np.ones(len(series), dtype=bool)
+        cols = np.ones(len(months), dtype=bool)
+        if start:
+            cols &= months >= np.datetime64(start, 'M')
+        if end:
+            cols &= months <= np.datetime64(end, 'M')
+        multiplier[np.ix_(rows, cols)] *= np.float32(1 + change_pct / 100)
+    return multiplier
+
+
+def summarize_arrays(series, months, forecast, lower, upper):
+    """
+    Aggregate series x month arrays into the premium_forecast_summary layout
+
+    Mirrors the GROUP BY SERIES in premium_forecasting_model.sql.
+
+    Args:
+        series (np.ndarray): Series codes, one per row
+        months (np.ndarray): datetime64[M] months, one per column
+        forecast, lower, upper (np.ndarray): Series x month values, NaN where missing
+
+    Returns:
+        pd.DataFrame: One row per series
+    """
+    present = ~np.isnan(forecast)
+    month_ts = months.astype('datetime64[ns]')
+    first = np.argmax(present, axis=1)
+    last = present.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+
+    return pd.DataFrame({
+        'STATE': series,
+        'FORECAST_START_DATE': month_ts[first],
+        'FORECAST_END_DATE': month_ts[last],
+        'MEAN_PREMIUM': np.nanmean(forecast, axis=1, dtype=np.float64),
+        'MIN_PREMIUM': np.nanmin(forecast, axis=1).astype(np.float64),
+        'MAX_PREMIUM': np.nanmax(forecast, axis=1).astype(np.float64),
+        'PREMIUM_STDDEV': np.nanstd(forecast, axis=1, dtype=np.float64, ddof=1),
+        'AVG_LOWER_BOUND': np.nanmean(lower, axis=1, dtype=np.float64),
+        'AVG_UPPER_BOUND': np.nanmean(upper, axis=1, dtype=np.float64)
+    })
+
+
+def scenario_growth(summary, yoy_growth):
+    """
+    Recompute YoY growth against the stored trailing 12-month averages
+
+    Args:
+        summary (pd.DataFrame): Output of summarize_arrays()
+        yoy_growth (pd.DataFrame): Stored YoY table (supplies TRAILING_12MO_AVG)
+
+    Returns:
+        pd.DataFrame: yoy_growth_all_states layout, or None without trailing averages
+    """
+    if yoy_growth is None or 'TRAILING_12MO_AVG' not in yoy_growth.columns:
+        return None
+
+    trailing = yoy_growth.drop_duplicates('STATE').set_index('STATE')['TRAILING_12MO_AVG']
+    growth = summary[['STATE', 'MEAN_PREMIUM', 'MIN_PREMIUM', 'MAX_PREMIUM']].join(trailing, on='STATE')
+    growth = growth.rename(columns={'MEAN_PREMIUM': 'FORECAST_12MO_AVG'})
+    growth['YOY_GROWTH_PCT'] = ((growth['FORECAST_12MO_AVG'] - growth['TRAILING_12MO_AVG'])
+                                / growth['TRAILING_12MO_AVG'] * 100)
+    growth = growth[growth['YOY_GROWTH_PCT'].notna()]
+    return growth[['STATE', 'TRAILING_12MO_AVG', 'FORECAST_12MO_AVG', 'YOY_GROWTH_PCT',
+                   'MIN_PREMIUM', 'MAX_PREMIUM']].reset_index(drop=True)
+
+
+@st.cache_resource(max_entries=SCENARIO_CACHE_ENTRIES, show_spinner=False)
+@span("pandas.compute_scenario", "pandas")
+def compute_scenario(data_version, key, horizon, _arrays, _yoy_growth, _adjustments):
+    """
+    Apply a scenario and recompute every derived table, once per scenario hash and horizon
+
+    Results are shared across sessions and must be treated as read-only.
+
+    Args:
+        data_version (str): Data version; part of the cache key
+        key (str): scenario_key() of the adjustments; part of the cache key
+        horizon (int): Months summarized (None for all); part of the cache key
+        _arrays (dict): Output of prediction_arrays() (not hashed)
+        _yoy_growth (pd.DataFrame): Stored YoY table (not hashed)
+        _adjustments (tuple): Output of normalize_adjustments() (not hashed)
+
+    Returns:
+        dict: key, months, forecast/lower/upper arrays, forecast_summary, yoy_growth,
+        national_summary, map_data and rank_index for the scenario
+    """
+    arrays = slice_horizon(_arrays, horizon)
+    multiplier = scenario_multiplier(arrays, _adjustments)
+    forecast = arrays['forecast'] * multiplier
+    lower = arrays['lower'] * multiplier
+    upper = arrays['upper'] * multiplier
+
+    summary = summarize_arrays(arrays['series'], arrays['months'], forecast, lower, upper)
+    growth = scenario_growth(summary, _yoy_growth)
+    map_data = prepare_map_data(summary, growth)
+
+    return {
+        'key': key,
+        'months': arrays['months'],
+        'forecast': forecast,
+        'lower': lower,
+        'upper': upper,
+        'forecast_summary': summary,
+        'yoy_growth': growth,
+        'national_summary': compute_national_summary(summary, growth),
+        'map_data': map_data,
+        'rank_index': compute_rank_index(map_data)
+    }
+
+
+def run_scenario(data_version, predictions, yoy_growth, adjustments, horizon=None):
+    """
+    Evaluate a what-if scenario against the cached predictions
+
+    The empty scenario is the baseline, computed the same way so the two
+    compare like for like. Nothing here queries Snowflake.
+
+    Args:
+        data_version (str): Data version the predictions belong to
+        predictions (pd.DataFrame): Cached predictions table
+        yoy_growth (pd.DataFrame): Cached YoY growth table
+        adjustments (list): Adjustment dicts (see normalize_adjustments())
+        horizon (int): Summarize only the first horizon months (None for all)
+
+    Returns:
+        dict: See compute_scenario()
+    """
+    arrays = prediction_arrays(data_version, predictions)
+    normalized = normalize_adjustments(adjustments)
+    return compute_scenario(data_version, scenario_key(normalized), horizon, arrays, yoy_growth, normalized)
+
+
+def available_horizons(data_version, predictions, horizons):
+    """
+    Horizons (months) the cached predictions can serve
+
+    Args:
+        data_version (str): Data version the predictions belong to
+        predictions (pd.DataFrame): Cached predictions table
+        horizons (tuple): Candidate horizons, e.g. FORECAST_HORIZONS
+
+    Returns:
+        list: Candidates no longer than the forecast, or the forecast length
+        itself when it is shorter than every candidate
+    """
+    months = len(prediction_arrays(data_version, predictions)['months'])
+    return [h for h in horizons if h <= months] or [months]
+
+
+def series_position(result, state):
+    """Row of a state in the scenario arrays and summary, or None"""
+    matches = np.flatnonzero(result['forecast_summary']['STATE'].to_numpy() == state)
+    return int(matches[0]) if len(matches) else None
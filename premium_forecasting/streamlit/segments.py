@@ -0,0 +1,104 @@
+"""
+Segment Views for Insurance Premium Dashboard
+Map data and rank index for one carrier / policy term / business line slice
+of the pre-aggregated cube, built from trailing-12-month actuals
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from config import SEGMENT_ALL, SEGMENT_CACHE_ENTRIES
+from data_loader import prepare_map_data
+from rankings import compute_rank_index
+from timing import span
+
+
+def is_all_segments(segment):
+    """Check whether a (carrier, term, business line) segment is the unfiltered total"""
+    return all(value == SEGMENT_ALL for value in segment)
+
+
+def segment_label(segment):
+    """Readable description of a segment, e.g. 'Geico · 6-month term'"""
+    carrier, term, business_line = segment
+    parts = []
+    if carrier != SEGMENT_ALL:
+        parts.append(carrier)
+    if term != SEGMENT_ALL:
+        parts.append(f"{term}-month term")
+    if business_line != SEGMENT_ALL:
+        parts.append(business_line)
+    return " · ".join(parts) or "All segments"
+
+
+def summarize_segment(rows, last_month):
+    """
+    Trailing-12-month premium statistics per state from cube rows
+
+    Monthly averages are sums over policy counts, so rollup rows average
+    correctly. YoY growth compares the trailing 12 months with the 12 before.
+
+    Args:
+        rows (pd.DataFrame): Cube rows of one segment (STATE, TS, POLICIES, PREMIUM_SUM)
+        last_month (np.datetime64): Latest month in the cube
+
+    Returns:
+        tuple: (summary in premium_forecast_summary layout plus POLICIES,
+        growth in yoy_growth_all_states layout)
+    """
+    age = (last_month - rows['TS'].to_numpy().astype('datetime64[M]')).astype(np.int64)
+    trailing = rows[age < 12]
+    prior = rows[(age >= 12) & (age < 24)]
+
+    monthly = trailing.assign(AVG=trailing['PREMIUM_SUM'] / trailing['POLICIES'])
+    grouped = monthly.groupby('STATE', observed=True)
+    totals = grouped[['PREMIUM_SUM', 'POLICIES']].sum()
+    summary = pd.DataFrame({
+        'MEAN_PREMIUM': totals['PREMIUM_SUM'] / totals['POLICIES'],
+        'MIN_PREMIUM': grouped['AVG'].min(),
+        'MAX_PREMIUM': grouped['AVG'].max(),
+        'PREMIUM_STDDEV': grouped['AVG'].std(),
+        'POLICIES': totals['POLICIES']
+    }).rename_axis('STATE').reset_index()
+    summary['STATE'] = summary['STATE'].astype(str)
+
+    prior_totals = prior.groupby('STATE', observed=True)[['PREMIUM_SUM', 'POLICIES']].sum()
+    prior_avg = (prior_totals['PREMIUM_SUM'] / prior_totals['POLICIES']).rename('TRAILING_12MO_AVG')
+    prior_avg.index = prior_avg.index.astype(str)
+    growth = summary[['STATE', 'MEAN_PREMIUM']].join(prior_avg, on='STATE')
+    growth['YOY_GROWTH_PCT'] = ((growth['MEAN_PREMIUM'] - growth['TRAILING_12MO_AVG'])
+                                / growth['TRAILING_12MO_AVG'] * 100)
+    growth = growth[growth['YOY_GROWTH_PCT'].notna()].reset_index(drop=True)
+    return summary, growth
+
+
+@st.cache_resource(max_entries=SEGMENT_CACHE_ENTRIES, show_spinner=False)
+@span("pandas.segment_view", "pandas")
+def segment_view(data_version, segment, _cube):
+    """
+    Build map data and rank index for one segment, once per data version
+
+    Rows come from the cube's segment index, so a filter change slices the
+    cached cube instead of aggregating policies. Results are shared across
+    sessions and must be treated as read-only.
+
+    Args:
+        data_version (str): Data version; part of the cache key
+        segment (tuple): (carrier, term, business line), SEGMENT_ALL for any; part of the cache key
+        _cube (dict): Output of data_loader.load_cube() (not hashed)
+
+    Returns:
+        dict: map_data, rank_index, policies (total in the trailing 12 months)
+        and version (cache key for the prebuilt map and chart)
+    """
+    positions = _cube['groups'].get(tuple(segment), np.array([], dtype=np.int64))
+    rows = _cube['frame'].iloc[positions]
+    summary, growth = summarize_segment(rows, _cube['last_month'])
+    map_data = prepare_map_data(summary, growth)
+
+    return {
+        'map_data': map_data,
+        'rank_index': compute_rank_index(map_data),
+        'policies': int(summary['POLICIES'].sum()),
+        'version': f"{data_version}/segment/{'/'.join(segment)}"
+    }
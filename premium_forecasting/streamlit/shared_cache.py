@@ -0,0 +1,165 @@
+"""
+Shared Data Cache for Insurance Premium Dashboard
+Process-wide cache with single-flight loading and stale-while-revalidate
+"""
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SharedCache:
+    """
+    Process-wide cache holding the latest loaded version of each key
+
+    - Single flight: concurrent sessions asking for the same key and version
+      share one load; the others wait for it instead of querying again.
+    - Stale while revalidate: when a newer version is requested and an older
+      one is cached, the older value is served immediately while a single
+      background thread loads the new version.
+
+    Values are shared by every session and must be treated as read-only.
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name (str): Cache name, used for the background thread name and logs
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        # key -> {'version', 'value', 'loaded_at', 'seq'}
+        self._entries = {}
+        # Flight start order; a slow older load never overwrites a newer one
+        self._seq = itertools.count()
+        # (key, version) -> threading.Event set when the load finishes
+        self._in_flight = {}
+        # (key, version) -> exception from the last failed foreground load
+        self._errors = {}
+
+    def get(self, key, version, loader):
+        """
+        Return the cached value for a key, loading it at most once per version
+
+        Args:
+            key (str): Cache key (e.g. the forecast table)
+            version (str): Requested data version
+            loader (callable): Called as loader(key, version); raises on failure
+
+        Returns:
+            tuple: (value, served_version); served_version is older than
+            version while a background refresh is running
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry['version'] == version:
+                    return entry['value'], entry['version']
+
+                flight = (key, version)
+                if entry is not None:
+                    # Stale hit: serve what we have, refresh once in the background
+                    if flight not in self._in_flight:
+                        event = self._in_flight[flight] = threading.Event()
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, version, loader, event, next(self._seq)),
+                            name=f"{self.name}-refresh",
+                            daemon=True
+                        ).start()
+                    return entry['value'], entry['version']
+
+                event = self._in_flight.get(flight)
+                leader = event is None
+                if leader:
+                    event = self._in_flight[flight] = threading.Event()
+                    self._errors.pop(flight, None)
+                    seq = next(self._seq)
+
+            if leader:
+                return self._load(key, version, loader, event, seq), version
+
+            # Follower: wait for the leader, then re-check the entry
+            event.wait()
+            with self._lock:
+                error = self._errors.get(flight)
+            if error is not None:
+                raise error
+
+    def _load(self, key, version, loader, event, seq):
+        """Run the loader as the single flight for (key, version)"""
+        flight = (key, version)
+        try:
+            value = loader(key, version)
+        except Exception as e:
+            with self._lock:
+                self._errors[flight] = e
+            raise
+        else:
+            self._store(key, version, value, seq)
+            return value
+        finally:
+            with self._lock:
+                self._in_flight.pop(flight, None)
+            event.set()
+
+    def _refresh(self, key, version, loader, event, seq):
+        """Background revalidation; on failure the stale value stays in place"""
+        flight = (key, version)
+        try:
+            value = loader(key, version)
+        except Exception:
+            logger.exception("%s: background refresh of %s@%s failed", self.name, key, version)
+        else:
+            self._store(key, version, value, seq)
+        finally:
+            with self._lock:
+                self._in_flight.pop(flight, None)
+            event.set()
+
+    def _store(self, key, version, value, seq):
+        """Replace the entry for a key unless a later-started load already did"""
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or seq > current['seq']:
+                self._entries[key] = {
+                    'version': version,
+                    'value': value,
+                    'loaded_at': time.time(),
+                    'seq': seq
+                }
+
+    def is_refreshing(self, key):
+        """
+        Check whether a newer version of a key is loading in the background
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            bool: True while any load for the key is in flight
+        """
+        with self._lock:
+            return any(k == key for k, _ in self._in_flight)
+
+    def version(self, key):
+        """
+        Return the version currently cached for a key
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str: Cached version, or None if nothing is cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry['version'] if entry else None
+
+    def clear(self):
+        """Drop all cached values (in-flight loads still complete)"""
+        with self._lock:
+            self._entries.clear()
+            self._errors.clear()
@@ -0,0 +1,867 @@
+"""
+Tab Rendering Functions for Insurance Premium Dashboard
+"""
+import numpy as np
+import streamlit as st
+
+from config import (
+    METRIC_CONFIG, GEOGRAPHY_LEVELS, BACKTEST_NOMINAL_COVERAGE, SCENARIO_MAX_CHANGE_PCT,
+    COMPARISON_DEFAULT_STATES, COMPARISON_MAX_SERIES, TIMELINE_POINT_BUDGET,
+    CORRELATION_SCATTERS, CORRELATION_SIGNIFICANCE, MODEL_HEALTH_METRICS
+)
+from visualizations import (
+    create_choropleth_map, create_tiled_choropleth_map, create_bar_chart, create_comparison_chart
+)
+from utils import render_dashboard_controls, render_geography_selector, render_segment_filters
+from rankings import top_n, bottom_n, ranked_rows, rank_of, build_rank_index
+from scenarios import prediction_arrays, run_scenario, series_position
+from downsample import downsample_band, window_bounds
+from data_loader import state_history, load_region_values
+from segments import segment_view, segment_label, is_all_segments
+from correlations import covariate_table
+from timing import span
+
+
+def _format_pct(value):
+    """Format a percentage statistic, showing N/A when it is undefined"""
+    return f"{value:.2f}%" if value is not None else "N/A"
+
+
+@span("tab.state_rankings", "tab")
+def render_state_rankings_tab(map_data, rank_index, data_version=None, cube=None, table_version=None):
+    """
+    Render the State Rankings tab: map, bar chart and top/bottom tables
+    
+    Args:
+        map_data (pd.DataFrame): Prepared map data from get_map_data()
+        rank_index (dict): Rank index built from map_data
+        data_version (str): Data version of map_data; enables prebuilt map and chart
+        cube (dict): Segment cube from load_cube(); enables the carrier/term/business line filters
+        table_version (str): Data version of the tables (get_data_version()); the County/ZIP3
+            values are loaded for it. Defaults to data_version
+        
+    Returns:
+        None (renders to Streamlit)
+    """
+    st.markdown("## 🏆 State Performance Rankings")
+
+    # Dashboard controls (main area)
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        map_metric = render_dashboard_controls()
+    with col2:
+        geography = render_geography_selector()
+
+    # Get metric configuration
+    config = METRIC_CONFIG[map_metric]
+    color_col = config['column']
+
+    level_config = GEOGRAPHY_LEVELS[geography]
+    tiled = level_config['source'] == 'tiles'
+    if not tiled and cube is not None:
+        segment = render_segment_filters(cube['options'], cube['pinned'])
+        if not is_all_segments(segment):
+            # Segment metrics come from the cached cube, not the forecast tables
+            view = segment_view(data_version or "unknown", segment, cube)
+            map_data, rank_index, data_version = view['map_data'], view['rank_index'], view['version']
+            st.caption(f"📦 {segment_label(segment)}: trailing 12-month actuals over "
+                       f"{view['policies']:,} policies (YoY vs the prior 12 months)")
+
+    if tiled:
+        # County/ZIP3 values of the current release, joined to the geometry-only tiles in the browser
+        table_version = table_version or data_version or "unknown"
+        map_data = load_region_values(geography, table_version)
+        if map_data is None:
+            st.warning(f"⚠️ No {level_config['label']} values in `{level_config['values_table']}`")
+            return
+        data_version = f"{table_version}/{geography}"
+        rank_index = build_rank_index(data_version, map_data, geography)
+        st.caption(f"{level_config['plural']} show the stored {level_config['label']} forecast summary; "
+                   f"filters, horizon and segments apply to the State level")
+
+    # Valid region ids with a value, in ascending metric order
+    map_data_clean = map_data.iloc[ranked_rows(rank_index, color_col, ascending=True)]
+    label, plural = level_config['label'], level_config['plural']
+
+    # Main visualization section
+    if len(map_data_clean) == 0:
+        st.error(f"⚠️ No valid {label} ids found after cleaning")
+        st.info(f"STATE values must match the {label} id format `{level_config['id_pattern']}` "
+                f"(e.g. CA, NY, TX for states)")
+    else:
+        if tiled:
+            st.markdown(f"### 🗺️ US Premium Map by {label}: {map_metric}")
+            try:
+                create_tiled_choropleth_map(level_config, config, map_metric, map_data_clean)
+            except Exception as e:
+                st.error(f"❌ Map visualization error: {str(e)}")
+        else:
+            # Create choropleth map
+            st.markdown(f"### 🗺️ US Premium Map: {map_metric}")
+            try:
+                create_choropleth_map(map_data_clean, config, map_metric, data_version)
+            except Exception as e:
+                st.error(f"❌ Map visualization error: {str(e)}")
+        
+            # Create bar chart
+            try:
+                create_bar_chart(map_data_clean, config, map_metric, presorted=True,
+                                 data_version=data_version)
+            except Exception as e:
+                st.error(f"❌ Bar chart error: {str(e)}")
+    
+        # Top and Bottom Analysis
+        st.markdown(f"### 📈 Top & Bottom {plural} Analysis")
+    
+        col1, col2 = st.columns(2)
+        header = {'STATE': label}
+    
+        with col1:
+            st.markdown(f"#### 🔝 Top 10 {plural} - Highest {map_metric}")
+            top_10 = top_n(rank_index, map_data, color_col, 10)
+            st.dataframe(
+                top_10 if not tiled else top_10.rename(columns=header),
+                use_container_width=True,
+                hide_index=True
+            )
+    
+        with col2:
+            st.markdown(f"#### 🔻 Bottom 10 {plural} - Lowest {map_metric}")
+            bottom_10 = bottom_n(rank_index, map_data, color_col, 10)
+            st.dataframe(
+                bottom_10 if not tiled else bottom_10.rename(columns=header),
+                use_container_width=True,
+                hide_index=True
+            )
+
+
+@span("tab.growth_analysis", "tab")
+def render_growth_analysis_tab(yoy_growth, national_summary, map_data, rank_index):
+    """
+    Render the Growth Analysis tab: distribution, leaders and statistics
+    
+    Args:
+        yoy_growth (pd.DataFrame): YoY growth data
+        national_summary (dict): Pre-aggregated national statistics row
+        map_data (pd.DataFrame): Prepared map data from get_map_data()
+        rank_index (dict): Rank index built from map_data
+        
+    Returns:
+        None (renders to Streamlit)
+    """
+    st.markdown("## 📈 YoY Growth Analysis")
+
+    if yoy_growth is not None and len(yoy_growth) > 0:
+        # Growth distribution
+        import plotly.express as px
+    
+        st.markdown("### 📊 Growth Distribution Across States")
+        fig_hist = px.histogram(
+            yoy_growth,
+            x='YOY_GROWTH_PCT',
+            nbins=30,
+            title='Distribution of YoY Growth Rates',
+            labels={'YOY_GROWTH_PCT': 'YoY Growth (%)'},
+            color_discrete_sequence=['#1f77b4']
+        )
+        st.plotly_chart(fig_hist, use_container_width=True)
+    
+        # Top and bottom growth states
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            st.markdown("### 🚀 Top 10 Growth Leaders")
+            top_growth = top_n(rank_index, map_data, 'YOY_GROWTH_PCT', 10)
+            st.dataframe(top_growth, use_container_width=True, hide_index=True)
+    
+        with col2:
+            st.markdown("### 📉 Bottom 10 Growth States")
+            bottom_growth = bottom_n(rank_index, map_data, 'YOY_GROWTH_PCT', 10)
+            st.dataframe(bottom_growth, use_container_width=True, hide_index=True)
+    
+        # Growth statistics
+        st.markdown("### 📊 Growth Statistics")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Average Growth", _format_pct(national_summary['AVG_YOY_GROWTH_PCT']))
+        with col2:
+            st.metric("Median Growth", _format_pct(national_summary['MEDIAN_YOY_GROWTH_PCT']))
+        with col3:
+            st.metric("Std Deviation", _format_pct(national_summary['STDDEV_YOY_GROWTH_PCT']))
+        with col4:
+            positive_growth = national_summary['POSITIVE_GROWTH_STATES']
+            st.metric("States with Positive Growth", f"{positive_growth}/{national_summary['GROWTH_STATES']}")
+    else:
+        st.info("No YoY growth data available")
+
+
+@span("tab.state_deep_dive", "tab")
+def render_state_deep_dive_tab(forecast_summary, yoy_growth, predictions, national_summary, rank_index,
+                               data_version=None, horizon=None, history=None):
+    """
+    Render the State Deep Dive tab for a user-selected state
+    
+    Args:
+        forecast_summary (pd.DataFrame): Forecast summary data
+        yoy_growth (pd.DataFrame): YoY growth data
+        predictions (pd.DataFrame): Full-horizon prediction data
+        national_summary (dict): Pre-aggregated national statistics row
+        rank_index (dict): Rank index built from the map data
+        data_version (str): Data version of the tables; keys the cached scenario results
+        horizon (int): Forecast months shown (None for all)
+        history (dict): Monthly actuals from load_history(), overlaid on the timeline
+        
+    Returns:
+        None (renders to Streamlit)
+    """
+    st.markdown("## 🔍 State Deep Dive")
+
+    # State selector
+    selected_state = st.selectbox(
+        "Select a State",
+        options=sorted(forecast_summary['STATE'].unique()),
+        help="Choose a state to view detailed analysis"
+    )
+
+    if selected_state:
+        state_data = forecast_summary[forecast_summary['STATE'] == selected_state].iloc[0]
+    
+        # State header
+        st.markdown(f"### Analysis for {selected_state}")
+    
+        # Key metrics
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Mean Premium", f"${state_data['MEAN_PREMIUM']:,.2f}")
+        with col2:
+            st.metric("Std Deviation", f"${state_data['PREMIUM_STDDEV']:,.2f}")
+        with col3:
+            st.metric("Min Premium", f"${state_data['MIN_PREMIUM']:,.2f}")
+        with col4:
+            st.metric("Max Premium", f"${state_data['MAX_PREMIUM']:,.2f}")
+    
+        # Additional metrics row
+        col1, col2, col3, col4 = st.columns(4)
+    
+        with col1:
+            price_range = state_data['MAX_PREMIUM'] - state_data['MIN_PREMIUM']
+            st.metric("Price Range", f"${price_range:,.2f}")
+    
+        with col2:
+            volatility = (state_data['PREMIUM_STDDEV'] / state_data['MEAN_PREMIUM'] * 100)
+            st.metric("Volatility (CV%)", f"{volatility:.1f}%")
+    
+        with col3:
+            if yoy_growth is not None and len(yoy_growth) > 0:
+                state_growth = yoy_growth[yoy_growth['STATE'] == selected_state]
+                if not state_growth.empty:
+                    growth_val = state_growth.iloc[0]['YOY_GROWTH_PCT']
+                    st.metric("YoY Growth", f"{growth_val:.2f}%", delta=f"{growth_val:.2f}%")
+                else:
+                    st.metric("YoY Growth", "N/A")
+            else:
+                st.metric("YoY Growth", "N/A")
+    
+        with col4:
+            # National rank from the prebuilt rank index
+            rank, ranked_count = rank_of(rank_index, 'MEAN_PREMIUM', selected_state)
+            if rank is not None:
+                st.metric("National Rank", f"#{rank} of {ranked_count}")
+            else:
+                st.metric("National Rank", "N/A")
+    
+        # Comparison to National Average
+        st.markdown("---")
+        st.markdown("### 📊 Comparison to National Average")
+    
+        national_avg = national_summary['NATIONAL_AVG_PREMIUM']
+        diff_from_avg = state_data['MEAN_PREMIUM'] - national_avg
+        pct_diff = (diff_from_avg / national_avg) * 100
+    
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            st.metric(
+                "Difference from National Avg",
+                f"${diff_from_avg:,.0f}",
+                delta=f"{pct_diff:.1f}%"
+            )
+    
+        with col2:
+            if diff_from_avg < 0:
+                status = "🟢 Below Average"
+                status_color = "#d4edda"
+            elif diff_from_avg > 0:
+                status = "🔴 Above Average"
+                status_color = "#f8d7da"
+            else:
+                status = "⚪ At Average"
+                status_color = "#e2e3e5"
+        
+            st.markdown(f"""
+            <div style="background-color: {status_color}; padding: 20px; border-radius: 5px; text-align: center;">
+                <h3 style="margin: 0;">Status: {status}</h3>
+            </div>
+            """, unsafe_allow_html=True)
+    
+        # What-if scenario on the cached predictions
+        scenario = None
+        if predictions is not None and len(predictions) > 0:
+            st.markdown("---")
+            scenario = _render_scenario_panel(
+                selected_state, predictions, yoy_growth, data_version or "unknown", horizon)
+    
+        # Premium Forecast Timeline
+        st.markdown("---")
+        st.markdown("### 📈 Premium Forecast Timeline")
+    
+        if predictions is not None and len(predictions) > 0:
+            # Filter predictions for selected state, up to the end of the horizon
+            state_predictions = predictions[predictions['SERIES'] == selected_state]
+            if horizon is not None:
+                months = prediction_arrays(data_version or "unknown", predictions)['months'][:horizon]
+                horizon_end = (months[-1] + 1).astype('datetime64[ns]')
+                state_predictions = state_predictions[state_predictions['TS'] < horizon_end]
+        
+            if not state_predictions.empty:
+                import plotly.graph_objects as go
+                
+                # Actuals from the cached monthly history (no per-state query)
+                actuals = state_history(history, selected_state)
+                
+                # Long timelines: optional zoom window, then reduced to the point budget
+                ts = state_predictions['TS'].to_numpy()
+                window = _render_zoom_window(
+                    ts if actuals is None else np.concatenate([actuals[0], ts]), "timeline_window")
+                visible = slice(None) if window is None else window_bounds(ts, *window)
+                has_bounds = 'UPPER_BOUND' in state_predictions.columns and 'LOWER_BOUND' in state_predictions.columns
+                x, y, lower, upper = downsample_band(
+                    ts[visible],
+                    state_predictions['FORECAST'].to_numpy()[visible],
+                    state_predictions['LOWER_BOUND'].to_numpy()[visible] if has_bounds else None,
+                    state_predictions['UPPER_BOUND'].to_numpy()[visible] if has_bounds else None
+                )
+                shown = len(ts[visible])
+                if len(x) < shown:
+                    st.caption(f"Showing {len(x):,} of {shown:,} points; narrow the window for full detail")
+                
+                # Create timeline chart
+                fig_timeline = go.Figure()
+                
+                if actuals is not None:
+                    history_ts, history_actual = actuals
+                    history_visible = slice(None) if window is None else window_bounds(history_ts, *window)
+                    history_x, history_y, _, _ = downsample_band(
+                        history_ts[history_visible], history_actual[history_visible])
+                    fig_timeline.add_trace(go.Scatter(
+                        x=history_x,
+                        y=history_y,
+                        mode='lines',
+                        name='Actual',
+                        line=dict(color='#7f7f7f', width=2)
+                    ))
+            
+                # Add the forecast line
+                fig_timeline.add_trace(go.Scatter(
+                    x=x,
+                    y=y,
+                    mode='lines',
+                    name='Forecast',
+                    line=dict(color='#1f77b4', width=3)
+                ))
+            
+                # Add confidence interval if available
+                if has_bounds:
+                    fig_timeline.add_trace(go.Scatter(
+                        x=x,
+                        y=upper,
+                        mode='lines',
+                        name='Upper Bound',
+                        line=dict(width=0),
+                        showlegend=False
+                    ))
+                
+                    fig_timeline.add_trace(go.Scatter(
+                        x=x,
+                        y=lower,
+                        mode='lines',
+                        name='Lower Bound',
+                        line=dict(width=0),
+                        fillcolor='rgba(31, 119, 180, 0.2)',
+                        fill='tonexty',
+                        showlegend=False
+                    ))
+            
+                pos = series_position(scenario, selected_state) if scenario is not None else None
+                if pos is not None:
+                    scenario_ts = scenario['months'].astype('datetime64[ns]')
+                    scenario_visible = slice(None) if window is None else window_bounds(scenario_ts, *window)
+                    scenario_x, scenario_y, _, _ = downsample_band(
+                        scenario_ts[scenario_visible], scenario['forecast'][pos][scenario_visible])
+                    fig_timeline.add_trace(go.Scatter(
+                        x=scenario_x,
+                        y=scenario_y,
+                        mode='lines',
+                        name='Scenario',
+                        line=dict(color='#ff7f0e', width=3, dash='dash')
+                    ))
+            
+                fig_timeline.update_layout(
+                    title=f'Premium Forecast Timeline - {selected_state}',
+                    xaxis_title='Date',
+                    yaxis_title='Premium ($)',
+                    hovermode='x unified',
+                    height=400
+                )
+            
+                st.plotly_chart(fig_timeline, use_container_width=True)
+            
+                # Forecast statistics
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    avg_forecast = state_predictions['FORECAST'].mean()
+                    st.metric("Average Forecast", f"${avg_forecast:,.2f}")
+                with col2:
+                    trend = state_predictions['FORECAST'].iloc[-1] - state_predictions['FORECAST'].iloc[0]
+                    st.metric("Trend", f"${trend:,.2f}")
+                with col3:
+                    forecast_vol = state_predictions['FORECAST'].std()
+                    st.metric("Forecast Volatility", f"${forecast_vol:,.2f}")
+            else:
+                st.info(f"No forecast data available for {selected_state}")
+        else:
+            st.info("No prediction data available")
+
+    # Several states on one timeline, sliced from the cached predictions
+    if predictions is not None and len(predictions) > 0:
+        st.markdown("---")
+        _render_state_comparison(forecast_summary, yoy_growth, predictions, data_version or "unknown", horizon)
+
+
+def _render_zoom_window(ts, key):
+    """
+    Render a date-window slider for timelines longer than the point budget
+
+    Narrowing the window re-slices the cached full-resolution rows, so the
+    zoomed-in range is drawn with every point it has.
+
+    Args:
+        ts (np.ndarray): Increasing datetime64 timestamps
+        key (str): Widget key
+
+    Returns:
+        tuple: (start, end) as datetime64, or None when the whole timeline fits the budget
+    """
+    if len(ts) <= TIMELINE_POINT_BUDGET:
+        return None
+
+    first, last = (t.astype('datetime64[us]').item() for t in (ts[0], ts[-1]))
+    start, end = st.slider(
+        "🔎 Zoom window",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        key=key,
+        help="Narrow the window to see the timeline at full resolution"
+    )
+    return np.datetime64(start, 'ns'), np.datetime64(end, 'ns')
+
+
+def _render_scenario_panel(selected_state, predictions, yoy_growth, data_version, horizon=None):
+    """
+    Render the what-if controls and the scenario's effect on the selected state
+
+    Every slider move is answered from the cached prediction arrays; results
+    are memoized per scenario, so revisiting a setting is a cache hit.
+
+    Returns:
+        dict: Scenario result (see run_scenario()) when a scenario is active, else None
+    """
+    st.markdown("### 🧪 What-if Scenario")
+
+    baseline = run_scenario(data_version, predictions, yoy_growth, [], horizon)
+    labels = [str(m) for m in baseline['months']]
+
+    col1, col2, col3 = st.columns([2, 3, 1])
+    with col1:
+        change_pct = st.slider(
+            "Rate change (%)",
+            min_value=-float(SCENARIO_MAX_CHANGE_PCT),
+            max_value=float(SCENARIO_MAX_CHANGE_PCT),
+            value=0.0,
+            step=0.5,
+            key="scenario_change_pct",
+            help="Multiply the forecast (and its bounds) by 1 + change over the selected months"
+        )
+    with col2:
+        if len(labels) > 1:
+            start, end = st.select_slider(
+                "Months affected",
+                options=labels,
+                value=(labels[0], labels[-1]),
+                key="scenario_months"
+            )
+        else:
+            start = end = labels[0] if labels else None
+    with col3:
+        all_states = st.checkbox("All states", key="scenario_all_states",
+                                 help="Apply the change nationally instead of to this state only")
+
+    adjustments = [{
+        'states': None if all_states else [selected_state],
+        'start': start,
+        'end': end,
+        'change_pct': change_pct
+    }]
+    result = run_scenario(data_version, predictions, yoy_growth, adjustments, horizon)
+    if result['key'] == baseline['key']:
+        st.caption("Move the rate change slider to see its effect on this state's forecast, growth and rank.")
+        return None
+
+    pos = series_position(result, selected_state)
+    if pos is None:
+        st.info(f"No forecast data available for {selected_state}")
+        return None
+
+    def value(res, column):
+        return res['forecast_summary'][column].iloc[pos]
+
+    def growth(res):
+        if res['yoy_growth'] is None:
+            return None
+        rows = res['yoy_growth'][res['yoy_growth']['STATE'] == selected_state]
+        return rows['YOY_GROWTH_PCT'].iloc[0] if len(rows) > 0 else None
+
+    def rank(res):
+        return rank_of(res['rank_index'], 'MEAN_PREMIUM', selected_state)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        mean, base_mean = value(result, 'MEAN_PREMIUM'), value(baseline, 'MEAN_PREMIUM')
+        st.metric("Scenario Mean Premium", f"${mean:,.2f}", delta=f"${mean - base_mean:,.2f}")
+    with col2:
+        new_growth, base_growth = growth(result), growth(baseline)
+        if new_growth is not None and base_growth is not None:
+            st.metric("Scenario YoY Growth", f"{new_growth:.2f}%", delta=f"{new_growth - base_growth:+.2f} pts")
+        else:
+            st.metric("Scenario YoY Growth", "N/A")
+    with col3:
+        (new_rank, ranked_count), (base_rank, _) = rank(result), rank(baseline)
+        if new_rank is not None and base_rank is not None:
+            # A lower number means a more expensive state
+            st.metric("Scenario National Rank", f"#{new_rank} of {ranked_count}",
+                      delta=f"{base_rank - new_rank:+d} places", delta_color="off")
+        else:
+            st.metric("Scenario National Rank", "N/A")
+    with col4:
+        national, base_national = (result['national_summary']['NATIONAL_AVG_PREMIUM'],
+                                   baseline['national_summary']['NATIONAL_AVG_PREMIUM'])
+        st.metric("Scenario National Avg", f"${national:,.0f}", delta=f"${national - base_national:,.0f}")
+
+    return result
+
+
+def _render_state_comparison(forecast_summary, yoy_growth, predictions, data_version, horizon=None):
+    """
+    Render a multi-select comparison of several states on one timeline
+
+    Every selected series comes from the cached prediction arrays (no query per
+    state), and each series' traces are built once and reused across selections.
+    """
+    st.markdown("### 🆚 Compare States")
+
+    arrays = prediction_arrays(data_version, predictions)
+    options = [str(s) for s in arrays['series']]
+    default = [s for s in COMPARISON_DEFAULT_STATES if s in options]
+
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        states = st.multiselect(
+            "States to compare",
+            options=options,
+            default=default,
+            max_selections=COMPARISON_MAX_SERIES,
+            key="comparison_states"
+        )
+    with col2:
+        show_bounds = st.checkbox("Show intervals", value=True, key="comparison_bounds")
+
+    if not states:
+        st.info("Select one or more states to compare their forecasts")
+        return
+
+    create_comparison_chart(states, arrays, data_version, horizon, show_bounds)
+
+    # Summary of the selection, in selection order
+    summary = forecast_summary.set_index('STATE').reindex(states)
+    table = summary[['MEAN_PREMIUM', 'MIN_PREMIUM', 'MAX_PREMIUM']].rename(columns={
+        'MEAN_PREMIUM': 'Mean Premium', 'MIN_PREMIUM': 'Min Premium', 'MAX_PREMIUM': 'Max Premium'})
+    if yoy_growth is not None and len(yoy_growth) > 0:
+        growth = yoy_growth.drop_duplicates('STATE').set_index('STATE')['YOY_GROWTH_PCT']
+        table['YoY Growth %'] = growth.reindex(states).to_numpy()
+    st.dataframe(table.rename_axis('State'), use_container_width=True)
+
+
+@span("tab.correlation", "tab")
+def render_correlation_tab(correlations):
+    """
+    Render the Correlation Analysis tab: heatmap, key scatter plots and covariates
+    
+    Only renders; every coefficient, p-value and fitted line comes precomputed.
+    
+    Args:
+        correlations (dict): Output of build_correlations()
+        
+    Returns:
+        None (renders to Streamlit)
+    """
+    st.markdown("## 📊 Correlation Analysis")
+
+    import plotly.graph_objects as go
+
+    method = st.radio("Method", options=["Pearson", "Spearman"], horizontal=True, key="correlation_method",
+                      help="Spearman ranks the values first, so it also catches monotonic non-linear relationships")
+    matrix = correlations[method.lower()]
+    pvalues = correlations[f"{method.lower()}_p"]
+
+    # Coefficients marked * when significant at CORRELATION_SIGNIFICANCE
+    marks = np.where(pvalues.to_numpy() < CORRELATION_SIGNIFICANCE, "*", "")
+    text = np.char.add(np.char.mod('%.2f', matrix.to_numpy(dtype=np.float64)), marks)
+
+    fig = go.Figure(data=go.Heatmap(
+        z=matrix.values,
+        x=matrix.columns,
+        y=matrix.columns,
+        colorscale='RdBu',
+        zmid=0,
+        text=text,
+        texttemplate='%{text}',
+        textfont={"size": 10},
+        customdata=pvalues.values,
+        hovertemplate='%{y} × %{x}<br>r = %{z:.3f}<br>p = %{customdata:.3g}<extra></extra>',
+        colorbar=dict(title="Correlation")
+    ))
+
+    fig.update_layout(
+        title=f'{method} Correlation Matrix of Premium Metrics',
+        xaxis_title='',
+        yaxis_title='',
+        height=600
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"* p < {CORRELATION_SIGNIFICANCE}")
+
+    # Scatter plots for key relationships, with the precomputed least-squares line
+    st.markdown("### Key Relationships")
+
+    points = correlations['points']
+    columns = st.columns(len(CORRELATION_SCATTERS))
+    for col, (x, y, title, x_label, y_label) in zip(columns, CORRELATION_SCATTERS):
+        fit = correlations['fits'].get((x, y))
+        if fit is None:
+            continue
+        with col:
+            fig_scatter = go.Figure(go.Scatter(
+                x=points[x], y=points[y], mode='markers', text=points['STATE'],
+                hovertemplate='%{text}<br>%{x:,.2f}, %{y:,.2f}<extra></extra>', name='States'
+            ))
+            line_x = np.array(fit['x_range'])
+            fig_scatter.add_trace(go.Scatter(
+                x=line_x, y=fit['slope'] * line_x + fit['intercept'], mode='lines', name='OLS fit'
+            ))
+            fig_scatter.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label, showlegend=False)
+            st.plotly_chart(fig_scatter, use_container_width=True)
+
+    # External covariates (e.g. loss ratio) against each premium metric
+    if correlations['covariates']:
+        st.markdown("### Covariates")
+        st.dataframe(
+            covariate_table(correlations),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'PEARSON': st.column_config.NumberColumn("Pearson r", format="%.3f"),
+                'PEARSON_P': st.column_config.NumberColumn("Pearson p", format="%.3g"),
+                'SPEARMAN': st.column_config.NumberColumn("Spearman ρ", format="%.3f"),
+                'SPEARMAN_P': st.column_config.NumberColumn("Spearman p", format="%.3g")
+            }
+        )
+
+
+@span("tab.forecast_accuracy", "tab")
+def render_forecast_accuracy_tab(backtest_metrics, model_version):
+    """
+    Render the Forecast Accuracy tab from stored backtest metrics
+    
+    Args:
+        backtest_metrics (pd.DataFrame): Output of load_backtest_metrics(), or None
+        model_version (str): Model version the metrics belong to
+        
+    Returns:
+        None (renders to Streamlit)
+    """
+    st.markdown("## 🎯 Forecast Accuracy")
+
+    if backtest_metrics is None or len(backtest_metrics) == 0:
+        st.info("No backtest results yet. Run `python backtest.py` to score the current model.")
+        return
+
+    first = backtest_metrics.iloc[0]
+    st.caption(f"Model version `{model_version}` • rolling-origin backtest over {int(first['ORIGINS'])} "
+               f"origins × {int(first['HORIZON'])} months • {len(backtest_metrics):,} series")
+
+    # Headline accuracy (medians are robust to a few badly-forecast series)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Median MAPE", _format_pct(backtest_metrics['MAPE'].median()))
+    with col2:
+        st.metric("Median sMAPE", _format_pct(backtest_metrics['SMAPE'].median()))
+    with col3:
+        st.metric("Median MASE", f"{backtest_metrics['MASE'].median():.2f}",
+                  help="Below 1 beats a seasonal naive forecast")
+    with col4:
+        st.metric("Interval Coverage", _format_pct(backtest_metrics['COVERAGE_PCT'].mean()),
+                  help=f"Share of actuals inside the forecast interval (nominal {BACKTEST_NOMINAL_COVERAGE}%)")
+
+    import plotly.express as px
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig_mape = px.histogram(
+            backtest_metrics,
+            x='MAPE',
+            nbins=40,
+            title='MAPE Distribution Across Series',
+            labels={'MAPE': 'MAPE (%)'},
+            color_discrete_sequence=['#1f77b4']
+        )
+        st.plotly_chart(fig_mape, use_container_width=True)
+    with col2:
+        fig_mase = px.histogram(
+            backtest_metrics,
+            x='MASE',
+            nbins=40,
+            title='MASE Distribution Across Series',
+            labels={'MASE': 'MASE'},
+            color_discrete_sequence=['#ff7f0e']
+        )
+        fig_mase.add_vline(x=1, line_dash='dash', line_color='gray')
+        st.plotly_chart(fig_mase, use_container_width=True)
+
+    st.markdown("### ⚠️ Least Accurate Series")
+    worst = backtest_metrics.nlargest(10, 'MASE')[
+        ['SERIES', 'MAPE', 'SMAPE', 'MASE', 'COVERAGE_PCT', 'POINTS']]
+    st.dataframe(worst, use_container_width=True, hide_index=True)
+
+
+@span("tab.model_health", "tab")
+def render_model_health_tab(health, model_version):
+    """
+    Render the Model Health tab from the persisted training run outputs
+    
+    Args:
+        health (dict): Output of load_model_health(), or None
+        model_version (str): Model version the outputs belong to
+        
+    Returns:
+        None (renders to Streamlit)
+    """
+    st.markdown("## 🩺 Model Health")
+
+    if health is None or len(health['trend']) == 0:
+        st.info("No training run captured yet. Run `premium_forecasting_model.sql` to persist evaluation "
+                "metrics, feature importance and training logs.")
+        return
+
+    trend = health['trend']
+    skipped = health['skipped']
+    st.caption(f"Model version `{model_version}` • {health['series_trained']:,} series trained • "
+               f"{len(trend)} run{'s' if len(trend) != 1 else ''} in the trend")
+
+    # Headline error metrics against the previous training run (lower is better)
+    metrics = [m for m in MODEL_HEALTH_METRICS if m in trend.columns]
+    columns = st.columns(len(metrics) + 1)
+    for col, metric in zip(columns, metrics):
+        current = trend[metric].iloc[-1]
+        previous = trend[metric].iloc[-2] if len(trend) > 1 else None
+        with col:
+            st.metric(f"Mean {metric}", f"{current:,.3f}",
+                      delta=None if previous is None or np.isnan(previous) else f"{current - previous:+,.3f}",
+                      delta_color="inverse")
+    with columns[-1]:
+        st.metric("Skipped Series", f"{len(skipped):,}",
+                  help="Series whose training failed and were skipped ('on_error': 'SKIP')")
+
+    import plotly.express as px
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if metrics and len(trend) > 1:
+            trend_long = trend[metrics].reset_index().melt(
+                id_vars='MODEL_VERSION', var_name='Metric', value_name='Value')
+            fig_trend = px.line(trend_long, x='MODEL_VERSION', y='Value', color='Metric', markers=True,
+                                title='Error Metrics by Training Run',
+                                labels={'MODEL_VERSION': 'Model Version'})
+            fig_trend.update_xaxes(type='category')
+            st.plotly_chart(fig_trend, use_container_width=True)
+        else:
+            st.info("The trend appears after the second captured training run")
+    with col2:
+        features = health['features']
+        if len(features) > 0:
+            fig_features = px.bar(features.head(15).iloc[::-1], x='MEAN_SCORE', y='FEATURE_NAME',
+                                  orientation='h', title='Feature Importance (mean across series)',
+                                  labels={'MEAN_SCORE': 'Score', 'FEATURE_NAME': ''},
+                                  color_discrete_sequence=['#2ca02c'])
+            st.plotly_chart(fig_features, use_container_width=True)
+        else:
+            st.info("No feature importance stored for this model version")
+
+    if len(skipped) > 0:
+        st.markdown("### ⛔ Skipped Series")
+        st.dataframe(skipped, use_container_width=True, hide_index=True)
+
+    series = health['series']
+    sort_metric = next((m for m in metrics if m in series.columns), None)
+    if sort_metric is not None:
+        st.markdown("### ⚠️ Highest Cross-Validation Error")
+        st.dataframe(series.nlargest(10, sort_metric), use_container_width=True, hide_index=True)
+
+
+@span("tab.raw_data", "tab")
+def render_raw_data_tab(forecast_summary, yoy_growth):
+    """
+    Render the Raw Data tab with CSV downloads
+    
+    Args:
+        forecast_summary (pd.DataFrame): Forecast summary data
+        yoy_growth (pd.DataFrame): YoY growth data
+        
+    Returns:
+        None (renders to Streamlit)
+    """
+    st.markdown("## 📋 Raw Data")
+
+    st.markdown("### Forecast Summary Data")
+    st.dataframe(forecast_summary, use_container_width=True)
+
+    # Download button
+    csv = forecast_summary.to_csv(index=False)
+    st.download_button(
+        label="📥 Download Forecast Data as CSV",
+        data=csv,
+        file_name="premium_forecast_summary.csv",
+        mime="text/csv"
+    )
+
+    if yoy_growth is not None and len(yoy_growth) > 0:
+        st.markdown("### YoY Growth Data")
+        st.dataframe(yoy_growth, use_container_width=True)
+    
+        csv_growth = yoy_growth.to_csv(index=False)
+        st.download_button(
+            label="📥 Download YoY Growth Data as CSV",
+            data=csv_growth,
+            file_name="yoy_growth_data.csv",
+            mime="text/csv"
+        )
@@ -0,0 +1,8 @@
+"""
+Test configuration: the dashboard modules import each other as top-level
+modules (as streamlit run does), so the app directory goes on sys.path.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
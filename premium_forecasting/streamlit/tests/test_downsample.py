@@ -0,0 +1,64 @@
+"""Tests for timeline downsampling (downsample.py)"""
+import numpy as np
+
+from downsample import downsample_band, lttb_indices, minmax_indices, window_bounds
+
+
+def test_lttb_keeps_endpoints_and_budget():
+    x = np.arange(1000)
+    y = np.sin(x / 25.0)
+
+    keep = lttb_indices(x, y, 50)
+
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_a_spike_and_accepts_datetimes():
+    x = np.arange('2020-01', '2103-05', dtype='datetime64[M]')
+    y = np.zeros(len(x))
+    y[437] = 100.0
+
+    keep = lttb_indices(x, y, 40)
+
+    assert 437 in keep
+
+
+def test_lttb_returns_everything_under_budget():
+    assert np.array_equal(lttb_indices(np.arange(10), np.arange(10), 20), np.arange(10))
+
+
+def test_minmax_keeps_extremes_and_endpoints():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=500)
+
+    keep = minmax_indices(y, 42)
+
+    assert keep[0] == 0 and keep[-1] == 499
+    assert int(np.argmax(y)) in keep and int(np.argmin(y)) in keep
+    assert len(keep) <= 42
+
+
+def test_band_envelope_never_shrinks():
+    x = np.arange(300)
+    y = np.cos(x / 10.0)
+    lower, upper = y - 1 - (x % 7 == 0), y + 1 + (x % 11 == 0)
+
+    bx, by, blower, bupper = downsample_band(x, y, lower, upper, budget=30)
+
+    assert len(bx) == len(by) == len(blower) == len(bupper) == 30
+    assert blower.min() == lower.min()
+    assert bupper.max() == upper.max()
+
+
+def test_band_passes_short_series_through():
+    x, y = np.arange(5), np.arange(5.0)
+    bx, by, blower, bupper = downsample_band(x, y, budget=30)
+    assert np.array_equal(bx, x) and np.array_equal(by, y)
+    assert blower is None and bupper is None
+
+
+def test_window_bounds_are_inclusive():
+    x = np.arange(10)
+    assert list(x[window_bounds(x, 3, 6)]) == [3, 4, 5, 6]
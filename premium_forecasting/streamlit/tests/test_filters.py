@@ -0,0 +1,48 @@
+"""Tests for the dashboard filter model (filters.py)"""
+from config import STATE_REGIONS
+from filters import compile_filters, describe_filters, filter_key, is_unfiltered, normalize_filters
+
+
+def test_normalize_merges_regions_and_states():
+    region = next(iter(STATE_REGIONS))
+    states = sorted(STATE_REGIONS[region])
+
+    normalized = normalize_filters(states=[states[0].lower(), ' ' + states[0]], regions=[region])
+
+    assert normalized == (tuple(states), None, None, None)
+    assert normalize_filters(states=states, regions=[region]) == normalized
+
+
+def test_empty_filters_are_unfiltered():
+    normalized = normalize_filters(states=[], regions=None, start='', carrier=None)
+    assert is_unfiltered(normalized)
+    assert filter_key(normalized) == "all"
+    assert compile_filters(normalized, state='STATE', ts='TS', carrier='CARRIER') == ("", [])
+    assert describe_filters(normalized) == "No filters"
+
+
+def test_filter_key_is_stable_and_distinguishes_filters():
+    a = normalize_filters(states=['CA', 'NY'], start='2025-01')
+    b = normalize_filters(states=['NY', 'CA'], start='2025-01')
+    c = normalize_filters(states=['CA'], start='2025-01')
+    assert filter_key(a) == filter_key(b)
+    assert filter_key(a) != filter_key(c)
+
+
+def test_compile_binds_values_and_skips_missing_columns():
+    normalized = normalize_filters(states=['CA', 'NY'], start='2025-01', end='2025-06', carrier="O'Brien Mutual")
+
+    clause, params = compile_filters(normalized, state='SERIES', ts='TS', carrier='CARRIER')
+    assert clause.startswith("WHERE ")
+    assert clause.count('?') == len(params) == 5
+    assert params == ['CA', 'NY', '2025-01', '2025-06', "O'Brien Mutual"]
+    assert "O'Brien" not in clause
+
+    clause, params = compile_filters(normalized, state='STATE')
+    assert params == ['CA', 'NY']
+    assert 'TS' not in clause and 'CARRIER' not in clause
+
+
+def test_describe_filters():
+    normalized = normalize_filters(states=['CA'], end='2025-12', carrier='Acme')
+    assert describe_filters(normalized) == "1 state · … to 2025-12 · Acme"
@@ -0,0 +1,149 @@
+"""Tests for the SQL pipeline runner (pipeline.py), run against LocalEngine"""
+import textwrap
+
+import pytest
+
+from pipeline import (
+    LocalEngine, fingerprint_steps, load_pipeline, parse_script, plan_steps, run_pipeline, split_statements
+)
+
+SCRIPT = """
+SET source_table = 'db.s.source';
+SET run_version = TO_VARCHAR(CURRENT_TIMESTAMP(), 'YYYYMMDDHH24MISS');
+SET out_table = 'db.s.out_v' || $run_version;
+
+-- @step load
+-- @reads $source_table
+CREATE OR REPLACE TABLE db.s.staged AS SELECT * FROM IDENTIFIER($source_table);
+
+-- @step train after load
+-- @versioned
+CREATE OR REPLACE TABLE IDENTIFIER($out_table) AS SELECT * FROM db.s.staged;
+
+-- @step publish after train
+-- @versioned
+INSERT INTO db.s.releases SELECT $run_version;
+
+-- @step report
+SELECT 1;
+"""
+
+
+@pytest.fixture
+def script_path(tmp_path):
+    path = tmp_path / "model.sql"
+    path.write_text(textwrap.dedent(SCRIPT))
+    return str(path)
+
+
+def run(engine, script_path, **kwargs):
+    records = run_pipeline(engine, load_pipeline([script_path]), log=lambda message: None, **kwargs)
+    return {r['step']: r for r in records}
+
+
+def test_split_statements_ignores_semicolons_in_strings_blocks_and_comments():
+    sql = """
+    SELECT 'a;b', "c;d" FROM t; -- trailing; comment
+    EXECUTE IMMEDIATE $$ BEGIN RETURN 1; END; $$;
+    /* block; comment */
+    SELECT 'it''s;' ;
+    -- comment only;
+    """
+    statements = split_statements(sql)
+    assert len(statements) == 3
+    assert statements[0].startswith("SELECT 'a;b'")
+    assert "RETURN 1; END;" in statements[1]
+    assert statements[2].endswith("SELECT 'it''s;'")
+
+
+def test_parse_script_reads_directives_and_literal_variables(script_path):
+    script = parse_script(script_path)
+
+    assert script['name'] == "model"
+    assert script['variables'] == {'source_table': 'db.s.source'}
+    assert [s['name'] for s in script['steps']] == ['load', 'train', 'publish', 'report']
+    load, train = script['steps'][0], script['steps'][1]
+    assert load['reads'] == ['DB.S.SOURCE']
+    assert train['after'] == ['load'] and train['versioned']
+    assert len(script['prelude']) == 3
+
+
+def test_parse_script_rejects_reads_of_non_literal_variables(tmp_path):
+    path = tmp_path / "bad.sql"
+    path.write_text("SET t = 'x' || 'y';\n-- @step a\n-- @reads $t\nSELECT 1;\n")
+    with pytest.raises(ValueError, match="not a literal SET"):
+        parse_script(str(path))
+
+
+def test_load_pipeline_detects_cycles(tmp_path):
+    path = tmp_path / "cycle.sql"
+    path.write_text("-- @step a after b\nSELECT 1;\n-- @step b after a\nSELECT 2;\n")
+    with pytest.raises(ValueError, match="cycle"):
+        load_pipeline([str(path)])
+
+
+def test_fingerprints_follow_inputs_and_upstream_steps(script_path):
+    pipeline = load_pipeline([script_path])
+    base = fingerprint_steps(pipeline, {'DB.S.SOURCE': 1})
+    moved = fingerprint_steps(pipeline, {'DB.S.SOURCE': 2})
+
+    assert base == fingerprint_steps(pipeline, {'DB.S.SOURCE': 1})
+    assert moved['load'] != base['load']
+    assert moved['train'] != base['train']
+    assert moved['report'] == base['report']
+
+
+def test_plan_steps_runs_downstream_and_the_whole_versioned_group(script_path):
+    pipeline = load_pipeline([script_path])
+    fingerprints = fingerprint_steps(pipeline, {'DB.S.SOURCE': 1})
+
+    assert set(plan_steps(pipeline, fingerprints, {}).values()) == {'new'}
+    assert set(plan_steps(pipeline, fingerprints, dict(fingerprints)).values()) == {None}
+
+    # publish alone changed: train has to rebuild the release with it
+    previous = dict(fingerprints, publish='stale')
+    reasons = plan_steps(pipeline, fingerprints, previous)
+    assert reasons == {'load': None, 'train': 'versioned', 'publish': 'changed', 'report': None}
+
+    previous = dict(fingerprints, load='stale')
+    reasons = plan_steps(pipeline, fingerprints, previous)
+    assert reasons == {'load': 'changed', 'train': 'upstream', 'publish': 'upstream', 'report': None}
+
+    assert set(plan_steps(pipeline, fingerprints, dict(fingerprints), force=True).values()) == {'forced'}
+
+
+def test_second_local_run_skips_unchanged_steps(script_path):
+    engine = LocalEngine(tables={'db.s.source': 1})
+
+    first = run(engine, script_path)
+    assert {r['status'] for r in first.values()} == {'ran'}
+    assert engine.versions['DB.S.STAGED'] > 1
+
+    second = run(engine, script_path)
+    assert {r['status'] for r in second.values()} == {'skipped'}
+
+    engine.versions['DB.S.SOURCE'] = 100
+    third = run(engine, script_path)
+    assert {name: r['status'] for name, r in third.items()} == {
+        'load': 'ran', 'train': 'ran', 'publish': 'ran', 'report': 'skipped'}
+
+
+def test_failed_step_blocks_its_dependents_only(script_path):
+    engine = LocalEngine(fail=('db.s.staged AS',), tables={'db.s.source': 1})
+
+    records = run(engine, script_path)
+
+    assert records['load']['status'] == 'failed'
+    assert records['train']['status'] == 'blocked'
+    assert records['publish']['status'] == 'blocked'
+    assert records['report']['status'] == 'ran'
+    # Failed and blocked steps are not recorded as done, so the next run retries them
+    assert set(engine.state) == {'report'}
+
+
+def test_sessions_share_the_evaluated_run_version(script_path):
+    engine = LocalEngine(tables={'db.s.source': 1})
+    run(engine, script_path, parallel=2)
+
+    out_tables = {table for table in engine.versions if table.startswith('DB.S.OUT_V')}
+    assert len(out_tables) == 1
@@ -0,0 +1,108 @@
+"""Tests for what-if scenarios (scenarios.py)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from scenarios import (
+    normalize_adjustments, run_scenario, scenario_growth, scenario_key, scenario_multiplier, slice_horizon,
+    summarize_arrays
+)
+
+
+@pytest.fixture
+def predictions():
+    months = pd.date_range('2026-01-01', periods=12, freq='MS')
+    rows = []
+    for state, base in (('CA', 1000.0), ('NY', 900.0), ('TX', 800.0)):
+        for i, ts in enumerate(months):
+            rows.append({'SERIES': state, 'TS': ts, 'FORECAST': base + i,
+                         'LOWER_BOUND': base + i - 50, 'UPPER_BOUND': base + i + 50})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def yoy_growth():
+    return pd.DataFrame({'STATE': ['CA', 'NY', 'TX'], 'TRAILING_12MO_AVG': [1000.0, 900.0, 800.0]})
+
+
+def arrays_for(predictions):
+    series = np.array(sorted(predictions['SERIES'].unique()), dtype=object)
+    months = np.array(sorted(predictions['TS'].unique()), dtype='datetime64[M]')
+    forecast = predictions.pivot(index='SERIES', columns='TS', values='FORECAST').to_numpy(np.float32)
+    return {'series': series, 'months': months, 'forecast': forecast,
+            'lower': forecast - 50, 'upper': forecast + 50}
+
+
+def test_normalize_adjustments_is_order_independent_and_drops_zero_changes():
+    a = [{'states': ['ny', 'CA'], 'change_pct': 5}, {'states': None, 'start': '2026-03', 'change_pct': -2}]
+    b = [{'states': None, 'start': '2026-03', 'change_pct': -2.0}, {'states': ['CA', 'NY'], 'change_pct': 5},
+         {'states': ['TX'], 'change_pct': 0}]
+
+    assert normalize_adjustments(a) == normalize_adjustments(b)
+    assert scenario_key(normalize_adjustments(a)) == scenario_key(normalize_adjustments(b))
+    assert scenario_key(normalize_adjustments([{'change_pct': 0}])) == "baseline"
+
+
+def test_multiplier_applies_states_and_month_window(predictions):
+    arrays = arrays_for(predictions)
+    adjustments = normalize_adjustments([
+        {'states': ['CA'], 'change_pct': 10},
+        {'states': None, 'start': '2026-07', 'end': '2026-08', 'change_pct': -50}
+    ])
+
+    multiplier = scenario_multiplier(arrays, adjustments)
+
+    ca = list(arrays['series']).index('CA')
+    ny = list(arrays['series']).index('NY')
+    assert multiplier[ca, 0] == pytest.approx(1.1)
+    assert multiplier[ca, 6] == pytest.approx(0.55)
+    assert multiplier[ny, 0] == 1
+    assert multiplier[ny, 7] == pytest.approx(0.5)
+    assert multiplier[ny, 8] == 1
+
+
+def test_slice_horizon_returns_views(predictions):
+    arrays = arrays_for(predictions)
+
+    sliced = slice_horizon(arrays, 6)
+
+    assert len(sliced['months']) == 6 and sliced['forecast'].shape == (3, 6)
+    assert np.shares_memory(sliced['forecast'], arrays['forecast'])
+    assert slice_horizon(arrays, None) is arrays
+    assert slice_horizon(arrays, 24) is arrays
+
+
+def test_summary_and_growth_match_pandas(predictions, yoy_growth):
+    arrays = arrays_for(predictions)
+
+    summary = summarize_arrays(arrays['series'], arrays['months'], arrays['forecast'],
+                               arrays['lower'], arrays['upper'])
+    expected = predictions.groupby('SERIES')['FORECAST'].agg(['mean', 'min', 'max', 'std'])
+
+    assert list(summary['STATE']) == ['CA', 'NY', 'TX']
+    np.testing.assert_allclose(summary['MEAN_PREMIUM'], expected['mean'])
+    np.testing.assert_allclose(summary['MIN_PREMIUM'], expected['min'])
+    np.testing.assert_allclose(summary['MAX_PREMIUM'], expected['max'])
+    np.testing.assert_allclose(summary['PREMIUM_STDDEV'], expected['std'], rtol=1e-6)
+    assert (summary['FORECAST_START_DATE'] == pd.Timestamp('2026-01-01')).all()
+
+    growth = scenario_growth(summary, yoy_growth)
+    np.testing.assert_allclose(growth['YOY_GROWTH_PCT'], (expected['mean'] - [1000, 900, 800])
+                               / [1000, 900, 800] * 100)
+    assert scenario_growth(summary, None) is None
+
+
+def test_run_scenario_scales_the_baseline(predictions, yoy_growth):
+    baseline = run_scenario("test-v1", predictions, yoy_growth, [])
+    raised = run_scenario("test-v1", predictions, yoy_growth, [{'states': ['TX'], 'change_pct': 10}])
+
+    assert baseline['key'] == "baseline"
+    tx = list(baseline['forecast_summary']['STATE']).index('TX')
+    ca = list(baseline['forecast_summary']['STATE']).index('CA')
+    assert raised['forecast_summary']['MEAN_PREMIUM'][tx] == pytest.approx(
+        baseline['forecast_summary']['MEAN_PREMIUM'][tx] * 1.1, rel=1e-5)
+    assert raised['forecast_summary']['MEAN_PREMIUM'][ca] == pytest.approx(
+        baseline['forecast_summary']['MEAN_PREMIUM'][ca])
+
+    short = run_scenario("test-v1", predictions, yoy_growth, [], horizon=3)
+    assert short['forecast'].shape == (3, 3)
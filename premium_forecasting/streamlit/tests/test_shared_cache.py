@@ -0,0 +1,86 @@
+"""Tests for the process-wide shared cache (shared_cache.py)"""
+import threading
+
+import pytest
+
+from shared_cache import SharedCache
+
+
+def test_loads_once_per_version():
+    cache = SharedCache("test")
+    calls = []
+
+    def loader(key, version):
+        calls.append((key, version))
+        return f"{key}@{version}"
+
+    assert cache.get("t", "v1", loader) == ("t@v1", "v1")
+    assert cache.get("t", "v1", loader) == ("t@v1", "v1")
+    assert calls == [("t", "v1")]
+    assert cache.version("t") == "v1"
+
+
+def test_concurrent_misses_share_one_load():
+    cache = SharedCache("test")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def loader(key, version):
+        calls.append(version)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("t", "v1", loader)))
+               for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == ["v1"]
+    assert results == [("value", "v1")] * 4
+
+
+def test_newer_version_serves_stale_value_while_refreshing():
+    cache = SharedCache("test")
+    cache.get("t", "v1", lambda key, version: "old")
+    release, stored = threading.Event(), threading.Event()
+
+    def loader(key, version):
+        release.wait(5)
+        return "new"
+
+    assert cache.get("t", "v2", loader) == ("old", "v1")
+    assert cache.is_refreshing("t")
+
+    release.set()
+    for _ in range(500):
+        if cache.version("t") == "v2":
+            break
+        stored.wait(0.01)
+    assert cache.get("t", "v2", loader) == ("new", "v2")
+    assert not cache.is_refreshing("t")
+
+
+def test_failed_load_is_raised_and_retried():
+    cache = SharedCache("test")
+
+    def failing(key, version):
+        raise RuntimeError("warehouse down")
+
+    with pytest.raises(RuntimeError, match="warehouse down"):
+        cache.get("t", "v1", failing)
+    assert cache.version("t") is None
+    assert cache.get("t", "v1", lambda key, version: "ok") == ("ok", "v1")
+
+
+def test_clear_drops_entries():
+    cache = SharedCache("test")
+    cache.get("t", "v1", lambda key, version: "value")
+    cache.clear()
+    assert cache.version("t") is None
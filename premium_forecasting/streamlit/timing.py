@@ -0,0 +1,123 @@
+"""
+Span Timing for Insurance Premium Dashboard
+Lightweight per-rerun timing spans, usable as a decorator or context manager
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+# Spans kept per rerun; protects long sessions from unbounded growth
+MAX_SPANS_PER_RUN = 500
+
+# Number of past reruns kept in session state for JSON lines export
+MAX_RUNS_KEPT = 20
+
+_local = threading.local()
+
+
+def _run_state():
+    """Return the span buffer for the current script thread"""
+    if not hasattr(_local, 'spans'):
+        _local.run_id = 0
+        _local.run_start = time.perf_counter()
+        _local.spans = []
+        _local.stack = []
+    return _local
+
+
+def begin_rerun():
+    """
+    Start a new timing run; call once at the top of the app script
+
+    Returns:
+        int: Identifier of the new run
+    """
+    state = _run_state()
+    state.run_id += 1
+    state.run_start = time.perf_counter()
+    state.spans = []
+    state.stack = []
+    return state.run_id
+
+
+@contextmanager
+def span(name, category='app'):
+    """
+    Time a block of work as a named span
+
+    Works as a context manager (``with span("query.summary", "snowflake"):``)
+    or as a decorator (``@span("pandas.prepare_map_data", "pandas")``).
+    Nested spans record their parent so the waterfall can indent them.
+
+    Args:
+        name (str): Span name, dotted by layer (e.g. "plotly.bar_chart")
+        category (str): Span category used for grouping and colour
+    """
+    state = _run_state()
+    parent = state.stack[-1] if state.stack else None
+    state.stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        state.stack.pop()
+        if len(state.spans) < MAX_SPANS_PER_RUN:
+            state.spans.append({
+                'run_id': state.run_id,
+                'name': name,
+                'category': category,
+                'parent': parent,
+                'depth': len(state.stack),
+                'start_ms': round((start - state.run_start) * 1000, 3),
+                'duration_ms': round((end - start) * 1000, 3),
+                'thread': threading.current_thread().name
+            })
+
+
+def get_spans():
+    """
+    Return the spans recorded so far in the current run, in start order
+
+    Returns:
+        list: Span dicts
+    """
+    return sorted(_run_state().spans, key=lambda s: s['start_ms'])
+
+
+def end_rerun(keep_history=False):
+    """
+    Close the current run, keeping its spans in session state for export if asked
+
+    Args:
+        keep_history (bool): Append the spans to the last MAX_RUNS_KEPT runs kept in
+            session state; when False the kept runs are dropped, so sessions that
+            never open the timing panel hold no span history
+
+    Returns:
+        list: Span dicts recorded during the run
+    """
+    spans = get_spans()
+    if not keep_history:
+        st.session_state.pop('_timing_runs', None)
+        return spans
+    history = st.session_state.setdefault('_timing_runs', [])
+    history.append(spans)
+    del history[:-MAX_RUNS_KEPT]
+    return spans
+
+
+def spans_to_jsonl(runs):
+    """
+    Serialize recorded runs as JSON lines, one span per line
+
+    Args:
+        runs (list): List of span lists, as kept by end_rerun()
+
+    Returns:
+        str: JSON lines text
+    """
+    return "\n".join(json.dumps(s) for spans in runs for s in spans) + "\n"
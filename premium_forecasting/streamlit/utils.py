@@ -2,6 +2,7 @@
 Utility Functions for Insurance Premium Dashboard
 """
 import streamlit as st
+from timing import span, spans_to_jsonl
 
 
 def render_dashboard_controls():
@@ -11,15 +12,122 @@ def render_dashboard_controls():
     Returns:
         str: Selected map metric
     """
+    from config import DEFAULT_MAP_METRIC
+    
+    options = ["Mean Premium", "YoY Growth %", "Premium Volatility", "Price Range"]
     map_metric = st.selectbox(
         "🗺️ Select Map Metric",
-        options=["Mean Premium", "YoY Growth %", "Premium Volatility", "Price Range"],
+        options=options,
+        index=options.index(DEFAULT_MAP_METRIC),
         help="Choose which metric to display on the US map"
     )
     
     return map_metric
 
 
+def render_horizon_selector(horizons):
+    """
+    Render the forecast horizon selector
+    
+    Args:
+        horizons (list): Horizons in months the cached predictions can serve
+        
+    Returns:
+        int: Selected horizon in months
+    """
+    from config import DEFAULT_FORECAST_HORIZON
+    
+    default = DEFAULT_FORECAST_HORIZON if DEFAULT_FORECAST_HORIZON in horizons else horizons[-1]
+    horizon = st.select_slider(
+        "🔭 Forecast Horizon (months)",
+        options=horizons,
+        value=default,
+        help="Summaries, growth and ranks are recomputed over the first N forecast months"
+    )
+    
+    return horizon
+
+
+def render_segment_filters(options, pinned=()):
+    """
+    Render the carrier / policy term / business line filters
+    
+    Args:
+        options (dict): Dimension column -> available values (from the segment cube)
+        pinned (tuple): Dimensions fixed by a dashboard filter; they offer no "All"
+        
+    Returns:
+        tuple: (carrier, term, business line), SEGMENT_ALL where not filtered
+    """
+    from config import SEGMENT_ALL, SEGMENT_DIMENSIONS
+    
+    segment = []
+    for col, (dim, label) in zip(st.columns(len(SEGMENT_DIMENSIONS)), SEGMENT_DIMENSIONS.items()):
+        with col:
+            segment.append(st.selectbox(
+                label,
+                options=([] if dim in pinned else [SEGMENT_ALL]) + options.get(dim, []),
+                format_func=lambda v: "All" if v == SEGMENT_ALL else v,
+                key=f"segment_{dim.lower()}"
+            ))
+    
+    return tuple(segment)
+
+
+def render_filter_sidebar(months, carriers):
+    """
+    Render the dashboard filters in the sidebar
+    
+    Args:
+        months (np.ndarray): Forecast months (datetime64[M]) offered by the date range
+        carriers (list): Carrier names (the carrier filter is hidden when empty)
+        
+    Returns:
+        tuple: Output of filters.normalize_filters()
+    """
+    from config import STATE_COORDS, STATE_REGIONS
+    from filters import normalize_filters
+    
+    with st.sidebar.expander("🔎 Filters", expanded=False):
+        regions = st.multiselect("Regions", options=list(STATE_REGIONS), key="filter_regions")
+        states = st.multiselect("States", options=sorted(STATE_COORDS), key="filter_states",
+                                help="Combined with the regions; leave both empty for every state")
+        
+        start = end = None
+        labels = [str(m) for m in months]
+        if len(labels) > 1:
+            first, last = st.select_slider("Forecast months", options=labels,
+                                           value=(labels[0], labels[-1]), key="filter_months")
+            start = first if first != labels[0] else None
+            end = last if last != labels[-1] else None
+        
+        carrier = None
+        if carriers:
+            carrier = st.selectbox("Carrier", options=[None] + carriers, key="filter_carrier",
+                                   format_func=lambda c: "All" if c is None else c,
+                                   help="Applies to the segment metrics on the State Rankings tab")
+    
+    return normalize_filters(states, regions, start, end, carrier)
+
+
+def render_geography_selector():
+    """
+    Render the map geography level selector
+    
+    Returns:
+        str: Selected geography level (key of GEOGRAPHY_LEVELS)
+    """
+    from config import GEOGRAPHY_LEVELS
+    
+    geography = st.selectbox(
+        "🧭 Geography Level",
+        options=list(GEOGRAPHY_LEVELS),
+        help="State uses embedded shapes; County and ZIP3 stream pre-built vector tiles"
+    )
+    
+    return geography
+
+
 def display_data_validation(map_data, map_data_clean):
     """
     Display data validation information in an expander
@@ -53,13 +161,13 @@ def display_data_validation(map_data, map_data_clean):
             st.code(", ".join([str(s) for s in invalid_states]))
 
 
-def display_summary_cards(forecast_summary, yoy_growth):
+@span("ui.summary_cards", "tab")
+def display_summary_cards(national_summary):
     """
     Display summary metrics cards at the top of dashboard
     
     Args:
-        forecast_summary (pd.DataFrame): Forecast summary data
-        yoy_growth (pd.DataFrame): YoY growth data
+        national_summary (dict): Pre-aggregated national statistics row
         
     Returns:
         None (renders to Streamlit)
@@ -67,7 +175,7 @@ def display_summary_cards(forecast_summary, yoy_growth):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        avg_premium = forecast_summary['MEAN_PREMIUM'].mean()
+        avg_premium = national_summary['NATIONAL_AVG_PREMIUM']
         st.metric(
             "National Avg Premium",
             f"${avg_premium:,.0f}",
@@ -75,8 +183,8 @@ def display_summary_cards(forecast_summary, yoy_growth):
         )
     
     with col2:
-        if yoy_growth is not None and len(yoy_growth) > 0:
-            avg_growth = yoy_growth['YOY_GROWTH_PCT'].mean()
+        avg_growth = national_summary.get('AVG_YOY_GROWTH_PCT')
+        if avg_growth is not None:
             st.metric(
                 "Avg YoY Growth",
                 f"{avg_growth:.1f}%",
@@ -87,7 +195,7 @@ def display_summary_cards(forecast_summary, yoy_growth):
             st.metric("Avg YoY Growth", "N/A")
     
     with col3:
-        num_states = len(forecast_summary)
+        num_states = national_summary['STATES_ANALYZED']
         st.metric(
             "States Analyzed",
             f"{num_states}",
@@ -95,10 +203,87 @@ def display_summary_cards(forecast_summary, yoy_growth):
         )
     
     with col4:
-        volatility = (forecast_summary['PREMIUM_STDDEV'] / forecast_summary['MEAN_PREMIUM'] * 100).mean()
+        volatility = national_summary['AVG_VOLATILITY_PCT']
         st.metric(
             "Avg Volatility",
             f"{volatility:.1f}%",
             help="Average coefficient of variation"
         )
 
+
+def render_warmup_status(status):
+    """
+    Show cache warm-up progress in the sidebar
+    
+    Args:
+        status (dict): Output of warmup.warmup_status()
+        
+    Returns:
+        None (renders to Streamlit)
+    """
+    state = status['state']
+    if state == 'running':
+        st.sidebar.info(f"⏳ Warming caches: {status['step']}…")
+    elif state == 'ready':
+        st.sidebar.caption(f"✅ Caches warm ({status['duration_s']:.1f}s)")
+    elif state == 'failed':
+        st.sidebar.caption(f"⚠️ Cache warm-up failed at {status['step']}: {status['error']}")
+
+
+def render_debug_sidebar(spans, runs, cached_objects):
+    """
+    Render the opt-in debug panel in the sidebar: timing waterfall and memory report
+    
+    Args:
+        spans (list): Spans recorded during the current rerun
+        runs (list): Span lists of recent reruns, for JSON lines export
+        cached_objects (dict): Name -> cached object, for the memory report
+        
+    Returns:
+        None (renders to Streamlit)
+    """
+    with st.sidebar.expander("🛠️ Debug", expanded=False):
+        show_timing = st.checkbox(
+            "⏱️ Show Timing Waterfall",
+            value=False,
+            key="show_timing_waterfall",
+            help="Show where time went in this rerun: queries, pandas, Plotly and PyDeck"
+        )
+        
+        if show_timing:
+            _render_timing_waterfall(spans, runs)
+        
+        show_memory = st.checkbox(
+            "🧠 Show Memory Report",
+            value=False,
+            key="show_memory_report",
+            help="Memory held by each cached object shared across sessions"
+        )
+        
+        if show_memory:
+            from memory import memory_report
+            
+            report = memory_report(cached_objects)
+            st.caption(f"{report['MB'].sum():,.2f} MB across {len(report)} cached objects")
+            st.dataframe(report, use_container_width=True, hide_index=True)
+
+
+def _render_timing_waterfall(spans, runs):
+    """Render the timing waterfall and span export for the debug panel"""
+    if not spans:
+        st.info("No spans recorded in this rerun")
+        return
+    
+    from visualizations import create_timing_waterfall
+    
+    total_ms = max(s['start_ms'] + s['duration_ms'] for s in spans)
+    st.caption(f"{len(spans)} spans • {total_ms:,.0f} ms this rerun")
+    st.plotly_chart(create_timing_waterfall(spans), use_container_width=True)
+    
+    st.download_button(
+        label="📥 Export Spans (JSON Lines)",
+        data=spans_to_jsonl(runs),
+        file_name="dashboard_spans.jsonl",
+        mime="application/x-ndjson",
+        help=f"Spans from the last {len(runs)} reruns of this session"
+    )
@@ -1,12 +1,20 @@
 """
 Visualization Functions for Insurance Premium Dashboard
+
+Plotly, PyDeck and the embedded state GeoJSON are imported inside the
+functions that draw with them, so importing this module stays cheap and
+the app can render its first elements before the plotting stack loads.
 """
+import functools
+import hashlib
+
+import numpy as np
+import pandas as pd
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pydeck as pdk
-from us_states_geojson import US_STATES_GEOJSON
-from config import STATE_COORDS
+from config import METRIC_CONFIG, STATE_COORDS, COMPARISON_COLORS
+from geo_tiles import TILE_LAYER, get_color_expression, pack_values, read_tile_info
+from downsample import downsample_band
+from timing import span
 
 
 def get_color_for_scale(normalized_value, color_scale):
@@ -61,44 +69,93 @@ def get_color_for_scale(normalized_value, color_scale):
     return [r, g, b, 180]
 
 
-def create_choropleth_map(map_data_clean, config, map_metric):
+def get_tooltip_value_format(map_metric, value_key):
     """
-    Create interactive choropleth map with PyDeck
+    Build the tooltip value placeholder with metric-specific formatting
+    
+    Args:
+        map_metric (str): Selected metric name
+        value_key (str): Property holding the value
+        
+    Returns:
+        str: Tooltip template fragment, e.g. '${value}' or '{value}%'
+    """
+    if map_metric in ["Mean Premium", "Price Range"]:
+        return '${' + value_key + '}'  # Dollar format
+    elif map_metric in ["YoY Growth %", "Premium Volatility"]:
+        return '{' + value_key + '}%'  # Percentage format
+    return '{' + value_key + '}'  # Default format
+
+
+@functools.lru_cache(maxsize=None)
+def prebuilt_deck_class():
+    """
+    Return a Deck subclass that serializes itself once
+    
+    Defined on first use so pydeck is only imported when a map is drawn.
+    Cached decks are shared read-only across reruns and sessions.
+    
+    Returns:
+        type: PrebuiltDeck class
+    """
+    import pydeck as pdk
+    
+    class PrebuiltDeck(pdk.Deck):
+        def to_json(self):
+            if getattr(self, '_prebuilt_json', None) is None:
+                self._prebuilt_json = super().to_json()
+            return self._prebuilt_json
+    
+    return PrebuiltDeck
+
+
+def build_choropleth_deck(map_data_clean, config, map_metric, deck_class=None):
+    """
+    Build the state choropleth deck (no rendering)
     
     Args:
         map_data_clean (pd.DataFrame): Cleaned map data
         config (dict): Metric configuration
         map_metric (str): Selected metric name
+        deck_class (type): Deck class to instantiate (defaults to pdk.Deck)
         
     Returns:
-        None (renders map directly to Streamlit)
+        pdk.Deck: GeoJSON choropleth deck
     """
+    import pydeck as pdk
+    from us_states_geojson import US_STATES_GEOJSON
+    
     color_col = config['column']
     
-    # Load GeoJSON and merge with values
-    geojson_with_data = US_STATES_GEOJSON.copy()
-    state_values = dict(zip(map_data_clean['STATE'], map_data_clean[color_col]))
-    
-    # Normalize values for color mapping
-    min_val = map_data_clean[color_col].min()
-    max_val = map_data_clean[color_col].max()
-    value_range = max_val - min_val if max_val != min_val else 1
-    
-    # Add properties to GeoJSON features
-    for feature in geojson_with_data['features']:
-        state_code = feature['properties']['code']
-        if state_code in state_values:
-            value = state_values[state_code]
-            normalized_value = (value - min_val) / value_range
-            # Round value to 2 decimal places for tooltip display
-            feature['properties']['value'] = round(float(value), 2)
-            feature['properties']['fill_color'] = get_color_for_scale(
-                normalized_value, 
-                config['color_scale']
-            )
-        else:
-            feature['properties']['value'] = 0
-            feature['properties']['fill_color'] = [200, 200, 200, 100]
+    with span("pandas.choropleth_values", "pandas"):
+        state_values = dict(zip(map_data_clean['STATE'], map_data_clean[color_col]))
+        
+        # Normalize values for color mapping
+        min_val = map_data_clean[color_col].min()
+        max_val = map_data_clean[color_col].max()
+        value_range = max_val - min_val if max_val != min_val else 1
+        
+        # Build per-rerun features that share geometry with US_STATES_GEOJSON;
+        # only the small properties dicts are new, the module-level GeoJSON is never mutated
+        features = []
+        for feature in US_STATES_GEOJSON['features']:
+            properties = dict(feature['properties'])
+            state_code = properties['code']
+            if state_code in state_values:
+                value = state_values[state_code]
+                normalized_value = (value - min_val) / value_range
+                # Round value to 2 decimal places for tooltip display
+                properties['value'] = round(float(value), 2)
+                properties['fill_color'] = get_color_for_scale(
+                    normalized_value, 
+                    config['color_scale']
+                )
+            else:
+                properties['value'] = 0
+                properties['fill_color'] = [200, 200, 200, 100]
+            features.append({**feature, 'properties': properties})
+        
+        geojson_with_data = {**US_STATES_GEOJSON, 'features': features}
     
     # Create PyDeck GeoJsonLayer
     geojson_layer = pdk.Layer(
@@ -124,12 +181,7 @@ def create_choropleth_map(map_data_clean, config, map_metric):
     )
     
     # Create tooltip with metric-specific formatting
-    if map_metric in ["Mean Premium", "Price Range"]:
-        value_format = '${value}'  # Dollar format
-    elif map_metric in ["YoY Growth %", "Premium Volatility"]:
-        value_format = '{value}%'  # Percentage format
-    else:
-        value_format = '{value}'  # Default format
+    value_format = get_tooltip_value_format(map_metric, 'value')
     
     tooltip_config = {
         'html': '<b>{name}</b><br/>State: {code}<br/>' + config['title'] + ': ' + value_format,
@@ -139,14 +191,59 @@ def create_choropleth_map(map_data_clean, config, map_metric):
         }
     }
     
-    deck = pdk.Deck(
+    return (deck_class or pdk.Deck)(
         layers=[geojson_layer],
         initial_view_state=view_state,
         tooltip=tooltip_config
     )
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+@span("viz.get_choropleth_deck", "viz")
+def get_choropleth_deck(data_version, map_metric, _map_data_clean):
+    """
+    Build and serialize the state choropleth once per data version and metric
     
-    # Display the pydeck map
-    st.pydeck_chart(deck)
+    Args:
+        data_version (str): Data version; part of the cache key
+        map_metric (str): Selected metric name; part of the cache key
+        _map_data_clean (pd.DataFrame): Cleaned map data (not hashed)
+        
+    Returns:
+        pdk.Deck: PrebuiltDeck with its JSON (GeoJSON included) already serialized
+    """
+    deck = build_choropleth_deck(_map_data_clean, METRIC_CONFIG[map_metric], map_metric,
+                                 deck_class=prebuilt_deck_class())
+    with span("pydeck.serialize", "pydeck"):
+        deck.to_json()
+    return deck
+
+
+@span("viz.create_choropleth_map", "viz")
+def create_choropleth_map(map_data_clean, config, map_metric, data_version=None):
+    """
+    Create interactive choropleth map with PyDeck
+    
+    Args:
+        map_data_clean (pd.DataFrame): Cleaned map data
+        config (dict): Metric configuration
+        map_metric (str): Selected metric name
+        data_version (str): Data version of map_data_clean; when given, the
+            prebuilt deck from get_choropleth_deck() is reused
+        
+    Returns:
+        None (renders map directly to Streamlit)
+    """
+    color_col = config['column']
+    
+    if data_version is not None:
+        deck = get_choropleth_deck(data_version, map_metric, map_data_clean)
+    else:
+        deck = build_choropleth_deck(map_data_clean, config, map_metric)
+    
+    # Display the pydeck map (serializes the deck, GeoJSON included, unless prebuilt)
+    with span("pydeck.render", "pydeck"):
+        st.pydeck_chart(deck)
     
     # Map statistics
     col1, col2, col3 = st.columns(3)
@@ -158,7 +255,160 @@ def create_choropleth_map(map_data_clean, config, map_metric):
         st.metric("Lowest Value", f"{map_data_clean[color_col].min():.1f}")
 
 
-def create_bar_chart(map_data_clean, config, map_metric):
+@span("viz.create_tiled_choropleth_map", "viz")
+def create_tiled_choropleth_map(level_config, config, map_metric, map_data_clean):
+    """
+    Create a county/ZIP3 choropleth from pre-built vector tiles
+    
+    Only the deck spec is sent with the page: a tile URL template and a
+    colour expression holding the metric packed one character per region.
+    The browser fetches simplified geometry-only tiles for the current
+    viewport and zoom and joins each feature to its value by region index.
+    
+    Args:
+        level_config (dict): Geography level from GEOGRAPHY_LEVELS
+        config (dict): Metric configuration
+        map_metric (str): Selected metric name
+        map_data_clean (pd.DataFrame): Region values from load_region_values(), ranked rows only
+        
+    Returns:
+        None (renders map directly to Streamlit)
+    """
+    import pydeck as pdk
+    
+    color_col = config['column']
+    tile_info = read_tile_info(level_config['tile_dir'])
+    
+    if tile_info is None:
+        st.warning(f"⚠️ No {level_config['label']} tiles found in `{level_config['tile_dir']}`")
+        st.info(f"Build them with `python build_tiles.py --level {level_config['label']} ...` and redeploy")
+        return
+    
+    with span("pandas.tile_values", "pandas"):
+        ids = tile_info['ids']
+        values = pd.Series(map_data_clean[color_col].to_numpy(dtype=float),
+                           index=map_data_clean['STATE']).reindex(ids).to_numpy()
+        min_val, max_val = map_data_clean[color_col].min(), map_data_clean[color_col].max()
+        value_range = max_val - min_val if max_val != min_val else 1
+        packed = pack_values((values - min_val) / value_range)
+    
+    tile_layer = pdk.Layer(
+        'MVTLayer',
+        data=level_config['tile_url'],
+        min_zoom=level_config['min_zoom'],
+        max_zoom=level_config['max_zoom'],
+        opacity=0.8,
+        stroked=True,
+        filled=True,
+        get_fill_color=get_color_expression(config['color_scale'], packed),
+        # Accessor expressions are only re-evaluated when their trigger changes
+        update_triggers={'getFillColor': [map_metric, hashlib.sha1(packed.encode()).hexdigest()[:16]]},
+        get_line_color=[255, 255, 255],
+        line_width_min_pixels=0.5,
+        pickable=True,
+        auto_highlight=True
+    )
+    
+    view_state = pdk.ViewState(
+        latitude=37.8,
+        longitude=-96,
+        zoom=3.5,
+        pitch=0
+    )
+    
+    # Tooltips can only show tile properties; values are in the tables below the map
+    id_key = level_config['id_property']
+    name_key = level_config['name_property']
+    tooltip_config = {
+        'html': f'<b>{{{name_key}}}</b><br/>{level_config["label"]}: {{{id_key}}}',
+        'style': {
+            'backgroundColor': 'steelblue',
+            'color': 'white'
+        }
+    }
+    
+    deck = pdk.Deck(
+        layers=[tile_layer],
+        initial_view_state=view_state,
+        tooltip=tooltip_config
+    )
+    
+    with span("pydeck.render", "pydeck"):
+        st.pydeck_chart(deck)
+    
+    matched = int((~np.isnan(values)).sum())
+    st.caption(f"{level_config['label']} tiles (layer `{TILE_LAYER}`): {matched:,} of {len(ids):,} regions "
+               f"have a {config['title'].lower()} value")
+    
+    # Map statistics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Highest Value", f"{max_val:.1f}")
+    with col2:
+        st.metric("Average Value", f"{map_data_clean[color_col].mean():.1f}")
+    with col3:
+        st.metric("Lowest Value", f"{min_val:.1f}")
+
+
+def build_bar_figure(chart_data, config, map_metric):
+    """
+    Build the horizontal state bar chart figure (no rendering)
+    
+    Args:
+        chart_data (pd.DataFrame): Map data in ascending metric order
+        config (dict): Metric configuration
+        map_metric (str): Selected metric name
+        
+    Returns:
+        go.Figure: Bar chart figure
+    """
+    import plotly.express as px
+    
+    color_col = config['column']
+    
+    with span("plotly.bar_chart", "plotly"):
+        fig_bar = px.bar(
+            chart_data,
+            x=color_col,
+            y='STATE',
+            orientation='h',
+            title=f'{map_metric} by State (Sorted)',
+            labels={color_col: config['title'], 'STATE': 'State'},
+            color=color_col,
+            color_continuous_scale=config['color_scale'],
+            height=max(800, len(chart_data) * 16)
+        )
+        
+        fig_bar.update_layout(
+            xaxis_title=config['title'],
+            yaxis_title='State',
+            showlegend=False,
+            yaxis={'categoryorder': 'total ascending'}
+        )
+    
+    return fig_bar
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_bar_figure(data_version, map_metric, _chart_data):
+    """
+    Build the state bar chart once per data version and metric
+    
+    The figure is shared across sessions and must not be mutated.
+    
+    Args:
+        data_version (str): Data version; part of the cache key
+        map_metric (str): Selected metric name; part of the cache key
+        _chart_data (pd.DataFrame): Map data in ascending metric order (not hashed)
+        
+    Returns:
+        go.Figure: Bar chart figure
+    """
+    return build_bar_figure(_chart_data, METRIC_CONFIG[map_metric], map_metric)
+
+
+@span("viz.create_bar_chart", "viz")
+def create_bar_chart(map_data_clean, config, map_metric, presorted=False, data_version=None):
     """
     Create interactive horizontal bar chart
     
@@ -166,6 +416,9 @@ def create_bar_chart(map_data_clean, config, map_metric):
         map_data_clean (pd.DataFrame): Cleaned map data
         config (dict): Metric configuration
         map_metric (str): Selected metric name
+        presorted (bool): Data is already in ascending metric order (e.g. from the rank index)
+        data_version (str): Data version of presorted data; when given, the
+            prebuilt figure from get_bar_figure() is reused
         
     Returns:
         None (renders chart directly to Streamlit)
@@ -176,26 +429,153 @@ def create_bar_chart(map_data_clean, config, map_metric):
     st.caption("Hover over bars for detailed information • Click and drag to zoom • Double-click to reset")
     
     # Sort data for better visualization
-    chart_data = map_data_clean.sort_values(color_col, ascending=True).copy()
+    if presorted:
+        chart_data = map_data_clean
+    else:
+        chart_data = map_data_clean.sort_values(color_col, ascending=True)
     
-    fig_bar = px.bar(
-        chart_data,
-        x=color_col,
-        y='STATE',
-        orientation='h',
-        title=f'{map_metric} by State (Sorted)',
-        labels={color_col: config['title'], 'STATE': 'State'},
-        color=color_col,
-        color_continuous_scale=config['color_scale'],
-        height=max(800, len(chart_data) * 16)
+    if presorted and data_version is not None:
+        fig_bar = get_bar_figure(data_version, map_metric, chart_data)
+    else:
+        fig_bar = build_bar_figure(chart_data, config, map_metric)
+    
+    with span("plotly.render", "plotly"):
+        st.plotly_chart(fig_bar, use_container_width=True)
+
+
+def _hex_to_rgba(color, alpha):
+    """Convert '#rrggbb' to an rgba() string with the given opacity"""
+    r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return f"rgba({r}, {g}, {b}, {alpha})"
+
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def get_series_traces(data_version, horizon, state, _arrays):
+    """
+    Build the forecast and interval traces of one series, once per data version and horizon
+
+    Traces are reused by every comparison that includes the series. They
+    carry no colour: create_comparison_chart() colours the figure's copies by the
+    series' position in the selection, so the cached objects are never mutated.
+
+    Args:
+        data_version (str): Data version; part of the cache key
+        horizon (int): Months shown (None for all); part of the cache key
+        state (str): Series code; part of the cache key
+        _arrays (dict): Output of scenarios.prediction_arrays() (not hashed)
+
+    Returns:
+        list: Upper bound, lower bound (filled to the upper) and forecast go.Scatter
+        traces, or an empty list if the series has no predictions
+    """
+    import plotly.graph_objects as go
+
+    positions = np.flatnonzero(_arrays['series'] == state)
+    if len(positions) == 0:
+        return []
+    pos = int(positions[0])
+
+    months, forecast, lower, upper = downsample_band(
+        _arrays['months'][:horizon].astype('datetime64[ns]'),
+        *(_arrays[key][pos, :horizon] for key in ('forecast', 'lower', 'upper')))
+
+    return [
+        go.Scatter(x=months, y=upper, mode='lines', line=dict(width=0), legendgroup=state,
+                   showlegend=False, hoverinfo='skip', name=f"{state} upper"),
+        go.Scatter(x=months, y=lower, mode='lines', line=dict(width=0), legendgroup=state,
+                   showlegend=False, hoverinfo='skip', name=f"{state} lower",
+                   fill='tonexty'),
+        go.Scatter(x=months, y=forecast, mode='lines', line=dict(width=2.5),
+                   legendgroup=state, name=state,
+                   hovertemplate=f"{state}: $%{{y:,.2f}}<extra></extra>")
+    ]
+
+
+@span("viz.create_comparison_chart", "viz")
+def create_comparison_chart(states, arrays, data_version, horizon=None, show_bounds=True):
+    """
+    Render the selected series as one overlaid forecast timeline
+
+    Args:
+        states (list): Series codes to compare
+        arrays (dict): Output of scenarios.prediction_arrays()
+        data_version (str): Data version of the arrays
+        horizon (int): Months shown (None for all)
+        show_bounds (bool): Shade each series' prediction interval
+
+    Returns:
+        None (renders chart directly to Streamlit)
+    """
+    import plotly.graph_objects as go
+
+    traces, colors = [], []
+    for position, state in enumerate(states):
+        series_traces = get_series_traces(data_version, horizon, state, arrays)
+        if not series_traces:
+            continue
+        traces.extend(series_traces if show_bounds else series_traces[2:])
+        colors.append(COMPARISON_COLORS[position % len(COMPARISON_COLORS)])
+
+    fig = go.Figure(data=traces)
+    # go.Figure holds its own copies, so colouring them by position in the
+    # selection leaves the cached traces untouched
+    per_series = 3 if show_bounds else 1
+    for color, series_traces in zip(colors, zip(*[iter(fig.data)] * per_series)):
+        if show_bounds:
+            series_traces[1].fillcolor = _hex_to_rgba(color, 0.12)
+        series_traces[-1].line.color = color
+    fig.update_layout(
+        title='Premium Forecast Comparison',
+        xaxis_title='Date',
+        yaxis_title='Premium ($)',
+        hovermode='x unified',
+        height=450
     )
+
+    with span("plotly.render", "plotly"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def create_timing_waterfall(spans):
+    """
+    Create a waterfall chart of timing spans for one rerun
     
-    fig_bar.update_layout(
-        xaxis_title=config['title'],
-        yaxis_title='State',
-        showlegend=False,
-        yaxis={'categoryorder': 'total ascending'}
+    Args:
+        spans (list): Span dicts from timing.get_spans()
+        
+    Returns:
+        go.Figure: Horizontal bar chart, one bar per span
+    """
+    import plotly.graph_objects as go
+    
+    category_colors = {
+        'snowflake': '#29b5e8',
+        'pandas': '#150458',
+        'plotly': '#636efa',
+        'pydeck': '#ff7f0e',
+        'viz': '#9467bd',
+        'loader': '#2ca02c',
+        'tab': '#7f7f7f'
+    }
+    labels = [f"{'  ' * s['depth']}{s['name']}" for s in spans]
+    
+    fig = go.Figure(go.Bar(
+        x=[s['duration_ms'] for s in spans],
+        base=[s['start_ms'] for s in spans],
+        y=labels,
+        orientation='h',
+        marker_color=[category_colors.get(s['category'], '#bcbd22') for s in spans],
+        customdata=[[s['category'], s['duration_ms']] for s in spans],
+        hovertemplate='%{y}<br>%{customdata[0]}: %{customdata[1]:.1f} ms<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title='Rerun Timing Waterfall',
+        xaxis_title='Milliseconds since rerun start',
+        yaxis={'autorange': 'reversed'},
+        height=max(300, len(spans) * 22),
+        margin=dict(l=10, r=10, t=40, b=10),
+        showlegend=False
     )
     
-    st.plotly_chart(fig_bar, use_container_width=True)
-
+    return fig